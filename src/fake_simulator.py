@@ -0,0 +1,38 @@
+"""
+Simulateur de remplacement pour tester la ferme de simulation sans Unity
+
+Usage : python fake_simulator.py [dossier] [--delay s]
+Lit donnees-map.txt et script.txt dans le dossier d'échange (argument, sinon CHALLENGE_DIR,
+sinon dossier courant), rejoue le script avec headless_simulator et écrit
+"gain=... fuel=... temps=..." dans score.txt (fuel = carburant restant)
+"""
+import os
+import sys
+import time
+
+from headless_simulator import load_map, parse_script, simulate_scripts
+
+def main(argv):
+    delay = 0.0
+    if "--delay" in argv:
+        k = argv.index("--delay")
+        delay = float(argv[k + 1])
+        argv = argv[:k] + argv[k + 2:]
+    challenge_dir = argv[1] if len(argv) > 1 else os.environ.get("CHALLENGE_DIR", os.getcwd())
+
+    cylinders = load_map(os.path.join(challenge_dir, "donnees-map.txt"))
+    with open(os.path.join(challenge_dir, "script.txt"), 'r', encoding='utf-8') as f:
+        script = parse_script(f.read())
+
+    gains, fuels, times = simulate_scripts(cylinders, [script])
+    gain, fuel, temps = int(gains[0]), fuels[0], times[0]
+    time.sleep(delay)
+
+    # écriture atomique : le lecteur ne doit jamais voir un fichier à moitié écrit
+    score_path = os.path.join(challenge_dir, "score.txt")
+    with open(score_path + ".tmp", 'w', encoding='utf-8') as f:
+        f.write(f"gain={gain} fuel={fuel:.2f} temps={temps:.2f}")
+    os.replace(score_path + ".tmp", score_path)
+
+if __name__ == "__main__":
+    main(sys.argv)
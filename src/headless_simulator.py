@@ -0,0 +1,169 @@
+import math
+import concurrent.futures
+import numpy as np
+
+from maps import load_map
+
+def parse_script(text):
+    """
+    Script TURN / GO / FINISH -> (caps absolus, distances) de chaque GO, en radians
+    Les commandes après FINISH sont ignorées
+    """
+    angle = 0.0
+    headings, distances = [], []
+    for line in text.splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == "FINISH":
+            break
+        if parts[0] == "TURN":
+            angle += math.radians(float(parts[1]))
+        elif parts[0] == "GO":
+            headings.append(angle)
+            distances.append(float(parts[1]))
+    return np.array(headings, dtype=np.float64), np.array(distances, dtype=np.float64)
+
+# distance sous laquelle un cylindre est considéré comme la cible d'un GO (arrondis du script compris)
+AIM_TOL = 1e-3
+
+def simulate_scripts(cylinders, scripts, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, return_orders=False):
+    """
+    Exécute plusieurs scripts sur la même carte, vectorisé sur les scripts
+    scripts : liste de (caps, distances) issus de parse_script
+    Chaque GO avance en ligne droite et s'arrête sur le premier cylindre balayé (modèle de
+    advance_leg) ; le robot s'arrête en cours de route quand le carburant ou le temps est épuisé
+    Retourne (gains, carburant restant, temps) sous forme de tableaux, plus l'ordre de ramassage
+    (n_scripts, n) complété par -1 si return_orders
+    """
+    n_scripts = len(scripts)
+    n_steps = max((len(d) for _, d in scripts), default=0)
+
+    headings = np.zeros((n_scripts, n_steps), dtype=np.float64)
+    distances = np.zeros((n_scripts, n_steps), dtype=np.float64)
+    n_go = np.zeros(n_scripts, dtype=np.int64)
+    for s, (h, d) in enumerate(scripts):
+        headings[s, :len(d)] = h
+        distances[s, :len(d)] = d
+        n_go[s] = len(d)
+
+    cx, cy = cylinders[:, 0], cylinders[:, 1]
+    masses, points = cylinders[:, 2], cylinders[:, 3]
+    R_col_sq = R_col * R_col
+    rows = np.arange(n_scripts)
+
+    x = np.zeros(n_scripts)
+    y = np.zeros(n_scripts)
+    M = np.zeros(n_scripts)
+    T = np.zeros(n_scripts)
+    Q = np.zeros(n_scripts)
+    gain = np.zeros(n_scripts)
+    running = np.ones(n_scripts, dtype=np.bool_)
+    visited = np.zeros((n_scripts, len(cylinders)), dtype=np.bool_)
+    orders = np.full((n_scripts, len(cylinders)), -1, dtype=np.int64)
+    n_picked = np.zeros(n_scripts, dtype=np.int64)
+
+    for step in range(n_steps):
+        active = running & (step < n_go)
+        if not active.any():
+            break
+
+        D = distances[:, step]
+        ux = np.cos(headings[:, step])
+        uy = np.sin(headings[:, step])
+
+        # premier cylindre non ramassé balayé le long du segment ; le cylindre visé (centre au bout
+        # du GO) n'est atteint qu'en fin de trajet, comme dans advance_leg
+        vx = cx[None, :] - x[:, None]
+        vy = cy[None, :] - y[:, None]
+        t = vx * ux[:, None] + vy * uy[:, None]
+        d_sq = vx * vx + vy * vy - t * t
+        dist_to_hit = t - np.sqrt(np.abs(R_col_sq - d_sq))
+        aimed = (np.abs(t - D[:, None]) < AIM_TOL) & (d_sq < AIM_TOL ** 2)
+        dist_to_hit = np.where(aimed, D[:, None], dist_to_hit)
+        candidate = ~visited & (t > 0) & (d_sq <= R_col_sq) & (dist_to_hit > -1e-5) & ((dist_to_hit < D[:, None]) | aimed)
+        dist_to_hit = np.where(candidate, dist_to_hit, np.inf)
+        hit = np.argmin(dist_to_hit, axis=1)
+        has_hit = np.isfinite(dist_to_hit[rows, hit])
+
+        nx = np.where(has_hit, cx[hit], x + ux * D)
+        ny = np.where(has_hit, cy[hit], y + uy * D)
+        dist = np.hypot(nx - x, ny - y)
+
+        V = np.maximum(V0 * np.exp(-a * M), 1e-9)
+        delta_T = dist / V
+        delta_Q = (b * M + b0) * dist
+
+        # panne sèche ou temps écoulé : avance partielle puis arrêt
+        over = active & ((T + delta_T > Tmax) | (Q + delta_Q > Qmax))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio_Q = np.where(delta_Q > 0, (Qmax - Q) / delta_Q, 0.0)
+            ratio_T = np.where(delta_T > 0, (Tmax - T) / delta_T, 0.0)
+        ratio = np.clip(np.minimum(ratio_Q, ratio_T), 0.0, 1.0)
+        T = np.where(over, T + ratio * delta_T, T)
+        Q = np.where(over, Q + ratio * delta_Q, Q)
+        running &= ~over
+
+        moved = active & ~over
+        x = np.where(moved, nx, x)
+        y = np.where(moved, ny, y)
+        T = np.where(moved, T + delta_T, T)
+        Q = np.where(moved, Q + delta_Q, Q)
+
+        picked = moved & has_hit
+        visited[rows[picked], hit[picked]] = True
+        orders[rows[picked], n_picked[picked]] = hit[picked]
+        n_picked += picked
+        M = np.where(picked, M + masses[hit], M)
+        gain = np.where(picked, gain + points[hit], gain)
+
+    if return_orders:
+        return gain.astype(np.int64), np.maximum(0.0, Qmax - Q), T, orders
+    return gain.astype(np.int64), np.maximum(0.0, Qmax - Q), T
+
+def script_to_path(cylinders, script_text, **physics):
+    """Ordre de ramassage obtenu en rejouant un script (sans les cylindres jamais atteints)"""
+    orders = simulate_scripts(cylinders, [parse_script(script_text)], return_orders=True, **physics)[3]
+    return [int(i) for i in orders[0] if i >= 0]
+
+class HeadlessSimulator:
+    """
+    Validation sans Unity : même interface que UnityRunner / SimulatorPool,
+    avec en plus run_batch() pour valider beaucoup de scripts d'un coup
+    """
+    def __init__(self, **physics):
+        """:param physics: paramètres du modèle (V0, a, b, b0, Tmax, Qmax, R_col), ceux de evaluate_path par défaut"""
+        self.physics = physics
+        self._maps = {}
+
+    def _cylinders(self, map_source):
+        if map_source not in self._maps:
+            self._maps[map_source] = load_map(map_source)
+        return self._maps[map_source]
+
+    def run_batch(self, map_source, script_sources):
+        """Valide tous les scripts sur la carte, retourne une liste de (gain, fuel restant, temps)"""
+        scripts = []
+        for script_source in script_sources:
+            with open(script_source, 'r', encoding='utf-8') as f:
+                scripts.append(parse_script(f.read()))
+        gains, fuels, times = simulate_scripts(self._cylinders(map_source), scripts, **self.physics)
+        return [(int(g), float(f), float(t)) for g, f, t in zip(gains, fuels, times)]
+
+    def run_simulation(self, map_source, script_source, timeout=None):
+        """timeout : ignoré, présent pour la compatibilité avec UnityRunner"""
+        score_data = self.run_batch(map_source, [script_source])[0]
+        print(f"Simulation terminée : Gain={score_data[0]}, Fuel={score_data[1]:.1f}, Temps={score_data[2]:.1f}")
+        return score_data
+
+    def submit(self, map_source, script_source, timeout=None):
+        """Interface de SimulatorPool : la simulation est immédiate, le Future est déjà résolu"""
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(self.run_simulation(map_source, script_source, timeout))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def shutdown(self, wait=True):
+        pass
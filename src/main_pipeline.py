@@ -1,3 +1,6 @@
+import os
+from functools import partial
+
 import numpy as np
 
 from solvers.sa_solver import SASolver
@@ -6,17 +9,9 @@ from solvers.mcts_solver import MCTSSolver
 from solvers.beam_solver import BeamSearchSolver
 from solvers.memetic_solver import MemeticSolver
 from solvers.weight_ratio_solver import WeightedRatioSolver
+from solvers.bnb_solver import BranchAndBoundSolver
 from pipeline import EvaluationPipeline
-
-def load_real_instance(filepath):
-    """Charge la map"""
-    raw_data = np.loadtxt(filepath)
-    cylinders = np.zeros((len(raw_data), 4), dtype=np.float64)
-    cylinders[:, 0] = raw_data[:, 0] # x
-    cylinders[:, 1] = raw_data[:, 1] # y
-    cylinders[:, 2] = raw_data[:, 2] # masse
-    cylinders[:, 3] = 2 * raw_data[:, 2] - 1 # points (2x - 1)
-    return cylinders
+from maps import load_map
 
 def main():
     DATA_DIR = "data"  
@@ -27,6 +22,7 @@ def main():
     target_map = None
     
     pipeline = EvaluationPipeline(DATA_DIR, RESULTS_DIR, UNITY_EXE)
+    map_loader = partial(load_map, cache_dir=os.path.join(RESULTS_DIR, "cache", "maps"))
 
     
     pipeline.add_solver(
@@ -37,6 +33,15 @@ def main():
             'time_limit': 900.0, 'fitness_mode': 0
         }
     )
+
+    pipeline.add_solver(
+        name="SA_Tempering",
+        solver_class=SASolver,
+        params={
+            't_init': 10000.0, 't_final': 0.001, 'time_limit': 900.0, 'fitness_mode': 0,
+            'mode': "tempering", 'n_replicas': 16, 'exchange_interval': 500
+        }
+    )
     
     pipeline.add_solver(
         name="BeamSearch",
@@ -61,7 +66,7 @@ def main():
         name="MCTS",
         solver_class=MCTSSolver,
         params={"iterations" : 1_000_000_000, "exploration_constant" : 1.414,
-            "time_limit" : 1800, "fitness_mode" : 0
+            "time_limit" : 1800, "fitness_mode" : 0, "parallel_mode" : "root"
         }
     )
     
@@ -82,6 +87,12 @@ def main():
     )
 
 
+    pipeline.add_solver(
+        name="BranchAndBound",
+        solver_class=BranchAndBoundSolver,
+        params={"time_limit": 900.0}
+    )
+
     pipeline.add_solver(
         name="Ratio_Original_49",
         solver_class=WeightedRatioSolver,
@@ -108,9 +119,9 @@ def main():
 
     # Lancement de toute la batterie de tests
     if target_map:
-        cylinders = load_real_instance("data/" + target_map)
+        cylinders = map_loader(os.path.join(DATA_DIR, target_map))
         print(f"Maximum théorique : {np.sum(cylinders[:, 3])}")
-    pipeline.run_all(load_real_instance, target_map)
+    pipeline.run_all(map_loader, target_map)
     
     print("\nPIPELINE TERMINÉ. Vérifie le fichier benchmark_results.csv")
 
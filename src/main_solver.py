@@ -1,6 +1,5 @@
 import os
 import time
-import numpy as np
 
 from solvers.mcts_solver import MCTSSolver
 from solvers.sa_solver import SASolver
@@ -13,23 +12,13 @@ from solvers.weight_ratio_solver import WeightedRatioSolver
 
 from visualizer import RouteVisualizer
 from robot_translator import RobotTranslator
-
-
-def load_real_instance(filepath):
-    raw_data = np.loadtxt(filepath)
-    cylinders = np.zeros((len(raw_data), 4), dtype=np.float64)
-    cylinders[:, 0] = raw_data[:, 0] # x
-    cylinders[:, 1] = raw_data[:, 1] # y
-    cylinders[:, 2] = raw_data[:, 2] # masse
-    cylinders[:, 3] = 2 * raw_data[:, 2] - 1 # points
-    return cylinders
-
+from maps import load_map
 
 
 def main():
     print("--- DÉMARRAGE DU SOLVER ---")
     
-    cylinders = load_real_instance("data/donnees-map1.txt")
+    cylinders = load_map("data/donnees-map1.txt", cache_dir="results/cache/maps")
 
     solver_params_mcts = {
         'iterations': 100_000_000_000, 
@@ -86,7 +75,7 @@ def main():
 
 if __name__ == "__main__":
     #main()
-    cylinders = load_real_instance("data/donnees-map1.txt")
+    cylinders = load_map("data/donnees-map1.txt", cache_dir="results/cache/maps")
 
     ss = SimpleSolver()
     ns = NearestSolver()
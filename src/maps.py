@@ -0,0 +1,109 @@
+"""
+Cartes du challenge (donnees-map*.txt : une ligne "x y masse" par cylindre)
+- map_hash : empreinte du contenu d'une carte (clé des caches de cartes et de résultats)
+- parse_map : lecture rapide du texte
+- load_map : une carte, via un cache binaire .npy adressé par l'empreinte du fichier
+- load_maps : toutes les cartes d'un dossier empilées en un seul tableau (n_cartes, n_max, 4)
+"""
+import os
+import re
+import glob
+import hashlib
+
+import numpy as np
+
+MAP_PATTERN = "donnees-map*.txt"
+
+# cartes déjà chargées par ce processus : (sha256, mmap) -> cylindres
+_LOADED = {}
+
+# empreintes déjà calculées : (chemin absolu, mtime, taille) -> sha256
+_MAP_HASHES = {}
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def map_hash(map_path):
+    """Empreinte du contenu de la carte, recalculée seulement si le fichier a changé"""
+    st = os.stat(map_path)
+    signature = (os.path.abspath(map_path), st.st_mtime_ns, st.st_size)
+    if signature not in _MAP_HASHES:
+        _MAP_HASHES[signature] = file_sha256(map_path)
+    return _MAP_HASHES[signature]
+
+
+def parse_map(text):
+    """Texte de carte -> cylindres [x, y, masse, points], points = 2 * masse - 1"""
+    lines = [line for line in text.splitlines() if line.strip()]
+    values = np.array(" ".join(lines).split(), dtype=np.float64)
+    if len(lines) == 0 or values.size % len(lines) != 0 or values.size // len(lines) < 3:
+        raise ValueError(f"Carte invalide : {values.size} valeurs sur {len(lines)} lignes (attendu x y masse)")
+
+    raw_data = values.reshape(len(lines), -1)
+    cylinders = np.empty((len(lines), 4), dtype=np.float64)
+    cylinders[:, :3] = raw_data[:, :3]
+    cylinders[:, 3] = 2 * raw_data[:, 2] - 1
+    return cylinders
+
+
+def load_map(map_path, cache_dir=None, mmap=False):
+    """
+    Cylindres (n, 4) d'une carte
+    :param cache_dir: dossier du cache binaire (None = relit le texte à chaque fois) ; l'entrée est
+                      nommée d'après l'empreinte du fichier, une carte modifiée est donc relue.
+                      Une carte déjà chargée par le processus n'est plus relue du disque
+    :param mmap: projette l'entrée du cache en mémoire (lecture seule) au lieu de la copier ;
+                 Numba compile alors une version à part des noyaux pour les tableaux en lecture seule
+    """
+    if cache_dir is None:
+        with open(map_path, 'r', encoding='utf-8') as f:
+            return parse_map(f.read())
+
+    key = map_hash(map_path)
+    if (key, mmap) in _LOADED:
+        cylinders = _LOADED[key, mmap]
+        return cylinders if mmap else cylinders.copy()
+
+    cache_path = os.path.join(cache_dir, f"{key}.npy")
+    if os.path.exists(cache_path):
+        _LOADED[key, mmap] = np.load(cache_path, mmap_mode='r' if mmap else None)
+        return load_map(map_path, cache_dir, mmap)
+
+    with open(map_path, 'r', encoding='utf-8') as f:
+        cylinders = parse_map(f.read())
+
+    # écriture atomique : un autre processus ne lit jamais une entrée à moitié écrite
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, cylinders)
+    os.replace(tmp_path, cache_path)
+    return load_map(map_path, cache_dir, mmap)
+
+
+def _natural_key(path):
+    """donnees-map10 après donnees-map9"""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", os.path.basename(path))]
+
+
+def load_maps(data_dir, pattern=MAP_PATTERN, cache_dir=None):
+    """
+    Toutes les cartes du dossier, dans l'ordre naturel des noms
+    Retourne (noms, cartes, tailles) : cartes est (n_cartes, n_max, 4), la carte i occupe
+    cartes[i, :tailles[i]] et les lignes de remplissage valent NaN
+    """
+    paths = sorted(glob.glob(os.path.join(data_dir, pattern)), key=_natural_key)
+    names = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    all_cylinders = [load_map(path, cache_dir) for path in paths]
+
+    counts = np.array([len(c) for c in all_cylinders], dtype=np.int64)
+    stacked = np.full((len(paths), counts.max(initial=0), 4), np.nan, dtype=np.float64)
+    for i, cylinders in enumerate(all_cylinders):
+        stacked[i, :counts[i]] = cylinders
+    return names, stacked, counts
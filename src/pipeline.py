@@ -1,20 +1,64 @@
 import os
+import re
 import csv
 import time
+import concurrent.futures
 from datetime import datetime
+from functools import partial
 
-from solvers.parallel_runner import ParallelRunner
+from solvers.scheduler import JobScheduler
+from solvers.worker_pool import WorkerPool
+from solvers.parallel_runner import resolve_n_cores
+from solvers.bnb_solver import BranchAndBoundSolver
+from result_cache import ResultCache
 from robot_translator import RobotTranslator
-from unity_runner import UnityRunner
+from simulator_pool import SimulatorPool
+from headless_simulator import HeadlessSimulator, script_to_path
+
+CSV_COLUMNS = ["Date", "Map", "Algorithme", "Parametres", "Mode_Fitness", "Score_Numba", "Gain_Reel", "Fuel_Reel", "Temps_Reel", "Chemin_Script", "Seed", "Coeurs", "Trace", "Evals_Completes", "Evals_Partielles", "Evals_par_s", "Evals_par_s_par_Coeur", "Borne_Gain", "Ecart_Borne", "Demarrage_Pool"]
+TRACE_COLUMNS = ["Worker", "Temps", "Evaluations", "Meilleur_Score"]
 
 class EvaluationPipeline:
-    def __init__(self, data_dir, results_dir, unity_exe_path):
+    def __init__(self, data_dir, results_dir, unity_exe_path, seed=None, time_budget=None, trace_capacity=4096, n_simulators=1, sandbox_dir=None, use_cache=True, bound_budget=60.0, n_cores=None, workers_per_run=None):
+        """
+        :param seed: seed maître de chaque lancement (None = nouveau seed à chaque lancement)
+                     Le seed effectivement utilisé est écrit dans le CSV pour rejouer une ligne
+        :param time_budget: budget dur (s) de chaque algorithme sur chaque carte (None = time_limit des solveurs)
+        :param trace_capacity: points de trace de convergence par worker, écrits dans results/traces (None = désactivé)
+        :param unity_exe_path: exécutable du simulateur, None = validation par HeadlessSimulator (sans Unity)
+        :param n_simulators: nombre de validations simultanées, chacune dans son dossier sous sandbox_dir
+                             Les validations tournent pendant que les algorithmes suivants cherchent
+        :param use_cache: réutilise les résultats validés de results/cache pour une même carte (contenu),
+                          un même solveur, les mêmes paramètres, seed, nombre de coeurs et budget
+        :param bound_budget: budget (s) de BranchAndBoundSolver pour majorer le gain de chaque carte
+                             (l'optimum s'il termine) ; chaque ligne du CSV indique son écart relatif
+                             à ce majorant. None = pas de majorant
+        :param n_cores: taille du pool de processus partagé par tous les lancements (None = tous les coeurs)
+        :param workers_per_run: workers d'un lancement long (None = tous les coeurs du pool) ; avec moins,
+                                plusieurs lancements longs tournent en même temps sur des coeurs distincts
+        """
         self.data_dir = data_dir
         self.results_dir = results_dir
-        self.unity_runner = UnityRunner(unity_exe_path)
+        if unity_exe_path is None:
+            self.simulators = HeadlessSimulator()
+        else:
+            self.simulators = SimulatorPool(unity_exe_path, n_simulators, sandbox_dir)
+        self.pending = []
+        self.seed = seed
+        self.time_budget = time_budget
+        self.trace_capacity = trace_capacity
+        self.bound_budget = bound_budget
+        self.n_cores = n_cores
+        self.workers_per_run = workers_per_run
         self.solvers = []
+
+        # durée (s) du démarrage et du préchauffage du pool de processus au dernier run_all
+        # (0 si le pool d'un balayage précédent était déjà prêt)
+        self.pool_startup = 0.0
         
         self.csv_path = os.path.join(self.results_dir, "benchmark_results.csv")
+        self.traces_dir = os.path.join(self.results_dir, "traces")
+        self.cache = ResultCache(os.path.join(self.results_dir, "cache")) if use_cache else None
         self._init_csv()
 
     def _init_csv(self):
@@ -22,16 +66,196 @@ class EvaluationPipeline:
         if not os.path.exists(self.csv_path):
             with open(self.csv_path, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
-                writer.writerow(["Date", "Map", "Algorithme", "Parametres", "Mode_Fitness", "Score_Numba", "Gain_Reel", "Fuel_Reel", "Temps_Reel", "Chemin_Script"])
+                writer.writerow(CSV_COLUMNS)
+            return
+
+        # Migration d'un ancien fichier : nouvelles colonnes ajoutées à droite, laissées vides
+        with open(self.csv_path, 'r', newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        if rows and rows[0] != CSV_COLUMNS:
+            header = rows[0]
+            with open(self.csv_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(CSV_COLUMNS)
+                for row in rows[1:]:
+                    record = dict(zip(header, row))
+                    writer.writerow([record.get(col, "") for col in CSV_COLUMNS])
+
+    def _save_trace(self, run, map_name, algo_name):
+        """Écrit la trace fusionnée (Worker = all) puis celle de chaque worker, retourne le chemin du fichier"""
+        if not self.trace_capacity:
+            return ""
+        os.makedirs(self.traces_dir, exist_ok=True)
+        trace_path = os.path.join(self.traces_dir, f"{map_name}_{algo_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+
+        with open(trace_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(TRACE_COLUMNS)
+            tagged = [("all", run["trace"])] + [(w["worker_idx"], w["trace"]) for w in run["workers"]]
+            for tag, rows in tagged:
+                for elapsed, evals, best in rows:
+                    writer.writerow([tag, f"{elapsed:.3f}", int(evals), f"{best:.2f}"])
+        return trace_path
+
+    def _collect(self, wait=False):
+        """Archive les validations terminées (toutes si wait=True)"""
+        if wait and self.pending:
+            concurrent.futures.wait([job["future"] for job in self.pending])
+
+        still_running = []
+        for job in self.pending:
+            if job["future"].done():
+                self._record(job, job["future"].result())
+            else:
+                still_running.append(job)
+        self.pending = still_running
 
-    def add_solver(self, name, solver_class, params):
+    def _record(self, job, real_metrics):
+        """Range le script validé et ajoute la ligne au CSV"""
+        script_path = job["script_path"]
+        if real_metrics is None:
+            if os.path.exists(script_path):
+                os.remove(script_path)
+            return
+
+        gain_reel, fuel_reel, temps_reel = real_metrics
+        run, params = job["run"], job["params"]
+
+        save_dir = os.path.join(self.results_dir, job["map_name"], job["algo_name"])
+        os.makedirs(save_dir, exist_ok=True)
+
+        final_script_name = f"script_{job['algo_name']}_score_{gain_reel}.txt"
+        final_script_path = os.path.join(save_dir, final_script_name)
+
+        if os.path.exists(final_script_path):
+            os.remove(final_script_path)
+        os.rename(script_path, final_script_path)
+
+        with open(self.csv_path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow([
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                job["map_name"],
+                job["algo_name"],
+                str(params),
+                job["solver_class"].params_fitness_mode(params),
+                f"{run['score']:.2f}",
+                gain_reel,
+                f"{fuel_reel:.2f}",
+                f"{temps_reel:.2f}",
+                final_script_path,
+                run["seed"],
+                run["n_cores"],
+                job["trace_path"],
+                run["full_evals"],
+                run["partial_evals"],
+                f"{run['evals_per_sec']:.0f}",
+                f"{run['evals_per_sec_core']:.0f}",
+                "" if job["gain_bound"] is None else job["gain_bound"],
+                "" if not job["gain_bound"] else f"{(job['gain_bound'] - gain_reel) / job['gain_bound']:.4f}",
+                f"{job['pool_startup']:.2f}"
+            ])
+        print(f"Résultat sauvegardé dans {final_script_path}")
+
+        if self.cache is not None:
+            self.cache.put(
+                job["map_path"], job["solver_class"], job["cache_params"],
+                {
+                    "path": [int(i) for i in run["path"]],
+                    "score": run["score"],
+                    "run_seed": run["seed"],
+                    "gain": gain_reel,
+                    "fuel": fuel_reel,
+                    "temps": temps_reel,
+                    "script_path": final_script_path,
+                    "trace_path": job["trace_path"],
+                },
+                seed=self.seed, n_cores=run["n_cores"], time_budget=job["time_budget"]
+            )
+
+    def add_solver(self, name, solver_class, params, time_budget=None, warm_start=None, polish=None):
+        """
+        :param time_budget: budget dur (s) propre à cet algorithme, prioritaire sur celui du pipeline
+        :param warm_start: nom (ou liste de noms) d'algorithmes déjà passés sur la carte dont le chemin
+                           sert de départ (paramètre init_paths), et/ou "results" pour le meilleur
+                           script archivé sous results/<carte>/
+        :param polish: voisinages de recherche locale ("2opt", "swap", "oropt", "3opt", "all" ou liste)
+                       appliqués au meilleur chemin avant validation, None = pas de finition
+        """
         self.solvers.append({
             "name": name,
             "class": solver_class,
-            "params": params
+            "params": params,
+            "time_budget": time_budget,
+            "warm_start": warm_start,
+            "polish": polish
         })
 
-    def run_all(self, map_loader_func, target_map=None):
+    def _add_bound_job(self, scheduler, context):
+        """
+        Majorant prouvé du gain sur la carte (l'optimum si la recherche exacte aboutit), relu du cache
+        ou calculé par un lancement de BranchAndBoundSolver sur un worker qui reçoit les threads d'un lancement
+        long entier : il précède tous les lancements de la carte
+        Retourne la clé du lancement dont dépendent ceux de la carte, None s'il n'y en a pas
+        """
+        if not self.bound_budget:
+            return None
+        params = {"time_limit": self.bound_budget}
+        if self.cache is not None:
+            cached = self.cache.get(context["map_path"], BranchAndBoundSolver, params)
+            if cached is not None:
+                context["gain_bound"] = cached["gain_bound"]
+                print(f"Majorant du gain sur {context['map_name']} : {context['gain_bound']}")
+                return None
+
+        def on_done(job, run):
+            info = run["workers"][0]["info"] if run["workers"] else {}
+            context["gain_bound"] = info.get("gain_bound")
+            print(f"Majorant du gain sur {context['map_name']} : {context['gain_bound']}")
+            if self.cache is not None and context["gain_bound"] is not None:
+                self.cache.put(context["map_path"], BranchAndBoundSolver, params, info)
+
+        key = (context["map_name"], "Borne")
+        scheduler.add(key, BranchAndBoundSolver, params, context["cylinders"], n_workers=1, threads=scheduler.workers_per_job, on_done=on_done)
+        return key
+
+    def _best_archived_path(self, map_name, cylinders):
+        """Chemin du meilleur script archivé pour cette carte (gain du nom de fichier), rejoué hors Unity"""
+        map_dir = os.path.join(self.results_dir, map_name)
+        best_gain, best_script = None, None
+        if os.path.isdir(map_dir):
+            for root, _, files in os.walk(map_dir):
+                for name in files:
+                    match = re.search(r"_score_(\d+)\.txt$", name)
+                    if match and (best_gain is None or int(match.group(1)) > best_gain):
+                        best_gain, best_script = int(match.group(1)), os.path.join(root, name)
+        if best_script is None:
+            return None
+        with open(best_script, 'r', encoding='utf-8') as f:
+            return script_to_path(cylinders, f.read())
+
+    def _warm_start_paths(self, warm_start, map_name, cylinders, map_paths):
+        """Chemins de départ d'un algorithme sur cette carte (map_paths : chemins des algorithmes déjà passés)"""
+        if not warm_start:
+            return []
+        sources = [warm_start] if isinstance(warm_start, str) else warm_start
+        paths = []
+        for source in sources:
+            path = self._best_archived_path(map_name, cylinders) if source == "results" else map_paths.get(source)
+            if path:
+                paths.append(path)
+            else:
+                print(f"Démarrage à chaud : aucun chemin disponible pour '{source}'")
+        return paths
+
+    def run_all(self, map_loader_func, target_map=None, refresh=False):
+        """
+        Tous les lancements (cartes x algorithmes) passent par un seul pool de processus (JobScheduler) :
+        un lancement démarre dès que ses coeurs sont libres et que les algorithmes dont il part
+        (warm_start) ont terminé sur la même carte
+        :param refresh: True = ignore le cache pour tous les algorithmes,
+                        ou liste de noms d'algorithmes à recalculer
+        """
 
         if target_map:
             map_files = [target_map]
@@ -39,60 +263,118 @@ class EvaluationPipeline:
             map_files = [f for f in os.listdir(self.data_dir) if f.endswith(".txt")]
         
         print(f"Début du Pipeline : {len(map_files)} cartes trouvées, {len(self.solvers)} algorithmes à tester.")
+
+        # pool persistant, préchauffé une fois pour tous les solveurs : aucun lancement ne paie
+        # le démarrage des processus ni le chargement des noyaux Numba
+        start_time = time.time()
+        classes = [solver_config["class"] for solver_config in self.solvers]
+        if self.bound_budget:
+            classes.append(BranchAndBoundSolver)
+        pool = WorkerPool.shared(resolve_n_cores(self.n_cores), classes)
+        self.pool_startup = time.time() - start_time
+        print(f"Pool de processus prêt : {self.pool_startup:.1f}s de démarrage et de préchauffage")
+
+        scheduler = JobScheduler(self.n_cores, self.workers_per_run, pool=pool)
+        names = [solver_config["name"] for solver_config in self.solvers]
         
         for map_file in map_files:
             map_name = os.path.splitext(map_file)[0]
             map_path = os.path.join(self.data_dir, map_file)
-            cylinders = map_loader_func(map_path)
-            
-            print(f"\n=============================================")
-            print(f"TRAITEMENT DE LA CARTE : {map_name}")
-            print(f"=============================================")
+            context = {
+                "map_name": map_name,
+                "map_path": map_path,
+                "cylinders": map_loader_func(map_path),
+                # meilleurs chemins des algorithmes déjà passés sur cette carte (démarrages à chaud)
+                "map_paths": {},
+                "gain_bound": None,
+            }
+            bound_key = self._add_bound_job(scheduler, context)
             
-            for solver_config in self.solvers:
-                algo_name = solver_config["name"]
-                params = solver_config["params"]
-                
-                print(f"\nAlgo : {algo_name}")
-                print(f"Params : {params}")
-                
-                best_path, best_score = ParallelRunner.run(solver_config["class"], params, cylinders)
-                
-                temp_script = os.path.join(self.results_dir, "temp_script.txt")
-
-                translator = RobotTranslator(cylinders=cylinders)
-                translator.generate_script(best_path, temp_script)
-                
-                real_metrics = self.unity_runner.run_simulation(map_path, temp_script)
-                
-                if real_metrics is not None:
-                    gain_reel, fuel_reel, temps_reel = real_metrics
-                    
-                    save_dir = os.path.join(self.results_dir, map_name, algo_name)
-                    os.makedirs(save_dir, exist_ok=True)
-                    
-                    final_script_name = f"script_{algo_name}_score_{gain_reel}.txt"
-                    final_script_path = os.path.join(save_dir, final_script_name)
-                    
-                    if os.path.exists(final_script_path):
-                        os.remove(final_script_path)
-                    os.rename(temp_script, final_script_path)
-                    
-                    with open(self.csv_path, 'a', newline='', encoding='utf-8') as f:
-                        writer = csv.writer(f)
-                        writer.writerow([
-                            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            map_name,
-                            algo_name,
-                            str(params),
-                            params.get('fitness_mode', 0),
-                            f"{best_score:.2f}",
-                            gain_reel,
-                            f"{fuel_reel:.2f}",
-                            f"{temps_reel:.2f}",
-                            final_script_path
-                        ])
-                    print(f"Résultat sauvegardé dans {final_script_path}")
-                else:
-                    if os.path.exists(temp_script):
-                        os.remove(temp_script)
\ No newline at end of file
+            for position, solver_config in enumerate(self.solvers):
+                warm_start = solver_config["warm_start"] or []
+                sources = [warm_start] if isinstance(warm_start, str) else warm_start
+                depends_on = [(map_name, source) for source in sources if source in names[:position]]
+                if bound_key is not None:
+                    depends_on.append(bound_key)
+
+                scheduler.add(
+                    (map_name, solver_config["name"]), solver_config["class"], solver_config["params"], context["cylinders"],
+                    seed=self.seed,
+                    time_budget=solver_config["time_budget"] or self.time_budget,
+                    trace_capacity=self.trace_capacity,
+                    depends_on=depends_on,
+                    prepare=partial(self._prepare_run, context, solver_config, refresh),
+                    on_done=partial(self._finish_run, context, solver_config),
+                    polish=solver_config["polish"]
+                )
+
+        try:
+            scheduler.run()
+        finally:
+            scheduler.shutdown()
+
+        print(f"\nAttente des {len(self.pending)} validations en cours")
+        self._collect(wait=True)
+
+    def _prepare_run(self, context, solver_config, refresh, job):
+        """Paramètres du lancement (démarrage à chaud compris), None si le résultat est déjà en cache"""
+        map_name, algo_name = context["map_name"], solver_config["name"]
+        params = solver_config["params"]
+
+        print(f"\nAlgo : {algo_name} sur {map_name}")
+        print(f"Params : {params}")
+        
+        solver_params = params
+        init_paths = self._warm_start_paths(solver_config["warm_start"], map_name, context["cylinders"], context["map_paths"])
+        if init_paths:
+            solver_params = dict(params, init_paths=init_paths)
+            print(f"Démarrage à chaud depuis {solver_config['warm_start']}")
+        
+        polish = solver_config["polish"]
+        job.cache_params = dict(solver_params, polish=polish) if polish else solver_params
+
+        use_cache = self.cache is not None and not (refresh is True or (refresh and algo_name in refresh))
+        if use_cache:
+            cached = self.cache.get(context["map_path"], solver_config["class"], job.cache_params, self.seed, job.n_workers, job.time_budget)
+            if cached is not None:
+                print(f"Résultat en cache du {cached['date']} : gain={cached['gain']}, score={cached['score']:_.2f} ({cached['script_path']})")
+                context["map_paths"][algo_name] = cached["path"]
+                return None
+        return solver_params
+
+    def _finish_run(self, context, solver_config, job, run):
+        """Script et validation (asynchrone) du meilleur chemin d'un lancement (déjà fini par ses workers)"""
+        map_name, map_path, cylinders = context["map_name"], context["map_path"], context["cylinders"]
+        algo_name, params = solver_config["name"], solver_config["params"]
+        best_path = run["path"]
+
+        if best_path is None:
+            print(f"{algo_name} : aucun chemin obtenu dans le budget de {job.time_budget}s, algorithme ignoré sur {map_name}")
+            return
+
+        context["map_paths"][algo_name] = best_path
+        trace_path = self._save_trace(run, map_name, algo_name)
+        
+        # script propre à ce lancement : il attend sa validation pendant que les suivants tournent
+        pending_dir = os.path.join(self.results_dir, "pending")
+        script_path = os.path.join(pending_dir, f"{map_name}_{algo_name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.txt")
+
+        translator = RobotTranslator(cylinders=cylinders)
+        translator.generate_script(best_path, script_path)
+        
+        self.pending.append({
+            "future": self.simulators.submit(map_path, script_path),
+            "map_name": map_name,
+            "algo_name": algo_name,
+            "params": params,
+            "cache_params": job.cache_params,
+            "run": run,
+            "script_path": script_path,
+            "trace_path": trace_path,
+            "map_path": map_path,
+            "solver_class": solver_config["class"],
+            "time_budget": job.time_budget,
+            "gain_bound": context["gain_bound"],
+            "pool_startup": self.pool_startup,
+        })
+        self._collect()
@@ -0,0 +1,99 @@
+import os
+import json
+import hashlib
+from datetime import datetime
+
+import numpy as np
+
+from maps import map_hash
+
+def _canonical(obj):
+    """Sérialisation stable des paramètres non JSON (tableaux numpy, classes...)"""
+    if isinstance(obj, np.ndarray):
+        return {"ndarray": hashlib.sha256(np.ascontiguousarray(obj).tobytes()).hexdigest(), "shape": obj.shape, "dtype": obj.dtype.str}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, type):
+        return f"{obj.__module__}.{obj.__qualname__}"
+    return repr(obj)
+
+class ResultCache:
+    """
+    Résultats déjà calculés, adressés par leur contenu : empreinte du fichier de carte, classe du solveur,
+    paramètres, seed, nombre de coeurs et budget. Un fichier JSON par résultat dans cache_dir
+    seed=None est une clé comme une autre : le premier résultat obtenu sans seed fixé est réutilisé
+    """
+    def __init__(self, cache_dir="results/cache"):
+        self.cache_dir = cache_dir
+
+    def describe(self, map_path, solver_class, params, seed=None, n_cores=None, time_budget=None):
+        """Champs de la clé (également enregistrés dans l'entrée pour l'invalidation)"""
+        return {
+            "map": map_hash(map_path),
+            "solver": f"{solver_class.__module__}.{solver_class.__qualname__}",
+            "params": json.loads(json.dumps(params, sort_keys=True, default=_canonical)),
+            "seed": seed,
+            "n_cores": n_cores,
+            "time_budget": time_budget,
+        }
+
+    def key(self, description):
+        payload = json.dumps(description, sort_keys=True, default=_canonical)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, map_path, solver_class, params, seed=None, n_cores=None, time_budget=None):
+        """Entrée en cache (dict) ou None"""
+        key = self.key(self.describe(map_path, solver_class, params, seed, n_cores, time_budget))
+        try:
+            with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, map_path, solver_class, params, result, seed=None, n_cores=None, time_budget=None):
+        """
+        Enregistre un résultat : dict sérialisable en JSON (chemin, score, métriques du simulateur...)
+        Retourne la clé
+        """
+        description = self.describe(map_path, solver_class, params, seed, n_cores, time_budget)
+        key = self.key(description)
+        entry = dict(result, key=key, description=description, date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(entry, f, default=_canonical)
+        os.replace(path + ".tmp", path)
+        return key
+
+    def entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        with open(path, 'r', encoding='utf-8') as f:
+                            yield path, json.load(f)
+                    except (OSError, ValueError):
+                        continue
+
+    def invalidate(self, map_path=None, solver_class=None):
+        """Supprime les entrées de cette carte et/ou de ce solveur (tout le cache si aucun filtre), retourne leur nombre"""
+        map_key = map_hash(map_path) if map_path is not None else None
+        solver = f"{solver_class.__module__}.{solver_class.__qualname__}" if solver_class is not None else None
+
+        removed = 0
+        for path, entry in list(self.entries()):
+            description = entry.get("description", {})
+            if map_key is not None and description.get("map") != map_key:
+                continue
+            if solver is not None and description.get("solver") != solver:
+                continue
+            os.remove(path)
+            removed += 1
+        return removed
@@ -1,82 +1,61 @@
-import math
 import os
+import numpy as np
+from utils_solver import translate_paths, map_geometry
 
 class RobotTranslator:
     """
     Traducteur intelligent qui simule exactement la physique pour éviter la désynchronisation des angles après une collision de balayage
+    Les trajets viennent de simulate_trajectory : le script exécute exactement le parcours évalué par les solveurs
+    Sans état : le même traducteur sert pour autant de chemins que voulu
     """
     def __init__(self, cylinders, R_col=0.45, start_x=0.0, start_y=0.0, start_angle=0.0):
-        self.cylinders = cylinders
-        self.R_col_sq = R_col ** 2
-        self.x = start_x
-        self.y = start_y
-        self.angle = start_angle
-        self.instructions = []
-        self.visited = 0
+        # le modèle physique part de l'origine : la carte est décalée pour que le départ y soit,
+        # les commandes (rotations relatives et distances) n'en dépendent pas
+        self.cylinders = np.array(cylinders, dtype=np.float64)
+        self.cylinders[:, 0] -= start_x
+        self.cylinders[:, 1] -= start_y
+        self.R_col = R_col
+        self.start_angle = start_angle
+        self.geom = map_geometry(self.cylinders, R_col)
 
-    def generate_script(self, best_path, filepath="results/script_robot.txt"):
+    def commands(self, paths):
         """
-        Lit l'ordre des cibles intentionnelles, simule les collisions,
-        et génère les vraies commandes synchronisées
+        Commandes de plusieurs chemins en un appel du noyau compilé
+        Retourne (turns en degrés, gos) de forme (P, n) et le nombre de commandes de chaque chemin
         """
-        for target_idx in best_path:
-            while not (self.visited & (1 << target_idx)):
-                target_x = self.cylinders[target_idx, 0]
-                target_y = self.cylinders[target_idx, 1]
-                
-                dx = target_x - self.x
-                dy = target_y - self.y
-                D = math.hypot(dx, dy)
-                
-                if D < 1e-6:
-                    self.visited |= (1 << target_idx)
-                    break
-                    
-                target_angle = math.atan2(dy, dx)
-                rotation = target_angle - self.angle
-                
-                rotation = (rotation + math.pi) % (2 * math.pi) - math.pi
-                
-                self.instructions.append(f"TURN {math.degrees(rotation):.5f}")
-                self.instructions.append(f"GO {D:.5f}")
-                
-                hit_idx = target_idx
-                min_t = D
-                
-                for i in range(len(self.cylinders)):
-                    if self.visited & (1 << i): continue
-                    if i == target_idx: continue
-                    
-                    cx, cy = self.cylinders[i, 0], self.cylinders[i, 1]
-                    vx, vy = cx - self.x, cy - self.y
-                    dot = vx * dx + vy * dy
-                    
-                    if dot <= 0: continue
-                    
-                    t = dot / D
-                    if t >= min_t: continue
-                    
-                    d_sq = (vx**2 + vy**2) - t**2
-                    if d_sq <= self.R_col_sq:
-                        dist_to_hit = t - math.sqrt(abs(self.R_col_sq - d_sq))
-                        if dist_to_hit < min_t:
-                            min_t = dist_to_hit
-                            hit_idx = i
-                            
-                self.x = self.cylinders[hit_idx, 0]
-                self.y = self.cylinders[hit_idx, 1]
-                
-                self.angle = target_angle 
-                self.visited |= (1 << hit_idx)
+        paths = np.atleast_2d(np.asarray(paths, dtype=np.int32))
+        return translate_paths(paths, self.cylinders, self.R_col, self.start_angle, self.geom)
 
-        dir_name = os.path.dirname(filepath)
-        if dir_name:
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    def scripts(self, paths):
+        """Texte TURN / GO / FINISH de chaque chemin"""
+        turns, gos, n_cmds = self.commands(paths)
+        scripts = []
+        for p, k in enumerate(n_cmds):
+            values = np.empty(2 * k, dtype=np.float64)
+            values[0::2] = turns[p, :k]
+            values[1::2] = gos[p, :k]
+            scripts.append(("TURN %.5f\nGO %.5f\n" * k) % tuple(values) + "FINISH")
+        return scripts
 
+    def generate_scripts(self, paths, filepaths):
+        """Écrit le script de chaque chemin dans le fichier correspondant"""
+        for script, filepath in zip(self.scripts(paths), filepaths):
+            self._write(script, filepath)
 
+    @staticmethod
+    def _write(script, filepath):
+        dir_name = os.path.dirname(filepath)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
         with open(filepath, 'w', encoding='utf-8') as f:
-            for instruction in self.instructions:
-                f.write(instruction + "\n")
-            f.write("FINISH")
-                
-        print(f"Script généré avec succès ({len(self.instructions)} instructions) vers : {filepath}")
\ No newline at end of file
+            f.write(script)
+
+    def generate_script(self, best_path, filepath="results/script_robot.txt"):
+        """
+        Lit l'ordre des cibles intentionnelles, simule les collisions,
+        et génère les vraies commandes synchronisées
+        """
+        script = self.scripts([best_path])[0]
+        self._write(script, filepath)
+        n_instructions = script.count("\n")
+        print(f"Script généré avec succès ({n_instructions} instructions) vers : {filepath}")
@@ -0,0 +1,58 @@
+import os
+import queue
+import concurrent.futures
+
+from unity_runner import UnityRunner
+
+class SimulatorPool:
+    """
+    Ferme de simulateurs : N instances lancées en parallèle, chacune dans son propre dossier
+    d'échange, derrière une interface de futures
+    """
+    def __init__(self, exe_path, n_instances=1, sandbox_root=None):
+        """
+        :param exe_path: exécutable (ou commande) du simulateur, voir UnityRunner
+        :param n_instances: nombre de simulations simultanées
+        :param sandbox_root: dossier contenant un sous-dossier instance_<k> par instance.
+                             None = dossier par défaut de UnityRunner, une seule instance possible
+        """
+        if sandbox_root is None and n_instances > 1:
+            raise ValueError("sandbox_root est requis pour plus d'une instance de simulateur")
+
+        self.n_instances = n_instances
+        self.runners = queue.Queue()
+        for k in range(n_instances):
+            if sandbox_root is None:
+                runner = UnityRunner(exe_path)
+            else:
+                runner = UnityRunner(exe_path, challenge_dir=os.path.join(sandbox_root, f"instance_{k}"))
+            self.runners.put(runner)
+
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=n_instances)
+
+    def _run(self, map_source, script_source, timeout):
+        runner = self.runners.get()
+        try:
+            return runner.run_simulation(map_source, script_source, timeout)
+        finally:
+            self.runners.put(runner)
+
+    def submit(self, map_source, script_source, timeout=610):
+        """
+        Met une validation en file, retourne un Future de (gain, fuel, temps) ou None
+        Le script ne doit pas être modifié avant la fin de la simulation
+        """
+        return self.executor.submit(self._run, map_source, script_source, timeout)
+
+    def run_simulation(self, map_source, script_source, timeout=610):
+        """Validation bloquante, même interface que UnityRunner"""
+        return self.submit(map_source, script_source, timeout).result()
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
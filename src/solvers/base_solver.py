@@ -1,10 +1,148 @@
+import time
+import inspect
+import numpy as np
+from utils_solver import N_COUNTERS, COUNT_TRACE_LEN, COUNT_FULL_EVALS, COUNT_PARTIAL_EVALS, complete_permutation, trace_point
+
 class BaseSolver:
     """Classe abstraite pour tous les algorithmes de résolution"""
+    board = None
+    worker_idx = 0
+    n_workers = 1
+
+    # meilleur chemin connu (consultable à tout moment pendant solve())
+    best_path = None
+    best_score = -float('inf')
+    deadline = None
+
+    # chemins de démarrage à chaud (listes d'indices), fournis par les paramètres du solveur
+    init_paths = None
+
+    # trace de convergence optionnelle (instant, évaluations, meilleur score) et compteurs des noyaux
+    trace = None
+    counters = None
+
+    # durée typique (s) d'un solve() sans limite de temps, utilisée par JobScheduler
+    # pour regrouper les lancements courts (None = inconnue, traité comme un long calcul)
+    cost_hint = None
+
     def __init__(self, **kwargs):
         pass
 
-    def solve(self, cylinders):
+    def solve(self, cylinders, deadline=None):
         """
         Doit retourner un tuple: (meilleur_chemin_liste, meilleur_score)
+        :param deadline: instant limite absolu (time.time()), None = pas de limite
+                         Une fois atteint, le solveur rend au plus vite son meilleur chemin
+        """
+        raise NotImplementedError("La méthode solve() doit être implémentée")
+
+    def start_budget(self, deadline=None):
+        """
+        Démarre un nouveau solve() : remet à zéro le meilleur chemin et fixe l'instant limite,
+        le plus proche entre time_limit (si le solveur en a un) et deadline
         """
-        raise NotImplementedError("La méthode solve() doit être implémentée")
\ No newline at end of file
+        self.best_path = None
+        self.best_score = -float('inf')
+        self.counters = np.zeros(N_COUNTERS, dtype=np.int64)
+
+        limits = []
+        time_limit = getattr(self, "time_limit", None)
+        if time_limit:
+            limits.append(time.time() + time_limit)
+        if deadline:
+            limits.append(deadline)
+        self.deadline = min(limits) if limits else None
+        return self.deadline
+
+    @property
+    def kernel_deadline(self):
+        """Instant limite au format des noyaux Numba (0.0 = pas de limite)"""
+        return self.deadline or 0.0
+
+    def budget_exhausted(self):
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def update_incumbent(self, path, score):
+        """
+        Enregistre un chemin s'il bat le meilleur connu, et le publie dans le tableau partagé
+        de ParallelRunner pour qu'il survive à l'arrêt forcé du worker
+        """
+        if score <= self.best_score:
+            return False
+        self.best_score = score
+        self.best_path = [int(i) for i in path]
+
+        board = self.board
+        if board is not None and "incumbent_scores" in board:
+            board["incumbent_paths"][self.worker_idx] = self.best_path
+            board["incumbent_scores"][self.worker_idx] = score
+            board["incumbent_ready"][self.worker_idx] = 1
+
+        # les noyaux tracent leurs propres améliorations, ceci couvre les solveurs sans noyau
+        trace_point(self.trace, self.counters, score)
+        return True
+
+    def run_info(self):
+        """Informations propres au solveur renvoyées avec le résultat du worker (dictionnaire picklable)"""
+        return {}
+
+    def incumbent(self):
+        """Meilleur (chemin, score) trouvé jusqu'ici"""
+        return self.best_path, self.best_score
+
+    def evaluation_counts(self):
+        """(évaluations complètes, évaluations partielles) faites par les noyaux pendant le dernier solve()"""
+        if self.counters is None:
+            return 0, 0
+        return int(self.counters[COUNT_FULL_EVALS]), int(self.counters[COUNT_PARTIAL_EVALS])
+
+    def initial_paths(self, n):
+        """
+        Chemins de démarrage à chaud sous forme de tableau (k, n) int32, None s'il n'y en a pas
+        Chaque chemin est complété en permutation (voir complete_permutation)
+        """
+        if not self.init_paths:
+            return None
+        return np.array([complete_permutation(path, n) for path in self.init_paths], dtype=np.int32)
+
+    def enable_trace(self, capacity=4096):
+        """Active l'enregistrement de la trace de convergence par les noyaux (capacité en lignes)"""
+        self.trace = np.zeros((capacity, 3), dtype=np.float64)
+
+    def trace_rows(self):
+        """Lignes (instant absolu, évaluations, meilleur score) enregistrées pendant le dernier solve()"""
+        if self.trace is None or self.counters is None:
+            return np.zeros((0, 3), dtype=np.float64)
+        return self.trace[:self.counters[COUNT_TRACE_LEN]].copy()
+
+    @classmethod
+    def params_fitness_mode(cls, params):
+        """fitness_mode d'un solveur construit avec params : le paramètre, sinon le défaut du constructeur"""
+        if "fitness_mode" in params:
+            return params["fitness_mode"]
+        parameter = inspect.signature(cls.__init__).parameters.get("fitness_mode")
+        if parameter is None or parameter.default is inspect.Parameter.empty:
+            return 0
+        return parameter.default
+
+    @classmethod
+    def shared_layout(cls, params, n_workers, n_cylinders):
+        """
+        Tableaux partagés entre les workers de ParallelRunner, {nom: (shape, dtype)}
+        None si le solveur travaille de manière isolée
+        """
+        return None
+
+    @classmethod
+    def warmup_params(cls, n_cylinders):
+        """
+        Paramètres de quelques solve() très courts qui passent par toutes les signatures des noyaux
+        du solveur (préchauffage des workers de WorkerPool), [] = pas de noyau compilé à préchauffer
+        """
+        return []
+
+    def attach_board(self, board, worker_idx, n_workers):
+        """Rattache le worker au tableau partagé créé par ParallelRunner"""
+        self.board = board
+        self.worker_idx = worker_idx
+        self.n_workers = n_workers
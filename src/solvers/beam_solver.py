@@ -1,5 +1,5 @@
 from .base_solver import BaseSolver
-from utils_solver import beam_search_core
+from utils_solver import beam_search_core, map_geometry
 
 class BeamSearchSolver(BaseSolver):
     def __init__(self, beam_width=2000, fitness_mode=0):
@@ -7,13 +7,23 @@ class BeamSearchSolver(BaseSolver):
         self.beam_width = beam_width
         self.fitness_mode = fitness_mode
 
-    def solve(self, cylinders):
+    @classmethod
+    def warmup_params(cls, n_cylinders):
+        return [dict(beam_width=4)]
+
+    def solve(self, cylinders, deadline=None):
+        self.start_budget(deadline)
         print(f"Lancement du Beam Search (Largeur K={self.beam_width}, Mode={self.fitness_mode})")
         
         best_path_array, best_score = beam_search_core(
             cylinders, 
             beam_width=self.beam_width,
-            fitness_mode=self.fitness_mode
+            fitness_mode=self.fitness_mode,
+            deadline=self.kernel_deadline,
+            trace=self.trace,
+            counters=self.counters,
+            geom=map_geometry(cylinders)
         )
         
-        return best_path_array.tolist(), best_score
\ No newline at end of file
+        self.update_incumbent(best_path_array, best_score)
+        return self.incumbent()
\ No newline at end of file
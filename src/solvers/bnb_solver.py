@@ -0,0 +1,44 @@
+from .base_solver import BaseSolver
+from utils_solver import branch_and_bound_core, evaluate_path, map_geometry
+
+class BranchAndBoundSolver(BaseSolver):
+    def __init__(self, time_limit=None, table_bits=18):
+        """
+        Recherche exacte du gain maximal (modèle fitness_mode 0) par séparation et évaluation
+        :param time_limit: au-delà, rend le meilleur chemin trouvé et un majorant prouvé du gain
+        :param table_bits: log2 du nombre d'entrées de la table de dominance de chaque sous-arbre
+        """
+        self.time_limit = time_limit
+        self.table_bits = table_bits
+        self.fitness_mode = 0
+
+        # résultat du dernier solve() : majorant prouvé du gain (l'optimum si proven)
+        self.gain_bound = None
+        self.proven = False
+
+    def run_info(self):
+        return {"gain_bound": self.gain_bound, "proven": self.proven}
+
+    @classmethod
+    def warmup_params(cls, n_cylinders):
+        return [dict(table_bits=8)]
+
+    def solve(self, cylinders, deadline=None):
+        if len(cylinders) > 63:
+            raise ValueError(f"BranchAndBoundSolver : au plus 63 cylindres ({len(cylinders)} fournis)")
+        self.start_budget(deadline)
+        geom = map_geometry(cylinders)
+
+        gain, path, self.gain_bound, self.proven = branch_and_bound_core(
+            cylinders, geom,
+            deadline=self.kernel_deadline,
+            table_bits=self.table_bits,
+            counters=self.counters
+        )
+
+        status = "optimum prouvé" if self.proven else f"majorant {self.gain_bound:.0f}"
+        print(f"Branch and Bound : gain {gain:.0f} ({status})")
+
+        score = evaluate_path(path, cylinders, self.fitness_mode, geom=geom)[0]
+        self.update_incumbent(path, score)
+        return self.incumbent()
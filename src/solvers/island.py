@@ -0,0 +1,67 @@
+import numpy as np
+
+# relectures d'une élite en cours de réécriture avant de renoncer à la migration de l'époque
+READ_RETRIES = 8
+
+def island_layout(params, n_workers, n_cylinders):
+    """Tableau partagé du modèle en îles : les meilleurs individus publiés par chaque worker"""
+    if not params.get("island", False) or n_workers < 2:
+        return None
+    n_migrants = params.get("n_migrants", 5)
+    return {
+        "migrants": ((n_workers, n_migrants, n_cylinders), np.int32),
+        "migrant_fits": ((n_workers, n_migrants), np.float64),
+        # seqlock de l'élite de chaque île : impair pendant l'écriture, 0 = rien de publié
+        "version": ((n_workers,), np.int64),
+    }
+
+def publish_migrants(board, worker_idx, migrants, fits):
+    """Écrit l'élite de l'île worker_idx (seul écrivain de sa ligne) sous son seqlock"""
+    version = board["version"]
+    version[worker_idx] += 1
+    board["migrants"][worker_idx] = migrants
+    board["migrant_fits"][worker_idx] = fits
+    version[worker_idx] += 1
+
+def read_migrants(board, source):
+    """
+    Copie cohérente de l'élite publiée par l'île source et de ses fitness : relue tant qu'une écriture
+    l'a modifiée pendant la copie. Seuls les individus qui sont des permutations sont gardés
+    None si rien n'est publié ou si aucune copie cohérente n'a pu être lue
+    """
+    version = board["version"]
+    for _ in range(READ_RETRIES):
+        before = int(version[source])
+        if before == 0:
+            return None
+        if before % 2:
+            continue
+        migrants = board["migrants"][source].copy()
+        fits = board["migrant_fits"][source].copy()
+        if int(version[source]) == before:
+            n = migrants.shape[1]
+            valid = (np.sort(migrants, axis=1) == np.arange(n)).all(axis=1)
+            return migrants[valid], fits[valid]
+    return None
+
+def exchange_migrants(board, worker_idx, n_workers, population, fitnesses):
+    """
+    Migration en anneau : publie l'élite de cette île et remplace ses pires individus
+    par l'élite publiée par l'île précédente (si elle en a déjà publié une)
+    Retourne la population de départ de la prochaine époque et ses fitness, toutes déjà connues
+    (les îles partagent les paramètres du solveur, donc le même fitness_mode)
+    """
+    n_migrants = board["migrants"].shape[1]
+    order = np.argsort(fitnesses)[::-1]
+
+    publish_migrants(board, worker_idx, population[order[:n_migrants]], fitnesses[order[:n_migrants]])
+
+    next_population = population[order].copy()
+    next_fitnesses = fitnesses[order].copy()
+    received = read_migrants(board, (worker_idx - 1) % n_workers)
+    if received is not None and len(received[0]):
+        migrants, fits = received
+        next_population[-len(migrants):] = migrants
+        next_fitnesses[-len(migrants):] = fits
+
+    return next_population, next_fitnesses
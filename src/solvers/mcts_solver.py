@@ -1,137 +1,151 @@
-import math
 import time
 import numpy as np
 from .base_solver import BaseSolver
-from utils_solver import fast_random_rollout
+from utils_solver import bitset_words, evaluate_path, mcts_init_tree, mcts_search_core, mcts_root_stats, mcts_seed_path, map_geometry
 
 class MCTSSolver(BaseSolver):
-    def __init__(self, iterations=100000, exploration_constant=1.414, time_limit=None, fitness_mode=0):
-
+    def __init__(self, iterations=100000, exploration_constant=1.414, time_limit=None, fitness_mode=0, max_nodes=1_000_000, batch_size=10_000, parallel_mode=None, sync_interval=2.0, init_paths=None, prior_visits=10):
+        """
+        :param max_nodes: Taille du pool de noeuds (mémoire bornée, l'arbre cesse de grandir une fois plein)
+        :param batch_size: Nombre d'itérations par appel du noyau compilé (granularité des synchronisations)
+        :param parallel_mode: None (arbres indépendants) ou "root" (statistiques de la racine fusionnées entre workers)
+        :param sync_interval: Période (s) de fusion des statistiques de la racine en mode "root"
+        :param init_paths: chemins insérés dans l'arbre avant la recherche (démarrage à chaud)
+        :param prior_visits: visites virtuelles attribuées à chaque noeud de ces chemins
+        """
         self.iterations = iterations
         self.C = exploration_constant
         self.time_limit = time_limit
         self.fitness_mode = fitness_mode
-        
-        self.tree = {}
+        self.max_nodes = max_nodes
+        self.batch_size = batch_size
+        self.parallel_mode = parallel_mode
+        self.sync_interval = sync_interval
+        self.init_paths = init_paths
+        self.prior_visits = prior_visits
+
         self.n_cylinders = 0
-        
-        self.global_min_score = float('inf')
-        self.global_max_score = -float('inf')
+        self.node_count = 0
+        self.iterations_done = 0
+        self.root_visits = 0
+        self.shared_root_visits = 0
+
+    @classmethod
+    def shared_layout(cls, params, n_workers, n_cylinders):
+        if params.get("parallel_mode") != "root" or n_workers < 2:
+            return None
+        return {
+            "root_visits": ((n_workers, n_cylinders), np.int64),
+            "root_values": ((n_workers, n_cylinders), np.float64),
+            "bounds": ((n_workers, 2), np.float64),
+            "ready": ((n_workers,), np.int64),
+        }
+
+    def _allocate_tree(self, n):
+        """Pool de noeuds en tableaux plats : liens, visites, somme des valeurs, actions non essayées"""
+        self.node_links = np.empty((self.max_nodes, 6), dtype=np.int32)
+        self.node_visits = np.empty(self.max_nodes, dtype=np.int64)
+        self.node_values = np.empty(self.max_nodes, dtype=np.float64)
+        self.node_untried = np.empty((self.max_nodes, bitset_words(n)), dtype=np.int64)
+
+    def memory_bytes(self):
+        """Empreinte mémoire du pool de noeuds"""
+        return self.node_links.nbytes + self.node_visits.nbytes + self.node_values.nbytes + self.node_untried.nbytes
+
+    def _sync_root(self, bounds, ext_visits, ext_values):
+        """
+        Publie les statistiques de la racine de ce worker et récupère la somme de celles des autres
+        Les bornes de normalisation sont élargies aux scores vus par tous les workers
+        """
+        board = self.board
+        w = self.worker_idx
+
+        mcts_root_stats(self.node_links, self.node_visits, self.node_values,
+                        board["root_visits"][w], board["root_values"][w])
+        board["bounds"][w, 0] = bounds[0]
+        board["bounds"][w, 1] = bounds[1]
+        board["ready"][w] = 1
+
+        ext_visits[:] = board["root_visits"].sum(axis=0) - board["root_visits"][w]
+        ext_values[:] = board["root_values"].sum(axis=0) - board["root_values"][w]
+
+        ready = board["ready"] == 1
+        bounds[0] = min(bounds[0], board["bounds"][ready, 0].min())
+        bounds[1] = max(bounds[1], board["bounds"][ready, 1].max())
+
+    def run_info(self):
+        return {"iterations": self.iterations_done, "root_visits": self.root_visits, "shared_root_visits": self.shared_root_visits}
 
-        self.rollout_buffer = np.zeros(20, dtype=np.int32)
-        self.full_path_buffer = np.zeros(20, dtype=np.int32)
+    @classmethod
+    def warmup_params(cls, n_cylinders):
+        params = dict(iterations=20, max_nodes=1000, batch_size=10)
+        return [params, dict(params, init_paths=[list(range(n_cylinders))])]
 
-    def solve(self, cylinders):
+    def solve(self, cylinders, deadline=None):
+        self.start_budget(deadline)
         self.n_cylinders = len(cylinders)
-        root_state = ()
-        
-        self.tree[root_state] = [0, 0.0, list(range(self.n_cylinders))]
-        
-        best_overall_score = -float('inf')
-        best_overall_path = None
-        
+        self._allocate_tree(self.n_cylinders)
+        self.node_count = mcts_init_tree(self.node_links, self.node_visits, self.node_values, self.node_untried, self.n_cylinders)
+
+        # [score min, score max, meilleur score]
+        bounds = np.array([np.inf, -np.inf, -np.inf], dtype=np.float64)
+        best_path = np.arange(self.n_cylinders, dtype=np.int32)
+        geom = map_geometry(cylinders)
+
+        init_paths = self.initial_paths(self.n_cylinders)
+        if init_paths is not None:
+            for path in init_paths:
+                score = evaluate_path(path, cylinders, self.fitness_mode, geom=geom)[0]
+                self.node_count = mcts_seed_path(path, score, self.prior_visits, self.node_count,
+                                                 self.node_links, self.node_visits, self.node_values, self.node_untried)
+                bounds[0] = min(bounds[0], score)
+                bounds[1] = max(bounds[1], score)
+                if score > bounds[2]:
+                    bounds[2] = score
+                    best_path[:] = path
+            self.update_incumbent(best_path, bounds[2])
+
+        # statistiques de la racine des autres workers (mode "root")
+        ext_visits = np.zeros(self.n_cylinders, dtype=np.int64)
+        ext_values = np.zeros(self.n_cylinders, dtype=np.float64)
+        shared = self.board is not None and self.parallel_mode == "root" and "root_visits" in self.board
+
         start_time = time.time()
-        
-        for i in range(self.iterations):
-            if self.time_limit and (time.time() - start_time) > self.time_limit:
-                break
-                
-            #Selection
-            node_state = root_state
-            path_list = list(node_state)
-
-            while not self.tree[node_state][2] and len(node_state) < self.n_cylinders:
-                best_child = self._select_best_child(node_state)
-                if best_child is None:
-                    break
-
-                node_state = best_child
-                path_list = list(node_state)
-                
-            #Expansion
-            if len(node_state) < self.n_cylinders and self.tree[node_state][2]:
-                idx = np.random.randint(len(self.tree[node_state][2]))
-                action = self.tree[node_state][2].pop(idx)
-                
-                path_list.append(action)
-                node_state = tuple(path_list)
-                
-                untried = [c for c in range(self.n_cylinders) if c not in node_state]
-                self.tree[node_state] = [0, 0.0, untried]
-                
-            #Rollout
-            prefix_len = len(path_list)
-            for k in range(prefix_len):
-                self.rollout_buffer[k] = path_list[k]
-            score = fast_random_rollout(self.rollout_buffer, prefix_len, self.full_path_buffer, cylinders, self.fitness_mode)
-            
-            if math.isnan(score) or math.isinf(score):
-                continue
-
-            if score < self.global_min_score:
-                self.global_min_score = score
-            if score > self.global_max_score:
-                self.global_max_score = score
-                
-            if score > best_overall_score:
-                best_overall_score = score
-                best_overall_path = self.full_path_buffer.copy()
-
-
-            #Backpropagation
-            current_backprop = path_list.copy()
-            state_tuple = tuple(current_backprop)
-            
-            while True:
-                # màj du noeud
-                self.tree[state_tuple][0] += 1  # N += 1
-                self.tree[state_tuple][1] += score  # Q += score
-                
-                if len(state_tuple) == 0:
-                    break
-                current_backprop.pop()
-                state_tuple = tuple(current_backprop)
+        last_sync = start_time
+        done = 0
+
+        while done < self.iterations and not self.budget_exhausted():
+            batch = min(self.batch_size, self.iterations - done)
+            self.node_count, batch_done = mcts_search_core(
+                cylinders, batch, self.C, self.node_count,
+                self.node_links, self.node_visits, self.node_values, self.node_untried,
+                bounds, best_path, ext_visits, ext_values, self.fitness_mode,
+                deadline=self.kernel_deadline,
+                trace=self.trace,
+                counters=self.counters,
+                geom=geom
+            )
+            done += batch_done
+            self.update_incumbent(best_path, bounds[2])
+
+            if shared and time.time() - last_sync >= self.sync_interval:
+                self._sync_root(bounds, ext_visits, ext_values)
+                last_sync = time.time()
+
+        if shared:
+            self._sync_root(bounds, ext_visits, ext_values)
+
+        own_visits = np.zeros(self.n_cylinders, dtype=np.int64)
+        mcts_root_stats(self.node_links, self.node_visits, self.node_values, own_visits, np.zeros(self.n_cylinders))
+        self.iterations_done = done
+        self.root_visits = int(own_visits.sum())
+        self.shared_root_visits = self.root_visits + int(ext_visits.sum())
 
         elapsed = time.time() - start_time
-        print(f"MCTS terminé: {i+1} itérations en {elapsed:.2f}s")
-        print(f"Meilleur score trouvé : {best_overall_score:_.2f}")
-        
-        return best_overall_path.tolist(), best_overall_score
-
-    def _select_best_child(self, state):
-        """Sélectionne l'enfant maximisant la formule UCB1 avec la normalisation"""
-        best_score = -float('inf')
-        best_child = None
-        
-        parent_visits = self.tree[state][0]
-        
-        for action in range(self.n_cylinders):
-            if action in state:
-                continue
-                
-            child_state = state + (action,)
-            if child_state in self.tree:
-                child_node = self.tree[child_state]
-                n_visits = child_node[0]
-                q_value = child_node[1]
-                
-                if n_visits == 0:
-                    return child_state
-                    
-                average_reward = q_value / n_visits
-                
-                # normalisation [0, 1]
-                if self.global_max_score > self.global_min_score:
-                    normalized_reward = (average_reward - self.global_min_score) / (self.global_max_score - self.global_min_score)
-                else:
-                    normalized_reward = 0.5
-                
-                # formule UCB1
-                exploration = self.C * math.sqrt(math.log(parent_visits) / n_visits)
-                uct_score = normalized_reward + exploration
-                
-                if uct_score > best_score:
-                    best_score = uct_score
-                    best_child = child_state
-                    
-        return best_child
\ No newline at end of file
+        print(f"MCTS terminé: {done} itérations en {elapsed:.2f}s")
+        print(f"Arbre : {self.node_count:_} / {self.max_nodes:_} noeuds ({self.memory_bytes() / 1e6:.1f} Mo)")
+        if shared:
+            print(f"Racine partagée : {ext_visits.sum():_} visites reçues des autres workers")
+        print(f"Meilleur score trouvé : {bounds[2]:_.2f}")
+
+        return self.incumbent()
@@ -1,13 +1,19 @@
-import time
+import numpy as np
 from .base_solver import BaseSolver
-from utils_solver import memetic_algorithm_core
+from .island import island_layout, exchange_migrants
+from utils_solver import memetic_algorithm_core, map_geometry, move_mask
 
 class MemeticSolver(BaseSolver):
-    def __init__(self, pop_size=100, generations=200, tournament_size=5, mutation_rate=0.2, ls_rate=1.0, ls_max_steps=30, elitism_ratio=0.1, time_limit=900.0, fitness_mode=1):
+    def __init__(self, pop_size=100, generations=200, tournament_size=5, mutation_rate=0.2, ls_rate=1.0, ls_max_steps=30, elitism_ratio=0.1, time_limit=900.0, fitness_mode=1, island=False, migration_interval=20, n_migrants=5, init_paths=None, ls_moves="2opt"):
         """
         :param mutation_rate: Probabilité de subir une mutation aléatoire avant la recherche locale.
         :param ls_rate: Probabilité qu'un enfant fasse une Recherche Locale (1.0 = tous)
         :param ls_max_steps: Nombre max d'améliorations par descente de gradient
+        :param ls_moves: Voisinages de la recherche locale : "2opt", "swap", "oropt", "3opt", "all" ou une liste
+        :param island: Modèle en îles : les workers de ParallelRunner échangent leurs élites
+        :param migration_interval: Nombre de générations entre deux migrations
+        :param n_migrants: Nombre d'individus publiés / reçus à chaque migration
+        :param init_paths: chemins placés dans la population initiale (démarrage à chaud)
         """
         self.pop_size = pop_size
         self.generations = generations
@@ -15,37 +21,78 @@ class MemeticSolver(BaseSolver):
         self.mutation_rate = mutation_rate
         self.ls_rate = ls_rate
         self.ls_max_steps = ls_max_steps
+        self.ls_moves = move_mask(ls_moves)
         self.elitism_count = max(1, int(pop_size * elitism_ratio))
         self.time_limit = time_limit
         self.fitness_mode = fitness_mode
+        self.island = island
+        self.migration_interval = migration_interval
+        self.n_migrants = n_migrants
+        self.init_paths = init_paths
 
-    def solve(self, cylinders):
-        global_best_score = -float('inf')
-        global_best_path = None
-        
-        start_time = time.time()
+        self.generations_done = 0
+
+    def run_info(self):
+        return {"generations": self.generations_done}
+
+    @classmethod
+    def shared_layout(cls, params, n_workers, n_cylinders):
+        return island_layout(params, n_workers, n_cylinders)
+
+    @classmethod
+    def warmup_params(cls, n_cylinders):
+        params = dict(pop_size=8, generations=2, ls_max_steps=2, time_limit=None)
+        return [params, dict(params, init_paths=[list(range(n_cylinders))])]
+
+    def solve(self, cylinders, deadline=None):
+        # sans time_limit ni deadline, on s'arrête après self.generations générations
+        self.start_budget(deadline)
         epochs = 0
-        
-        while time.time() - start_time < self.time_limit:
-            score, path = memetic_algorithm_core(
-                cylinders, 
-                pop_size=self.pop_size, 
-                generations=self.generations, 
-                tournament_size=self.tournament_size, 
+        total_gens = 0
+
+        # en mode îles, la population continue d'une époque à l'autre avec les migrants
+        migrate = self.island and self.board is not None and "migrants" in self.board
+        generations = self.migration_interval if migrate else self.generations
+        population = self.initial_paths(len(cylinders))
+        # fitness connues de population : aucune au départ (un tableau vide garde la signature préchauffée du noyau)
+        population_fitnesses = np.zeros(0, dtype=np.float64)
+        geom = map_geometry(cylinders)
+
+        while True:
+            score, path, final_population, fitnesses, gens_done = memetic_algorithm_core(
+                cylinders,
+                pop_size=self.pop_size,
+                generations=generations,
+                tournament_size=self.tournament_size,
                 mutation_rate=self.mutation_rate,
                 ls_rate=self.ls_rate,
                 ls_max_steps=self.ls_max_steps,
                 elitism_count=self.elitism_count,
-                fitness_mode=self.fitness_mode
+                fitness_mode=self.fitness_mode,
+                init_population=population,
+                init_fitnesses=population_fitnesses,
+                deadline=self.kernel_deadline,
+                trace=self.trace,
+                counters=self.counters,
+                geom=geom,
+                ls_moves=self.ls_moves
             )
-            
-            if score > global_best_score:
-                global_best_score = score
-                global_best_path = path.copy()
-                
+
+            self.update_incumbent(path, score)
+
+            if migrate:
+                population, population_fitnesses = exchange_migrants(self.board, self.worker_idx, self.n_workers, final_population, fitnesses)
+
             epochs += 1
-            
-        total_gens = epochs * self.generations
-        print(f"{epochs} écosystèmes ({total_gens} générations) simulés")
-        
-        return global_best_path.tolist(), global_best_score
\ No newline at end of file
+            total_gens += gens_done
+
+            if self.budget_exhausted() or (self.deadline is None and total_gens >= self.generations):
+                break
+
+        self.generations_done = total_gens
+        if migrate:
+            print(f"{epochs} migrations ({total_gens} générations) sur l'île {self.worker_idx}")
+        else:
+            print(f"{epochs} écosystèmes ({total_gens} générations) simulés")
+
+        return self.incumbent()
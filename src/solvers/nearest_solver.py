@@ -6,11 +6,13 @@ class NearestSolver(BaseSolver):
     Solveur Glouton : Se dirige systématiquement vers le cylindre non visité 
     le plus proche géométriquement, sans aucune considération pour la masse ou les points.
     """
+    cost_hint = 0.01
+
     def __init__(self, current_position=[0.0, 0.0], fitness_mode=0):
         self.fitness_mode = fitness_mode
         self.position = np.array(current_position, dtype=np.float64)
 
-    def solve(self, cylinders):
+    def solve(self, cylinders, deadline=None):
         n = len(cylinders)
         visited = np.zeros(n, dtype=bool)
         res_indices = []
@@ -2,52 +2,268 @@ import os
 import time
 import numpy as np
 import concurrent.futures
-from utils_solver import set_numba_seed
+from numba import config, set_num_threads
+from utils_solver import polish_path, set_numba_seed
+from .shared_board import SharedBoard
+from .worker_pool import WorkerPool
 
-def _worker_task(solver_class, solver_kwargs, cylinders, seed):
+def worker_seeds(seed_seq):
+    """Seeds (numpy, numba) dérivés d'un flux SeedSequence indépendant"""
+    np_seed, numba_seed = seed_seq.generate_state(2)
+    return int(np_seed), int(numba_seed)
+
+def resolve_n_cores(n_cores=None):
+    """Nombre de workers effectivement lancés par ParallelRunner"""
+    return n_cores if n_cores is not None else (os.cpu_count() or 4)
+
+def incumbent_layout(n_workers, n_cylinders):
+    """Meilleur chemin courant de chaque worker, relu si le worker doit être arrêté de force"""
+    return {
+        "incumbent_paths": ((n_workers, n_cylinders), np.int32),
+        "incumbent_scores": ((n_workers,), np.float64),
+        "incumbent_ready": ((n_workers,), np.int64),
+    }
+
+def merge_traces(worker_traces):
+    """
+    Fusionne les traces (temps écoulé, évaluations, meilleur score) des workers en une trace globale :
+    une ligne à chaque amélioration du meilleur score tous workers confondus, avec le total des
+    évaluations faites par l'ensemble des workers à cet instant
+    """
+    events = sorted(
+        (row[0], w, row[1], row[2])
+        for w, rows in enumerate(worker_traces)
+        for row in rows
+    )
+    last_evals = [0.0] * len(worker_traces)
+    best = -float('inf')
+    merged = []
+    for elapsed, w, evals, score in events:
+        last_evals[w] = evals
+        if score > best:
+            best = score
+            merged.append((elapsed, sum(last_evals), best))
+    return np.array(merged, dtype=np.float64).reshape(-1, 3)
+
+def _worker_task(solver_class, solver_kwargs, cylinders, seed_seq, board_spec=None, worker_idx=0, n_workers=1, deadline=None, trace_capacity=None, polish=None, pool_size=None):
     """
     Fonction isolée exécutée par chaque coeur
-    Le seed unique garantit que chaque MCTS explore des branches différentes
+    Chaque worker reçoit son propre flux SeedSequence : les explorations sont
+    indépendantes et rejouables à l'identique à partir du seed maître
+    :param polish: voisinages de la finition (polish_path) du chemin du worker, None = pas de finition
+    :param pool_size: nombre de processus du pool qui se partagent la machine (None = n_workers)
     """
-    np.random.seed(seed)
-    set_numba_seed(seed)
+    np_seed, numba_seed = worker_seeds(seed_seq)
+    np.random.seed(np_seed)
+    set_numba_seed(numba_seed)
+    # les threads Numba (évaluation des populations par lots) sont répartis entre les processus du pool
+    set_num_threads(max(1, config.NUMBA_NUM_THREADS // (pool_size or n_workers)))
     solver = solver_class(**solver_kwargs)
-    return solver.solve(cylinders)
+    if trace_capacity:
+        solver.enable_trace(trace_capacity)
 
-class ParallelRunner:
-    
-    @staticmethod
-    def run(solver_class, solver_kwargs, cylinders, n_cores=None):
-        if n_cores is None:
-            n_cores = os.cpu_count() or 4
-            
-        print(f"Déploiement de {solver_class.__name__} sur {n_cores} coeurs")
-        
-        all_results = []
-        
-        with concurrent.futures.ProcessPoolExecutor(max_workers=n_cores) as executor:
-            # Création des tâches avec des seeds distincts
-            futures = [
-                executor.submit(
-                    _worker_task, 
-                    solver_class, 
-                    solver_kwargs, 
-                    cylinders, 
-                    int(time.time() * 1000) % (i + 12345)
-                )
-                for i in range(n_cores)
-            ]
-            
-            for future in concurrent.futures.as_completed(futures):
-                all_results.append(future.result())
-                
-        # Récupération du champion absolu
+    start_time = time.time()
+
+    if board_spec is None:
+        path, score = solver.solve(cylinders, deadline)
+        path, score = _polish(solver, solver_kwargs, cylinders, path, score, polish)
+    else:
+        board = SharedBoard.attach(board_spec)
+        try:
+            solver.attach_board(board, worker_idx, n_workers)
+            path, score = solver.solve(cylinders, deadline)
+            # le chemin fini est aussi publié, pour survivre à un arrêt forcé pendant la finition
+            path, score = _polish(solver, solver_kwargs, cylinders, path, score, polish)
+        finally:
+            solver.board = None
+            board.close()
+
+    trace = solver.trace_rows()
+    if trace_capacity and len(trace) == 0:
+        # solveur sans noyau instrumenté : un seul point, au moment du résultat
+        trace = np.array([[time.time(), 0.0, score]], dtype=np.float64)
+
+    elapsed = time.time() - start_time
+    full_evals, partial_evals = solver.evaluation_counts()
+
+    return {
+        "worker_idx": worker_idx,
+        "path": path,
+        "score": score,
+        "interrupted": False,
+        "trace": trace,
+        "elapsed": elapsed,
+        "full_evals": full_evals,
+        "partial_evals": partial_evals,
+        "evals_per_sec": (full_evals + partial_evals) / elapsed if elapsed > 0 else 0.0,
+        "info": solver.run_info(),
+    }
+
+def _polish(solver, solver_kwargs, cylinders, path, score, polish):
+    """
+    Finition du chemin rendu par le solveur, dans le fitness_mode du solveur, faite par le worker
+    lui-même (après l'instant limite s'il y en a un : elle tient dans le délai de grâce)
+    Retourne le meilleur (chemin, score) entre le chemin rendu et le chemin fini
+    """
+    if not polish or path is None:
+        return path, score
+    fitness_mode = type(solver).params_fitness_mode(solver_kwargs)
+    polished_path, polished_score, start_score = polish_path(path, cylinders, fitness_mode, polish)
+    print(f"Finition ({polish}, mode {fitness_mode}) : {start_score:_.2f} -> {polished_score:_.2f}")
+    if polished_score > start_score:
+        solver.update_incumbent(polished_path, polished_score)
+        return polished_path, polished_score
+    return path, score
+
+class RunHandle:
+    """
+    Un lancement d'un solveur sur n_workers workers : flux aléatoires, mémoire partagée, instant limite
+    et assemblage du résultat. Les tâches (task_args) sont soumises par l'appelant à son propre pool
+    """
+    def __init__(self, solver_class, solver_kwargs, cylinders, n_workers, seed=None, time_budget=None, trace_capacity=None, grace=5.0, polish=None):
+        self.solver_class = solver_class
+        self.solver_kwargs = solver_kwargs
+        self.cylinders = cylinders
+        self.n_workers = n_workers
+        self.time_budget = time_budget
+        self.trace_capacity = trace_capacity
+        self.grace = grace
+        self.polish = polish
+
+        self.master = np.random.SeedSequence(seed)
+        self.streams = self.master.spawn(n_workers)
+
+        # Mémoire partagée entre workers (meilleurs chemins courants, statistiques MCTS, migrants...)
+        layout = dict(incumbent_layout(n_workers, len(cylinders)))
+        layout.update(solver_class.shared_layout(solver_kwargs, n_workers, len(cylinders)) or {})
+        self.board = SharedBoard(layout)
+
+        self.start_time = None
+        self.deadline = None
+
+    def start(self):
+        """Démarre le chronomètre du lancement, à appeler juste avant de soumettre les tâches"""
+        self.start_time = time.time()
+        self.deadline = self.start_time + self.time_budget if self.time_budget else None
+
+    @property
+    def kill_time(self):
+        """Instant au-delà duquel les workers encore actifs sont abandonnés (None = jamais)"""
+        return None if self.deadline is None else self.deadline + self.grace
+
+    def task_args(self, i, pool_size=None):
+        """Arguments de _worker_task pour le worker i"""
+        return (self.solver_class, self.solver_kwargs, self.cylinders, self.streams[i], self.board.spec,
+                i, self.n_workers, self.deadline, self.trace_capacity, self.polish, pool_size)
+
+    def close(self):
+        if self.board is not None:
+            self.board.close()
+            self.board = None
+
+    def finish(self, results, late=()):
+        """
+        Résultat du lancement à partir des résultats des workers terminés ; les workers de late
+        sont remplacés par leur meilleur chemin publié dans la mémoire partagée
+        """
+        all_results = list(results)
+        for i in late:
+            print(f"Worker {i} arrêté de force : budget de {self.time_budget}s dépassé")
+            if self.board["incumbent_ready"][i]:
+                all_results.append({
+                    "worker_idx": i,
+                    "path": self.board["incumbent_paths"][i].tolist(),
+                    "score": float(self.board["incumbent_scores"][i]),
+                    "interrupted": True,
+                    "trace": np.zeros((0, 3), dtype=np.float64),
+                    # compteurs perdus avec le processus
+                    "elapsed": time.time() - self.start_time,
+                    "full_evals": 0,
+                    "partial_evals": 0,
+                    "evals_per_sec": 0.0,
+                    "info": {},
+                })
+        self.close()
+
+        wall_time = time.time() - self.start_time
+        full_evals = sum(r["full_evals"] for r in all_results)
+        partial_evals = sum(r["partial_evals"] for r in all_results)
+        evals_per_sec = (full_evals + partial_evals) / wall_time if wall_time > 0 else 0.0
+        evals_per_sec_core = sum(r["evals_per_sec"] for r in all_results) / max(1, len(all_results))
+        print(f"Évaluations : {full_evals:_} complètes + {partial_evals:_} partielles en {wall_time:.1f}s "
+              f"({evals_per_sec:_.0f}/s au total, {evals_per_sec_core:_.0f}/s par coeur)")
+
+        # Récupération du champion absolu (ordre des workers fixe pour rester rejouable)
+        all_results.sort(key=lambda r: r["worker_idx"])
+        for result in all_results:
+            result["trace"][:, 0] -= self.start_time
         global_best_score = -float('inf')
         global_best_path = None
-        
-        for path, score in all_results:
-            if score > global_best_score:
-                global_best_score = score
-                global_best_path = path
-                
-        return global_best_path, global_best_score
\ No newline at end of file
+
+        for result in all_results:
+            if result["score"] > global_best_score:
+                global_best_score = result["score"]
+                global_best_path = result["path"]
+
+        return {
+            "path": global_best_path,
+            "score": global_best_score,
+            "seed": self.master.entropy,
+            "n_cores": self.n_workers,
+            "workers": all_results,
+            "interrupted": sum(r["interrupted"] for r in all_results),
+            "trace": merge_traces([r["trace"] for r in all_results]),
+            "wall_time": wall_time,
+            "full_evals": full_evals,
+            "partial_evals": partial_evals,
+            "evals_per_sec": evals_per_sec,
+            "evals_per_sec_core": evals_per_sec_core,
+        }
+
+class ParallelRunner:
+
+    @staticmethod
+    def run(solver_class, solver_kwargs, cylinders, n_cores=None, seed=None, time_budget=None):
+        result = ParallelRunner.run_detailed(solver_class, solver_kwargs, cylinders, n_cores, seed, time_budget)
+        return result["path"], result["score"]
+
+    @staticmethod
+    def run_detailed(solver_class, solver_kwargs, cylinders, n_cores=None, seed=None, time_budget=None, grace=5.0, trace_capacity=None, pool=None, polish=None):
+        """
+        Comme run(), mais retourne un dictionnaire avec le champion et les métadonnées du lancement
+        :param seed: seed maître (None = entropie du système) ; il est retourné dans "seed"
+                     et permet de rejouer le lancement avec le même nombre de coeurs
+        :param time_budget: budget dur (s) du lancement, transmis aux solveurs sous forme d'instant limite
+        :param grace: délai (s) laissé aux workers après l'instant limite avant leur arrêt forcé ;
+                      leur meilleur chemin publié dans la mémoire partagée est alors récupéré
+        :param trace_capacity: nombre max de points de la trace de convergence par worker (None = pas de trace)
+                               Les traces sont retournées en temps écoulé depuis le lancement, par worker
+                               et fusionnées ("trace")
+        :param pool: WorkerPool d'au moins n_cores workers (None = pool commun du processus, démarré
+                     et préchauffé au premier lancement puis réutilisé par les suivants)
+        :param polish: voisinages de la finition faite par chaque worker sur son chemin (None = aucune)
+        """
+        n_cores = resolve_n_cores(n_cores)
+        if pool is None:
+            pool = WorkerPool.shared(n_cores, [solver_class])
+        run = RunHandle(solver_class, solver_kwargs, cylinders, n_cores, seed, time_budget, trace_capacity, grace, polish)
+
+        print(f"Déploiement de {solver_class.__name__} sur {n_cores} coeurs (seed={run.master.entropy})")
+
+        try:
+            # Création des tâches avec des flux aléatoires indépendants
+            run.start()
+            futures = [pool.submit(_worker_task, *run.task_args(i, pool.n_cores)) for i in range(n_cores)]
+
+            timeout = None if run.kill_time is None else max(0.0, run.kill_time - time.time())
+            done, late = concurrent.futures.wait(futures, timeout=timeout)
+
+            results = [future.result() for future in done]
+            late = [futures.index(future) for future in late]
+
+            if late:
+                # le pool redémarre (et se préchauffe) au lancement suivant
+                pool.terminate_workers()
+            return run.finish(results, late)
+        finally:
+            run.close()
@@ -1,37 +1,118 @@
-import time
+import numpy as np
 from .base_solver import BaseSolver
-from utils_solver import simulated_annealing_core
+from utils_solver import simulated_annealing_core, parallel_tempering_core, map_geometry
 
 class SASolver(BaseSolver):
-    def __init__(self, t_init=10000.0, t_final=0.001, alpha=0.99999, time_limit=900.0, fitness_mode=0):
+    def __init__(self, t_init=10000.0, t_final=0.001, alpha=0.99999, time_limit=900.0, fitness_mode=0, init_paths=None, mode="anneal", n_replicas=16, exchange_interval=500, rounds=2000, rounds_per_call=50):
+        """
+        :param init_paths: chemins de départ (démarrage à chaud), utilisés tour à tour par les cycles de recuit
+        :param mode: "anneal" (cycles de recuit relancés jusqu'à la fin du budget) ou "tempering"
+                     (échange de répliques entre t_final et t_init, sans refroidissement)
+        :param n_replicas: nombre de températures de l'échelle en mode "tempering"
+        :param exchange_interval: pas de Metropolis par réplique entre deux tentatives d'échange
+        :param rounds: nombre de manches sans time_limit ni deadline
+        :param rounds_per_call: manches par appel du noyau compilé (granularité de publication du meilleur chemin)
+        """
 
         self.t_init = t_init
         self.t_final = t_final
         self.alpha = alpha
         self.time_limit = time_limit
         self.fitness_mode = fitness_mode
+        self.init_paths = init_paths
+        self.mode = mode
+        self.n_replicas = n_replicas
+        self.exchange_interval = exchange_interval
+        self.rounds = rounds
+        self.rounds_per_call = rounds_per_call
 
-    def solve(self, cylinders):
-        global_best_score = -float('inf')
-        global_best_path = None
-        
-        start_time = time.time()
+        # résultat du dernier solve() en mode "tempering" : échelle finale, taux d'échange et manches faites
+        self.temperatures = None
+        self.swap_rates = None
+        self.rounds_done = 0
+
+    @classmethod
+    def warmup_params(cls, n_cylinders):
+        anneal = dict(t_init=10.0, t_final=1.0, alpha=0.5, time_limit=None)
+        # deux appels du noyau : le second reprend chemins et températures du premier
+        tempering = dict(mode="tempering", n_replicas=2, exchange_interval=2, rounds=2, rounds_per_call=1, time_limit=None)
+        init_paths = [list(range(n_cylinders))]
+        return [anneal, dict(anneal, init_paths=init_paths), tempering, dict(tempering, init_paths=init_paths)]
+
+    def solve(self, cylinders, deadline=None):
+        self.start_budget(deadline)
+        if self.mode == "tempering":
+            return self._solve_tempering(cylinders)
+        if self.mode != "anneal":
+            raise ValueError(f"Mode inconnu : {self.mode}")
+
+        # sans time_limit ni deadline, un seul cycle de recuit
+        init_paths = self.initial_paths(len(cylinders))
+        geom = map_geometry(cylinders)
         restarts = 0
         
-        while time.time() - start_time < self.time_limit:
+        while True:
             score, path = simulated_annealing_core(
                 cylinders,
                 fitness_mode=self.fitness_mode, 
                 T_init=self.t_init, 
                 T_final=self.t_final, 
-                alpha=self.alpha
+                alpha=self.alpha,
+                deadline=self.kernel_deadline,
+                trace=self.trace,
+                counters=self.counters,
+                init_path=None if init_paths is None else init_paths[restarts % len(init_paths)],
+                geom=geom
             )
             
-            if score > global_best_score:
-                global_best_score = score
-                global_best_path = path.copy()
-                
+            self.update_incumbent(path, score)
             restarts += 1
             
+            if self.deadline is None or self.budget_exhausted():
+                break
+            
         print(f"{restarts} cycles de Recuit Simulé effectués sur ce coeur")
-        return global_best_path.tolist(), global_best_score
\ No newline at end of file
+        return self.incumbent()
+
+    def _solve_tempering(self, cylinders):
+        """
+        Les répliques reprennent à chaque appel du noyau là où l'appel précédent s'est arrêté
+        (chemins et échelle de températures), seul l'état des caches est recalculé
+        """
+        init_paths = self.initial_paths(len(cylinders))
+        paths = None if init_paths is None else np.asarray(init_paths, dtype=np.int32)
+        geom = map_geometry(cylinders)
+        temperatures = None
+        swap_rates = np.zeros(max(self.n_replicas - 1, 0))
+        done = 0
+
+        # sans time_limit ni deadline, self.rounds manches
+        while self.deadline is not None or done < self.rounds:
+            n_rounds = self.rounds_per_call if self.deadline is not None else min(self.rounds_per_call, self.rounds - done)
+            score, path, paths, temperatures, rates, rounds_done = parallel_tempering_core(
+                cylinders, self.n_replicas, self.t_final, self.t_init,
+                self.exchange_interval, n_rounds,
+                fitness_mode=self.fitness_mode,
+                deadline=self.kernel_deadline,
+                trace=self.trace,
+                counters=self.counters,
+                init_paths=paths,
+                temperatures=temperatures,
+                geom=geom
+            )
+            
+            self.update_incumbent(path, score)
+            # manches réellement faites : l'instant limite peut couper l'appel avant n_rounds
+            if rounds_done:
+                swap_rates = (swap_rates * done + rates * rounds_done) / (done + rounds_done)
+                done += rounds_done
+            
+            if self.budget_exhausted():
+                break
+
+        self.temperatures = temperatures
+        self.swap_rates = swap_rates
+        self.rounds_done = done
+        print(f"Échange de répliques : {done} manches, {self.n_replicas} températures, "
+              f"taux d'échange moyen {swap_rates.mean() if len(swap_rates) else 0.0:.2f}")
+        return self.incumbent()
@@ -0,0 +1,265 @@
+import math
+import time
+import concurrent.futures
+from .parallel_runner import RunHandle, _worker_task, resolve_n_cores
+from .worker_pool import WorkerPool
+
+def _packed_task(task_args_list):
+    """Plusieurs tâches de _worker_task exécutées l'une après l'autre par le même processus"""
+    return [_worker_task(*args) for args in task_args_list]
+
+class Job:
+    """Un lancement (carte, algorithme, seed) soumis à JobScheduler"""
+    def __init__(self, key, solver_class, cylinders, n_workers, cost, prepare, on_done, depends_on, seed, time_budget, trace_capacity, threads=1, polish=None):
+        self.key = key
+        self.solver_class = solver_class
+        self.cylinders = cylinders
+        self.n_workers = n_workers
+        self.threads = threads
+        self.cost = cost
+        self.prepare = prepare
+        self.on_done = on_done
+        self.depends_on = depends_on
+        self.seed = seed
+        self.time_budget = time_budget
+        self.trace_capacity = trace_capacity
+        self.polish = polish
+
+        # "waiting" -> "ready" (paramètres connus) -> "running" -> "done"
+        self.state = "waiting"
+        self.solver_kwargs = None
+        self.rank = cost
+        self.run = None
+        self.results = []
+        self.pending = set()
+        self.result = None
+
+    @property
+    def cores(self):
+        """Coeurs occupés par le lancement : chaque worker tient threads coeurs"""
+        return self.n_workers * self.threads
+
+class JobScheduler:
+    """
+    Un seul pool de processus (WorkerPool, préchauffé) pour tous les lancements d'un balayage (cartes x algorithmes x seeds)
+    - un lancement long reçoit n_workers processus, un par coeur, et ne démarre que lorsqu'ils sont libres ;
+      un worker multi-thread (threads > 1) tient plusieurs coeurs et reçoit autant de threads Numba
+    - les lancements courts (coût estimé <= cheap_threshold, sans budget dur) tournent sur un seul
+      worker et sont regroupés par paquets dans une même tâche, sans payer de démarrage de processus
+    - parmi les lancements prêts, le plus long chemin critique (coût du lancement et de tous ceux qui
+      en dépendent) passe en premier : la durée du balayage tend vers celle du chemin critique
+    - un worker qui dépasse son instant limite (plus grace) n'est pas tué, ce qui casserait le pool :
+      son meilleur chemin publié est relevé et le lancement est terminé sans lui
+    """
+    def __init__(self, n_cores=None, workers_per_job=None, cheap_threshold=1.0, pack_size=32, default_cost=60.0, grace=5.0, pool=None):
+        """
+        :param workers_per_job: workers d'un lancement long (None = tous les coeurs)
+        :param cheap_threshold: coût estimé (s) en dessous duquel un lancement est regroupé avec d'autres
+        :param pack_size: nombre max de lancements courts par tâche
+        :param default_cost: coût supposé (s) d'un lancement sans budget ni cost_hint
+        :param pool: WorkerPool de n_cores workers (None = pool commun du processus)
+        """
+        self.n_cores = resolve_n_cores(n_cores) if pool is None else pool.n_cores
+        self.workers_per_job = min(workers_per_job or self.n_cores, self.n_cores)
+        self.cheap_threshold = cheap_threshold
+        self.pack_size = pack_size
+        self.default_cost = default_cost
+        self.grace = grace
+
+        self.jobs = {}
+        self.futures = {}
+        # coeurs tenus par chaque tâche en cours
+        self.busy = {}
+        self.pool = pool
+
+    def estimate_cost(self, solver_class, params, time_budget=None):
+        """Durée estimée (s) d'un lancement : budget, sinon time_limit, sinon cost_hint du solveur"""
+        for cost in (time_budget, params.get("time_limit"), solver_class.cost_hint):
+            if cost is not None:
+                return cost
+        return self.default_cost
+
+    def _packable(self, cost, time_budget):
+        """Lancement court sans budget dur : il peut attendre son tour dans un paquet"""
+        return cost <= self.cheap_threshold and not time_budget
+
+    def is_cheap(self, job):
+        return self._packable(job.cost, job.time_budget)
+
+    def add(self, key, solver_class, params, cylinders, seed=None, time_budget=None, trace_capacity=None, depends_on=(), prepare=None, on_done=None, n_workers=None, threads=1, polish=None):
+        """
+        Ajoute un lancement, retourne son Job
+        :param depends_on: clés des lancements à terminer avant celui-ci
+        :param prepare: prepare(job) -> paramètres du solveur, appelé une fois les dépendances terminées
+                        (démarrage à chaud, cache...) ; None = params, un retour None saute le lancement
+        :param on_done: on_done(job, résultat) appelé à la fin du lancement (dictionnaire de RunHandle.finish)
+        :param n_workers: impose le nombre de workers (None = selon le coût estimé)
+        :param threads: coeurs tenus par chaque worker, qui reçoit autant de threads Numba
+                        (solveur parallélisé en threads, comme BranchAndBoundSolver)
+        :param polish: voisinages de la finition faite par chaque worker sur son chemin (None = aucune)
+        """
+        if key in self.jobs:
+            raise ValueError(f"Lancement déjà soumis : {key}")
+        cost = self.estimate_cost(solver_class, params, time_budget)
+        n_workers = min(n_workers or self.n_workers(solver_class, params, time_budget), self.n_cores)
+        threads = max(1, min(threads, self.n_cores // n_workers))
+        job = Job(key, solver_class, cylinders, n_workers, cost, prepare or (lambda job: params), on_done,
+                  list(depends_on), seed, time_budget, trace_capacity, threads, polish)
+        self.jobs[key] = job
+        return job
+
+    def n_workers(self, solver_class, params, time_budget=None):
+        """Nombre de workers qu'aurait un lancement de ce solveur (clé de cache des résultats)"""
+        cost = self.estimate_cost(solver_class, params, time_budget)
+        return 1 if self._packable(cost, time_budget) else self.workers_per_job
+
+    def _compute_ranks(self):
+        """Rang = coût du lancement + plus long chemin parmi les lancements qui en dépendent"""
+        dependents = {key: [] for key in self.jobs}
+        for job in self.jobs.values():
+            for dep in job.depends_on:
+                if dep not in self.jobs:
+                    raise KeyError(f"{job.key} dépend d'un lancement inconnu : {dep}")
+                dependents[dep].append(job)
+
+        ranks = {}
+        visiting = set()
+
+        def rank(job):
+            if job.key in ranks:
+                return ranks[job.key]
+            if job.key in visiting:
+                raise ValueError(f"Dépendance circulaire autour de {job.key}")
+            visiting.add(job.key)
+            ranks[job.key] = job.cost + max((rank(d) for d in dependents[job.key]), default=0.0)
+            visiting.discard(job.key)
+            return ranks[job.key]
+
+        for job in self.jobs.values():
+            job.rank = rank(job)
+
+    def _start_pool(self):
+        """Pool démarré et préchauffé pour les solveurs des lancements soumis"""
+        classes = [job.solver_class for job in self.jobs.values()]
+        if self.pool is None:
+            self.pool = WorkerPool.shared(self.n_cores, classes)
+        else:
+            self.pool.warm(classes)
+
+    def _prepare_ready(self):
+        """Passe à "ready" les lancements dont les dépendances sont terminées (et termine ceux qui sont sautés)"""
+        changed = True
+        while changed:
+            changed = False
+            for job in self.jobs.values():
+                if job.state != "waiting" or any(self.jobs[dep].state != "done" for dep in job.depends_on):
+                    continue
+                job.solver_kwargs = job.prepare(job)
+                changed = True
+                if job.solver_kwargs is None:
+                    job.state = "done"
+                else:
+                    job.state = "ready"
+
+    def _launch(self, jobs):
+        """Démarre des lancements : un processus par worker, ou une seule tâche pour un paquet de lancements courts"""
+        entries, task_args = [], []
+        threads = jobs[0].threads if len(jobs) == 1 else 1
+        for job in jobs:
+            job.run = RunHandle(job.solver_class, job.solver_kwargs, job.cylinders, job.n_workers, job.seed,
+                                job.time_budget, job.trace_capacity, self.grace, job.polish)
+            job.state = "running"
+            job.pending = set(range(job.n_workers))
+            label = f" x {job.threads} threads" if job.threads > 1 else ""
+            print(f"Lancement de {job.key} : {job.solver_class.__name__} sur {job.n_workers} worker(s){label} (seed={job.run.master.entropy})")
+            job.run.start()
+            for i in range(job.n_workers):
+                entries.append((job, i))
+                # un worker qui tient threads coeurs se comporte comme un pool threads fois plus petit
+                task_args.append(job.run.task_args(i, max(1, self.n_cores // threads)))
+
+        if len(jobs) == 1 and not self.is_cheap(jobs[0]):
+            for entry, args in zip(entries, task_args):
+                future = self.pool.submit(_packed_task, [args])
+                self.futures[future] = [entry]
+                self.busy[future] = threads
+        else:
+            future = self.pool.submit(_packed_task, task_args)
+            self.futures[future] = entries
+            self.busy[future] = 1
+
+    def _schedule(self):
+        """Occupe les coeurs libres : lancements longs par rang décroissant, puis paquets de lancements courts"""
+        ready = sorted((job for job in self.jobs.values() if job.state == "ready"), key=lambda job: -job.rank)
+        free = self.n_cores - sum(self.busy.values())
+
+        cheap = []
+        blocked = False
+        for job in ready:
+            if self.is_cheap(job):
+                cheap.append(job)
+            elif not blocked and job.cores <= free:
+                self._launch([job])
+                free -= job.cores
+            else:
+                # le lancement prioritaire attend que ses coeurs se libèrent, seuls les courts passent devant
+                blocked = True
+
+        if cheap and free > 0:
+            size = min(self.pack_size, math.ceil(len(cheap) / free))
+            for start in range(0, len(cheap), size):
+                if free == 0:
+                    break
+                self._launch(cheap[start:start + size])
+                free -= 1
+
+    def _finish(self, job):
+        late = sorted(job.pending)
+        job.result = job.run.finish(job.results, late)
+        job.state = "done"
+        if job.on_done is not None:
+            job.on_done(job, job.result)
+
+    def run(self):
+        """Exécute tous les lancements soumis, retourne {clé: résultat} (None pour un lancement sauté)"""
+        self._compute_ranks()
+        self._start_pool()
+        start_time = time.time()
+
+        while True:
+            self._prepare_ready()
+            self._schedule()
+            if all(job.state == "done" for job in self.jobs.values()):
+                break
+            if not self.futures:
+                raise RuntimeError("Lancements bloqués : aucun ne peut démarrer")
+
+            running = [job for job in self.jobs.values() if job.state == "running"]
+            kill_times = [job.run.kill_time for job in running if job.run.kill_time is not None]
+            timeout = None if not kill_times else max(0.0, min(kill_times) - time.time())
+            done, _ = concurrent.futures.wait(list(self.futures), timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                self.busy.pop(future)
+                for (job, i), result in zip(self.futures.pop(future), future.result()):
+                    # résultat d'un worker déjà abandonné : le lancement est terminé sans lui
+                    if job.state == "running":
+                        job.results.append(result)
+                        job.pending.discard(i)
+
+            now = time.time()
+            for job in running:
+                if job.state == "running" and (not job.pending or (job.run.kill_time is not None and now >= job.run.kill_time)):
+                    self._finish(job)
+
+        wall_time = time.time() - start_time
+        serial = sum(job.result["wall_time"] for job in self.jobs.values() if job.result is not None)
+        print(f"Balayage terminé en {wall_time:.1f}s (somme des lancements : {serial:.1f}s)")
+        return {key: job.result for key, job in self.jobs.items()}
+
+    def shutdown(self):
+        """Termine les workers abandonnés encore actifs (le pool redémarre à sa prochaine utilisation)"""
+        if self.futures and self.pool is not None:
+            self.pool.terminate_workers()
+        self.futures = {}
+        self.busy = {}
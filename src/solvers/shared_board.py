@@ -0,0 +1,58 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+class SharedBoard:
+    """
+    Tableaux numpy nommés placés dans un même bloc de mémoire partagée
+    Créé par ParallelRunner puis rattaché par chaque worker (lecture/écriture sans verrou)
+    """
+    def __init__(self, layout, name=None):
+        """
+        :param layout: {nom: (shape, dtype)} des tableaux à partager
+        :param name: nom du bloc existant à rattacher (None = création)
+        """
+        self.layout = {key: (tuple(shape), np.dtype(dtype).str) for key, (shape, dtype) in layout.items()}
+        self.owner = name is None
+
+        offsets = {}
+        size = 0
+        for key, (shape, dtype) in self.layout.items():
+            offsets[key] = size
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            size += (nbytes + 7) // 8 * 8
+
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(size, 8))
+        else:
+            # les workers partagent le resource_tracker du créateur, seul responsable de la libération
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.arrays = {
+            key: np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offsets[key])
+            for key, (shape, dtype) in self.layout.items()
+        }
+        if self.owner:
+            for array in self.arrays.values():
+                array.fill(0)
+
+    @property
+    def spec(self):
+        """Description picklable transmise aux workers"""
+        return self.shm.name, self.layout
+
+    @classmethod
+    def attach(cls, spec):
+        name, layout = spec
+        return cls(layout, name=name)
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def __contains__(self, key):
+        return key in self.arrays
+
+    def close(self):
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -2,12 +2,14 @@ import numpy as np
 from .base_solver import BaseSolver
 
 class SimpleSolver(BaseSolver):
+    cost_hint = 0.01
+
     def __init__(self, current_position=[0.0, 0.0], rule="lightest_first", fitness_mode=0):
         self.rule = rule
         self.fitness_mode = fitness_mode
         self.position = np.array(current_position, dtype=np.float64)
 
-    def solve(self, cylinders):
+    def solve(self, cylinders, deadline=None):
         n = len(cylinders)
         visited = np.zeros(n, dtype=bool)
         res_indices = []
@@ -2,6 +2,8 @@ import numpy as np
 from .base_solver import BaseSolver
 
 class WeightedRatioSolver(BaseSolver):
+    cost_hint = 0.01
+
     def __init__(self, current_position=[0.0, 0.0], wp=1.0, wd=1.0, wm=0.0, fitness_mode=0):
         self.position = np.array(current_position, dtype=np.float64)
         self.wp = wp
@@ -9,7 +11,7 @@ class WeightedRatioSolver(BaseSolver):
         self.wm = wm
         self.fitness_mode = fitness_mode
 
-    def solve(self, cylinders):
+    def solve(self, cylinders, deadline=None):
         n = len(cylinders)
         visited = np.zeros(n, dtype=bool)
         res_indices = []
@@ -0,0 +1,183 @@
+import io
+import os
+import time
+import atexit
+import signal
+import contextlib
+import multiprocessing
+import concurrent.futures
+import numpy as np
+from numba import config, set_num_threads
+
+WARMUP_SIZE = 6
+
+# seule la présence de la trace change la signature des noyaux, pas sa capacité
+WARMUP_TRACE = 64
+
+# barrière du pool, transmise à chaque worker à son démarrage (voir WorkerPool.warm)
+_barrier = None
+
+def warmup_map(n=WARMUP_SIZE):
+    """Petite carte fixe sur laquelle chaque solveur passe par tous ses noyaux en quelques millisecondes"""
+    rng = np.random.default_rng(0)
+    cylinders = np.zeros((n, 4), dtype=np.float64)
+    cylinders[:, :2] = rng.uniform(-3.0, 3.0, (n, 2))
+    cylinders[:, 2] = rng.integers(1, 4, n)
+    cylinders[:, 3] = 2 * cylinders[:, 2] - 1
+    return cylinders
+
+def warm_up(solver_classes):
+    """
+    Résout la petite carte avec chaque variante de warmup_params des solveurs, avec et sans trace :
+    toutes les signatures de leurs noyaux sont chargées du cache disque de Numba (compilées la première fois)
+    Retourne la durée (s)
+    """
+    start_time = time.time()
+    cylinders = warmup_map()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for solver_class in solver_classes:
+            for params in solver_class.warmup_params(len(cylinders)):
+                for traced in (False, True):
+                    solver = solver_class(**params)
+                    if traced:
+                        solver.enable_trace(WARMUP_TRACE)
+                    solver.solve(cylinders)
+    return time.time() - start_time
+
+def _init_worker(barrier, pool_size):
+    global _barrier
+    _barrier = barrier
+    # les threads Numba sont répartis entre les processus du pool
+    set_num_threads(max(1, config.NUMBA_NUM_THREADS // pool_size))
+
+def _warm_task(solver_classes):
+    """
+    Préchauffe le worker qui reçoit la tâche puis attend les autres : la barrière garantit
+    que chacun des workers du pool reçoit exactement une de ces tâches
+    """
+    elapsed = warm_up(solver_classes)
+    _barrier.wait()
+    return os.getpid(), elapsed
+
+class WorkerPool:
+    """
+    Pool de processus persistant, démarré une fois et réutilisé par tous les lancements
+    (ParallelRunner, JobScheduler) : les workers importent les modules et chargent les noyaux
+    Numba des solveurs au démarrage (warm), pas au début de chaque lancement
+    """
+    _shared = None
+
+    def __init__(self, n_cores):
+        self.n_cores = n_cores
+        self.executor = None
+        self.barrier = None
+        self.warmed = set()
+        # pid de chaque worker, renvoyé par sa tâche de préchauffage (voir terminate_workers)
+        self.worker_pids = set()
+
+        # durées (s) mesurées au dernier start() / warm()
+        self.startup_time = 0.0
+        self.parent_warmup = 0.0
+        self.worker_warmup = 0.0
+
+    @classmethod
+    def shared(cls, n_cores, solver_classes=()):
+        """
+        Pool commun du processus (recréé si le nombre de coeurs change), démarré et préchauffé
+        pour solver_classes si besoin
+        """
+        pool = cls._shared
+        if pool is None or pool.n_cores != n_cores:
+            if pool is not None:
+                pool.shutdown()
+            pool = cls._shared = cls(n_cores)
+        pool.warm(solver_classes)
+        return pool
+
+    @property
+    def running(self):
+        return self.executor is not None
+
+    def start(self):
+        """Démarre les workers s'ils ne tournent pas (les solveurs déjà préchauffés le sont à nouveau)"""
+        if self.running:
+            return
+        start_time = time.time()
+        ctx = multiprocessing.get_context("spawn")
+        self.barrier = ctx.Barrier(self.n_cores)
+        # spawn : un fork après le démarrage des threads Numba du processus parent bloque ce dernier à sa sortie
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.n_cores, mp_context=ctx,
+            initializer=_init_worker, initargs=(self.barrier, self.n_cores)
+        )
+        warmed, self.warmed = self.warmed, set()
+        self.worker_pids = set()
+        self.warm(warmed)
+        if not self.worker_pids:
+            # rien à préchauffer : les workers passent quand même la barrière pour donner leur pid
+            self._warm_workers([])
+        self.startup_time = time.time() - start_time
+        print(f"Pool de {self.n_cores} workers prêt en {self.startup_time:.1f}s")
+
+    def warm(self, solver_classes):
+        """
+        Préchauffe les noyaux des solveurs pas encore vus, d'abord dans ce processus (le cache disque
+        est rempli une seule fois) puis dans chaque worker. Retourne la durée (s)
+        """
+        if not self.running:
+            self.warmed.update(solver_classes)
+            self.start()
+            return self.startup_time
+
+        todo = list(dict.fromkeys(c for c in solver_classes if c not in self.warmed))
+        if not todo:
+            return 0.0
+        start_time = time.time()
+        self.parent_warmup = warm_up(todo)
+        self.worker_warmup = self._warm_workers(todo)
+        self.warmed.update(todo)
+
+        elapsed = time.time() - start_time
+        names = ", ".join(c.__name__ for c in todo)
+        print(f"Préchauffage ({names}) : {elapsed:.1f}s (processus principal {self.parent_warmup:.1f}s, "
+              f"workers {self.worker_warmup:.1f}s)")
+        return elapsed
+
+    def _warm_workers(self, solver_classes):
+        """Une tâche de préchauffage par worker ; relève leurs pid. Retourne la plus longue durée (s)"""
+        futures = [self.executor.submit(_warm_task, solver_classes) for _ in range(self.n_cores)]
+        results = [future.result() for future in futures]
+        self.worker_pids = {pid for pid, _ in results}
+        return max(elapsed for _, elapsed in results)
+
+    def submit(self, fn, *args):
+        self.start()
+        return self.executor.submit(fn, *args)
+
+    def terminate_workers(self):
+        """
+        Tue les workers (bloqués dans un noyau compilé, sans API publique pour les arrêter) ;
+        le pool redémarre et se préchauffe à nouveau à la prochaine soumission
+        """
+        if not self.running:
+            return
+        for pid in self.worker_pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.executor = None
+        self.worker_pids = set()
+
+    def shutdown(self):
+        if self.running:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        if WorkerPool._shared is self:
+            WorkerPool._shared = None
+
+@atexit.register
+def _shutdown_shared_pool():
+    if WorkerPool._shared is not None:
+        WorkerPool._shared.shutdown()
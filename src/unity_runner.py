@@ -3,9 +3,68 @@ import time
 import shutil
 import subprocess
 import re
+import select
+import ctypes
+import ctypes.util
+
+# Attente par scrutation (sans inotify) : intervalle doublé à chaque réveil inutile
+MIN_POLL_INTERVAL = 0.005
+MAX_POLL_INTERVAL = 0.25
+
+class DirectoryWatcher:
+    """
+    Descripteur inotify (Linux, via ctypes) signalant les fichiers écrits ou déplacés dans un dossier
+    create() retourne None si inotify n'est pas disponible
+    """
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+
+    def __init__(self, fd):
+        self.fd = fd
+
+    @classmethod
+    def create(cls, directory):
+        if os.name != "posix":
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return None
+            mask = cls.IN_CLOSE_WRITE | cls.IN_MOVED_TO | cls.IN_CREATE
+            if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+                os.close(fd)
+                return None
+        except (OSError, AttributeError):
+            return None
+        return cls(fd)
+
+    def drain(self):
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        os.close(self.fd)
+
+def process_exit_fd(process):
+    """pidfd lisible dès la fin du processus (Linux >= 5.3), None sinon"""
+    try:
+        return os.pidfd_open(process.pid)
+    except (AttributeError, OSError):
+        return None
 
 class UnityRunner:
     def __init__(self, exe_path, challenge_dir="C://challenge"):
+        """
+        :param exe_path: chemin de l'exécutable, ou commande complète sous forme de liste
+                         (ex: [sys.executable, "src/fake_simulator.py"])
+        :param challenge_dir: dossier d'échange (carte, script, score) de cette instance. Le simulateur
+                              est lancé dans ce dossier et le reçoit aussi dans la variable CHALLENGE_DIR
+        """
         self.exe_path = exe_path
         self.challenge_dir = challenge_dir
         
@@ -23,28 +82,16 @@ class UnityRunner:
         if os.path.exists(self.score_dest):
             os.remove(self.score_dest)
             
-        print("Lancement de la simulation Unity")
-        process = subprocess.Popen([self.exe_path])
+        print(f"Lancement de la simulation Unity ({self.challenge_dir})")
+        command = list(self.exe_path) if isinstance(self.exe_path, (list, tuple)) else [self.exe_path]
+        env = dict(os.environ, CHALLENGE_DIR=os.path.abspath(self.challenge_dir))
+        process = subprocess.Popen(command, cwd=self.challenge_dir, env=env)
         
-        start_time = time.time()
-        score_data = None
-        
-        while time.time() - start_time < timeout:
-            if os.path.exists(self.score_dest):
-                try:
-                    with open(self.score_dest, 'r', encoding='utf-8') as f:
-                        content = f.read().strip()
-                        if content:
-                            score_data = self._parse_score(content)
-                            if score_data:
-                                break 
-                except IOError:
-                    pass
-            
-            time.sleep(1.0)
+        score_data = self._wait_for_score(process, timeout)
             
         try:
             process.kill()
+            process.wait()
         except:
             pass
             
@@ -55,6 +102,79 @@ class UnityRunner:
             
         return score_data
 
+    def _score_signature(self):
+        """(date de modification, taille) de score.txt, None s'il n'existe pas"""
+        try:
+            st = os.stat(self.score_dest)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read_score(self):
+        try:
+            with open(self.score_dest, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+        except IOError:
+            return None
+        return self._parse_score(content) if content else None
+
+    def _wait_for_score(self, process, timeout):
+        """
+        Attend que score.txt contienne un score valide
+        Réveils sur événement (inotify sur le dossier + pidfd du processus) quand c'est possible,
+        sinon scrutation à intervalle adaptatif. Le fichier n'est relu que s'il a changé.
+        Retourne None au timeout ou dès que le simulateur s'arrête sans avoir écrit de score
+        """
+        deadline = time.time() + timeout
+        watcher = DirectoryWatcher.create(self.challenge_dir)
+        exit_fd = process_exit_fd(process)
+        interval = MIN_POLL_INTERVAL
+        last_signature = None
+        score_data = None
+
+        try:
+            while True:
+                # lu avant poll() : un score écrit juste avant la sortie n'est pas perdu
+                exited = process.poll() is not None
+
+                signature = self._score_signature()
+                if signature is not None and signature != last_signature:
+                    last_signature = signature
+                    interval = MIN_POLL_INTERVAL
+                    score_data = self._read_score()
+                    if score_data:
+                        break
+
+                if exited:
+                    print(f"Le simulateur s'est arrêté (code {process.returncode}) sans score valide")
+                    break
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+
+                if watcher is not None and exit_fd is not None:
+                    ready, _, _ = select.select([watcher.fd, exit_fd], [], [], remaining)
+                    if watcher.fd in ready:
+                        watcher.drain()
+                elif watcher is not None:
+                    # sans pidfd, la sortie du processus est vérifiée à intervalle adaptatif
+                    ready, _, _ = select.select([watcher.fd], [], [], min(interval, remaining))
+                    if ready:
+                        watcher.drain()
+                    else:
+                        interval = min(interval * 2, MAX_POLL_INTERVAL)
+                else:
+                    time.sleep(min(interval, remaining))
+                    interval = min(interval * 2, MAX_POLL_INTERVAL)
+        finally:
+            if watcher is not None:
+                watcher.close()
+            if exit_fd is not None:
+                os.close(exit_fd)
+
+        return score_data
+
     def _parse_score(self, content):
 
         content_normalized = content.replace(',', '.')
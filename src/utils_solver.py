@@ -1,6 +1,8 @@
 import numpy as np
 import math
-from numba import njit
+import time
+import hashlib
+from numba import njit, objmode, prange, get_num_threads
 
 @njit(cache=True)
 def point_segment_distance(x1, y1, x2, y2, x0, y0):
@@ -23,41 +25,233 @@ def point_segment_distance(x1, y1, x2, y2, x0, y0):
     return np.sqrt((x0 - proj_x)**2 + (y0 - proj_y)**2)
 
 
+@njit(cache=True)
+def bitset_words(n):
+    """Nombre de mots int64 d'un bitset de n éléments"""
+    return (n + 63) >> 6
+
+
+@njit(cache=True)
+def bit_test(bits, i):
+    """Teste le bit i d'un bitset multi-mots"""
+    return (bits[i >> 6] >> (i & 63)) & 1
+
+
+@njit(cache=True)
+def bit_set(bits, i):
+    """Met à 1 le bit i d'un bitset multi-mots"""
+    bits[i >> 6] |= np.int64(1) << (i & 63)
+
+
+@njit(cache=True)
+def bit_clear(bits, i):
+    """Met à 0 le bit i d'un bitset multi-mots"""
+    bits[i >> 6] &= ~(np.int64(1) << (i & 63))
+
+
+@njit(cache=True)
+def bits_clear(bits):
+    """Remet à zéro un bitset multi-mots"""
+    for w in range(bits.shape[0]):
+        bits[w] = 0
+
+
+@njit(cache=True)
+def random_permutation_inplace(out):
+    """Remplit out avec une permutation aléatoire de 0..n-1 (Fisher-Yates)"""
+    n = out.shape[0]
+    for i in range(n):
+        out[i] = i
+    for i in range(n - 1, 0, -1):
+        j = np.random.randint(0, i + 1)
+        tmp = out[i]
+        out[i] = out[j]
+        out[j] = tmp
+
+
+
+# État d'un parcours : [x, y, M, T, Q, Reward, départ, trajets], départ = ligne des tables géométriques
+# du point où se trouve le robot (0 = origine, i + 1 = cylindre i), trajets = lignes du journal écrites
+STATE_SIZE = 8
+
+# Journal des trajets (voir simulate_trajectory) : une ligne par trajet rectiligne
+LOG_TARGET = 0   # cylindre visé
+LOG_HIT = 1      # cylindre ramassé (le premier balayé, la cible sinon)
+LOG_HEADING = 2  # cap absolu du trajet (rad)
+LOG_AIM = 3      # distance commandée (jusqu'à la cible)
+LOG_DIST = 4     # distance parcourue (jusqu'au cylindre ramassé)
+LOG_M = 5        # masse, temps, carburant consommé et gain après le trajet
+LOG_T = 6
+LOG_Q = 7
+LOG_REWARD = 8
+LOG_SIZE = 9
+
 
 @njit(cache=True, fastmath=True)
-def evaluate_path(path, cylinders, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45):
+def leg_sweep(cylinders, sx, sy, target_idx, R_col_sq, out_idx, out_dist):
     """
-    Simule le parcours exact avec interruption de collision
+    Cylindres balayés par un trajet rectiligne de (sx, sy) vers target_idx avant de l'atteindre
+    (même test que advance_leg), écrits dans out_idx / out_dist, retourne leur nombre
     """
-    visited = 0
-    curr_x, curr_y = 0.0, 0.0
-    M, T, Q, Reward = 0.0, 0.0, 0.0, 0.0
+    n = cylinders.shape[0]
+    dx = cylinders[target_idx, 0] - sx
+    dy = cylinders[target_idx, 1] - sy
+    D = math.sqrt(dx**2 + dy**2)
+    count = 0
     
+    for i in range(n):
+        if i == target_idx:
+            continue
+        vx = cylinders[i, 0] - sx
+        vy = cylinders[i, 1] - sy
+        
+        dot = vx * dx + vy * dy
+        if dot <= 0:
+            continue
+        
+        t = dot / max(D, 1e-12)
+        d_sq = (vx**2 + vy**2) - t**2
+        
+        if d_sq <= R_col_sq:
+            dist_to_hit = t - math.sqrt(abs(R_col_sq - d_sq))
+            if -1e-5 < dist_to_hit < D:
+                out_idx[count] = i
+                out_dist[count] = dist_to_hit
+                count += 1
+    return count
+
+
+@njit(cache=True, fastmath=True)
+def build_geometry(cylinders, R_col=0.45):
+    """
+    Tables géométriques d'une carte : un trajet part toujours de l'origine ou d'un cylindre,
+    la géométrie de chaque trajet ne dépend donc pas du parcours
+    - leg_dist[r, j] : distance du départ r (0 = origine, i + 1 = cylindre i) au cylindre j
+    - sweep_ptr / sweep_idx (format CSR) : pour le trajet r -> j (indice r * n + j), les cylindres
+      balayés avant d'atteindre j, par distance d'impact croissante
+    Retourne le tuple geom (leg_dist, sweep_ptr, sweep_idx) accepté par les noyaux
+    """
+    n = cylinders.shape[0]
     R_col_sq = R_col * R_col
     
-    for p_idx in range(20):
-        target_idx = path[p_idx]
-        
-        while not (visited & (1 << target_idx)):
-            target_x = cylinders[target_idx, 0]
-            target_y = cylinders[target_idx, 1]
+    starts = np.zeros((n + 1, 2), dtype=np.float64)
+    starts[1:, 0] = cylinders[:, 0]
+    starts[1:, 1] = cylinders[:, 1]
+    
+    leg_dist = np.empty((n + 1, n), dtype=np.float64)
+    for r in range(n + 1):
+        for j in range(n):
+            dx = cylinders[j, 0] - starts[r, 0]
+            dy = cylinders[j, 1] - starts[r, 1]
+            leg_dist[r, j] = math.sqrt(dx**2 + dy**2)
+    
+    buf_idx = np.empty(n, dtype=np.int32)
+    buf_dist = np.empty(n, dtype=np.float64)
+    
+    # première passe : taille de chaque liste
+    sweep_ptr = np.zeros((n + 1) * n + 1, dtype=np.int64)
+    for r in range(n + 1):
+        for j in range(n):
+            count = leg_sweep(cylinders, starts[r, 0], starts[r, 1], j, R_col_sq, buf_idx, buf_dist)
+            sweep_ptr[r * n + j + 1] = sweep_ptr[r * n + j] + count
             
-            dx = target_x - curr_x
-            dy = target_y - curr_y
+    # seconde passe : listes triées (tri stable : à distance égale, le plus petit indice d'abord)
+    sweep_idx = np.empty(sweep_ptr[-1], dtype=np.int32)
+    for r in range(n + 1):
+        for j in range(n):
+            count = leg_sweep(cylinders, starts[r, 0], starts[r, 1], j, R_col_sq, buf_idx, buf_dist)
+            order = np.argsort(buf_dist[:count], kind='mergesort')
+            base = sweep_ptr[r * n + j]
+            for k in range(count):
+                sweep_idx[base + k] = buf_idx[order[k]]
+                
+    return leg_dist, sweep_ptr, sweep_idx
+
+
+_GEOMETRY_CACHE = {}
+
+def map_geometry(cylinders, R_col=0.45):
+    """build_geometry mémorisé par carte (contenu de cylinders) : construit une fois par processus"""
+    cylinders = np.ascontiguousarray(cylinders, dtype=np.float64)
+    key = (hashlib.sha1(cylinders.tobytes()).hexdigest(), cylinders.shape, R_col)
+    if key not in _GEOMETRY_CACHE:
+        _GEOMETRY_CACHE[key] = build_geometry(cylinders, R_col)
+    return _GEOMETRY_CACHE[key]
+
+
+@njit(cache=True)
+def log_leg(log, row, target_idx, hit_idx, heading, aim, dist, M, T, Q, Reward):
+    """Écrit une ligne du journal des trajets (voir LOG_SIZE)"""
+    log[row, LOG_TARGET] = target_idx
+    log[row, LOG_HIT] = hit_idx
+    log[row, LOG_HEADING] = heading
+    log[row, LOG_AIM] = aim
+    log[row, LOG_DIST] = dist
+    log[row, LOG_M] = M
+    log[row, LOG_T] = T
+    log[row, LOG_Q] = Q
+    log[row, LOG_REWARD] = Reward
+
+
+@njit(cache=True, fastmath=True)
+def advance_leg(target_idx, state, visited, cylinders, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, geom=None, log=None):
+    """
+    Simule un pas du parcours (avec interruption de collision) jusqu'au ramassage de target_idx
+    C'est l'unique modèle de collision : solveurs, traducteur et visualisation passent tous par ici
+    state (voir STATE_SIZE) et le bitset visited sont mis à jour sur place
+    geom : tables de build_geometry (construites avec le même R_col), la recherche du cylindre
+    balayé devient un parcours de liste ; None = calcul géométrique direct
+    log : journal (n, LOG_SIZE), chaque trajet effectué y ajoute une ligne (None = pas de journal)
+    Retourne (coupure, fitness) : si le budget est dépassé (fitness_mode 0),
+    coupure vaut True, state s'arrête au dernier ramassage et fitness est le score final
+    """
+    n = cylinders.shape[0]
+    R_col_sq = R_col * R_col
+    
+    curr_x, curr_y = state[0], state[1]
+    M, T, Q, Reward = state[2], state[3], state[4], state[5]
+    start_row = int(state[6])
+    n_legs = int(state[7]) if log is not None else 0
+    cut = False
+    fitness = 0.0
+
+    while not bit_test(visited, target_idx):
+        target_x = cylinders[target_idx, 0]
+        target_y = cylinders[target_idx, 1]
+        
+        dx = target_x - curr_x
+        dy = target_y - curr_y
+        if geom is not None:
+            D = geom[0][start_row, target_idx]
+        else:
             D = math.sqrt(dx**2 + dy**2)
-            
+        
 
-            if D < 1e-6:
-                visited |= (1 << target_idx)
-                M += cylinders[target_idx, 2]
-                Reward += cylinders[target_idx, 3]
-                break
+        if D < 1e-6:
+            bit_set(visited, target_idx)
+            M += cylinders[target_idx, 2]
+            Reward += cylinders[target_idx, 3]
+            if log is not None:
+                log_leg(log, n_legs, target_idx, target_idx, 0.0, 0.0, 0.0, M, T, Q, Reward)
+                n_legs += 1
+            break
 
-            hit_idx = target_idx
+        hit_idx = target_idx
+        
+        if geom is not None:
+            # premier cylindre encore présent de la liste du trajet
+            leg = start_row * n + target_idx
+            for k in range(geom[1][leg], geom[1][leg + 1]):
+                i = geom[2][k]
+                if not bit_test(visited, i):
+                    hit_idx = i
+                    break
+            real_D = geom[0][start_row, hit_idx]
+        else:
             min_t = D 
             
-            for i in range(20):
-                if visited & (1 << i): 
+            for i in range(n):
+                if bit_test(visited, i): 
                     continue
                 if i == target_idx: 
                     continue
@@ -84,45 +278,312 @@ def evaluate_path(path, cylinders, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=1
                         min_t = dist_to_hit
                         hit_idx = i
 
-            actual_target_x = cylinders[hit_idx, 0]
-            actual_target_y = cylinders[hit_idx, 1]
-            
-            real_dx = actual_target_x - curr_x
-            real_dy = actual_target_y - curr_y
+            real_dx = cylinders[hit_idx, 0] - curr_x
+            real_dy = cylinders[hit_idx, 1] - curr_y
             real_D = math.sqrt(real_dx**2 + real_dy**2)
+        
+        V = max(V0 * math.exp(-a * M), 1e-9)
+        q_rate = b * M + b0
+        
+        delta_T = real_D / V
+        delta_Q = q_rate * real_D
+        
+        if fitness_mode == 0:
+            if T + delta_T > Tmax or Q + delta_Q > Qmax:
+                ratio_Q = (Qmax - Q) / delta_Q if delta_Q > 0 else 0
+                ratio_T = (Tmax - T) / delta_T if delta_T > 0 else 0
+                ratio = min(ratio_Q, ratio_T)
+                
+                ratio = max(0.0, min(1.0, ratio))
+                
+                fitness = (Reward * 1e10) + (ratio * 1e7) + (Qmax - Q)
+                cut = True
+                break
+        
+        curr_x = cylinders[hit_idx, 0]
+        curr_y = cylinders[hit_idx, 1]
+        start_row = hit_idx + 1
+        T += delta_T
+        Q += delta_Q
+        
+        bit_set(visited, hit_idx)
+        M += cylinders[hit_idx, 2]
+        Reward += cylinders[hit_idx, 3]
+        
+        if log is not None:
+            log_leg(log, n_legs, target_idx, hit_idx, math.atan2(dy, dx), D, real_D, M, T, Q, Reward)
+            n_legs += 1
+
+    state[0] = curr_x
+    state[1] = curr_y
+    state[2] = M
+    state[3] = T
+    state[4] = Q
+    state[5] = Reward
+    state[6] = start_row
+    if log is not None:
+        state[7] = n_legs
+    return cut, fitness
+
+
+@njit(cache=True, fastmath=True)
+def final_fitness(state, fitness_mode=0, Tmax=600.0, Qmax=10000.0):
+    """Score d'un parcours mené à son terme (sans dépassement de budget)"""
+    if fitness_mode == 0:
+        return (state[5] * 1e10) + 1e7 + ((Qmax - state[4]) * 1e5) + (Tmax - state[3])
+    return -(state[4] * 1e5) - state[3]
+
+
+@njit(cache=True, fastmath=True)
+def evaluate_path(path, cylinders, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, geom=None, log=None):
+    """
+    Simule le parcours exact avec interruption de collision
+    log : journal des trajets rempli au passage (voir simulate_trajectory)
+    """
+    state = np.zeros(STATE_SIZE, dtype=np.float64)
+    visited = np.zeros(bitset_words(cylinders.shape[0]), dtype=np.int64)
+    
+    for p_idx in range(cylinders.shape[0]):
+        cut, fitness = advance_leg(path[p_idx], state, visited, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom, log)
+        if cut:
+            return fitness, state[5], state[4], state[3]
+
+    return final_fitness(state, fitness_mode, Tmax, Qmax), state[5], state[4], state[3]
+
+
+@njit(cache=True, fastmath=True)
+def simulate_trajectory(path, cylinders, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, geom=None):
+    """
+    evaluate_path avec son journal complet : un trajet par ligne (voir LOG_SIZE), dans l'ordre
+    En fitness_mode 0 le journal s'arrête au dernier ramassage avant la panne, en fitness_mode 1
+    il couvre tout l'ordre de ramassage (c'est ce que le traducteur exécute)
+    Retourne (journal, fitness, Reward, Q, T)
+    """
+    n = cylinders.shape[0]
+    log = np.zeros((n, LOG_SIZE), dtype=np.float64)
+    log[:, LOG_HIT] = -1.0
+    fitness, reward, fuel, time_used = evaluate_path(path, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom, log)
+    
+    n_legs = 0
+    while n_legs < n and log[n_legs, LOG_HIT] >= 0:
+        n_legs += 1
+    return log[:n_legs], fitness, reward, fuel, time_used
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def evaluate_paths(paths, cylinders, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, geom=None):
+    """
+    Évalue un lot de chemins (P, n) avec evaluate_path, les chemins sont répartis sur les threads Numba
+    Retourne les tableaux (fitness, Reward, Q, T) de taille P
+    """
+    P = paths.shape[0]
+    fitnesses = np.empty(P, dtype=np.float64)
+    rewards = np.empty(P, dtype=np.float64)
+    fuels = np.empty(P, dtype=np.float64)
+    times = np.empty(P, dtype=np.float64)
+    
+    for p in prange(P):
+        fitnesses[p], rewards[p], fuels[p], times[p] = evaluate_path(paths[p], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)
+        
+    return fitnesses, rewards, fuels, times
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def evaluate_maps(paths, maps, counts, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45):
+    """
+    Évalue un chemin par carte sur un empilement de cartes (voir maps.load_maps), les cartes
+    sont réparties sur les threads Numba
+    paths : (n_cartes, n_max), le chemin de la carte m occupe paths[m, :counts[m]]
+    Retourne les tableaux (fitness, Reward, Q, T) de taille n_cartes
+    """
+    n_maps = maps.shape[0]
+    fitnesses = np.empty(n_maps, dtype=np.float64)
+    rewards = np.empty(n_maps, dtype=np.float64)
+    fuels = np.empty(n_maps, dtype=np.float64)
+    times = np.empty(n_maps, dtype=np.float64)
+    
+    for m in prange(n_maps):
+        k = counts[m]
+        fitnesses[m], rewards[m], fuels[m], times[m] = evaluate_path(paths[m, :k], maps[m, :k], fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col)
+        
+    return fitnesses, rewards, fuels, times
+
+
+def evaluate_paths_numpy(paths, cylinders, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45):
+    """
+    Version NumPy de référence de evaluate_paths (sans Numba), vectorisée sur les chemins :
+    à chaque itération, tous les chemins encore actifs font un pas de advance_leg
+    """
+    paths = np.asarray(paths, dtype=np.int64)
+    P, n = paths.shape
+    cx, cy = cylinders[:, 0], cylinders[:, 1]
+    masses, points = cylinders[:, 2], cylinders[:, 3]
+    R_col_sq = R_col * R_col
+    rows = np.arange(P)
+    
+    x, y, M, T, Q, Reward = (np.zeros(P) for _ in range(6))
+    fitnesses = np.zeros(P)
+    visited = np.zeros((P, n), dtype=np.bool_)
+    step = np.zeros(P, dtype=np.int64)
+    running = np.ones(P, dtype=np.bool_)
+    cut = np.zeros(P, dtype=np.bool_)
+    
+    while True:
+        # cible suivante : premier cylindre du chemin pas encore ramassé
+        while True:
+            skip = running & (step < n)
+            skip[skip] = visited[rows[skip], paths[skip, step[skip]]]
+            if not skip.any():
+                break
+            step += skip
+        running &= step < n
+        if not running.any():
+            break
             
-            V = max(V0 * math.exp(-a * M), 1e-9)
-            q_rate = b * M + b0
-            
-            delta_T = real_D / V
-            delta_Q = q_rate * real_D
-            
-            if fitness_mode == 0:
-                if T + delta_T > Tmax or Q + delta_Q > Qmax:
-                    ratio_Q = (Qmax - Q) / delta_Q if delta_Q > 0 else 0
-                    ratio_T = (Tmax - T) / delta_T if delta_T > 0 else 0
-                    ratio = min(ratio_Q, ratio_T)
-                    
-                    ratio = max(0.0, min(1.0, ratio))
-                    
-                    fitness = (Reward * 1e10) + (ratio * 1e7) + (Qmax - Q)
-                    return fitness, Reward, Q, T
-            
-            curr_x = actual_target_x
-            curr_y = actual_target_y
-            T += delta_T
-            Q += delta_Q
+        act = rows[running]
+        target = paths[act, step[act]]
+        px, py = x[act], y[act]
+        dx = cx[target] - px
+        dy = cy[target] - py
+        D = np.sqrt(dx**2 + dy**2)
+        
+        # premier cylindre balayé avant la cible
+        vx = cx[None, :] - px[:, None]
+        vy = cy[None, :] - py[:, None]
+        dot = vx * dx[:, None] + vy * dy[:, None]
+        t = dot / np.maximum(D, 1e-12)[:, None]
+        d_sq = (vx**2 + vy**2) - t**2
+        dist_to_hit = t - np.sqrt(np.abs(R_col_sq - d_sq))
+        candidate = ~visited[act] & (dot > 0) & (d_sq <= R_col_sq) & (dist_to_hit > -1e-5) & (dist_to_hit < D[:, None])
+        candidate[np.arange(len(act)), target] = False
+        dist_to_hit = np.where(candidate, dist_to_hit, np.inf)
+        first = np.argmin(dist_to_hit, axis=1)
+        hit = np.where(np.isfinite(dist_to_hit[np.arange(len(act)), first]), first, target)
+        
+        # cible sous le robot : ramassée sans déplacement
+        reached = D < 1e-6
+        hit = np.where(reached, target, hit)
+        real_D = np.where(reached, 0.0, np.sqrt((cx[hit] - px)**2 + (cy[hit] - py)**2))
+        
+        V = np.maximum(V0 * np.exp(-a * M[act]), 1e-9)
+        delta_T = real_D / V
+        delta_Q = (b * M[act] + b0) * real_D
+        
+        over = np.zeros(len(act), dtype=np.bool_)
+        if fitness_mode == 0:
+            over = (T[act] + delta_T > Tmax) | (Q[act] + delta_Q > Qmax)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio_Q = np.where(delta_Q > 0, (Qmax - Q[act]) / delta_Q, 0.0)
+                ratio_T = np.where(delta_T > 0, (Tmax - T[act]) / delta_T, 0.0)
+            ratio = np.clip(np.minimum(ratio_Q, ratio_T), 0.0, 1.0)
+            stopped = act[over]
+            fitnesses[stopped] = (Reward[stopped] * 1e10) + (ratio[over] * 1e7) + (Qmax - Q[stopped])
+            cut[stopped] = True
+            running[stopped] = False
             
-            visited |= (1 << hit_idx)
-            M += cylinders[hit_idx, 2]
-            Reward += cylinders[hit_idx, 3]
-
+        moved, hit = act[~over], hit[~over]
+        x[moved] = cx[hit]
+        y[moved] = cy[hit]
+        T[moved] += delta_T[~over]
+        Q[moved] += delta_Q[~over]
+        visited[moved, hit] = True
+        M[moved] += masses[hit]
+        Reward[moved] += points[hit]
+        
     if fitness_mode == 0:
-        fitness = (Reward * 1e10) + 1e7 + ((Qmax - Q) * 1e5) + (Tmax - T)
+        final = (Reward * 1e10) + 1e7 + ((Qmax - Q) * 1e5) + (Tmax - T)
     else:
-        fitness = -(Q * 1e5) - T
+        final = -(Q * 1e5) - T
+    fitnesses = np.where(cut, fitnesses, final)
+    return fitnesses, Reward, Q, T
+
+
+@njit(cache=True, fastmath=True)
+def translate_path(path, cylinders, turns, gos, R_col=0.45, start_angle=0.0, geom=None):
+    """
+    Commandes du robot pour un ordre de cibles, lues dans le journal de simulate_trajectory :
+    chaque trajet vise la cible suivante et le robot s'arrête sur le premier cylindre balayé
+    turns (rotation relative en degrés, dans [-180, 180[) / gos (distance commandée) sont remplis,
+    retourne le nombre de paires (TURN, GO), au plus n
+    """
+    log = simulate_trajectory(path, cylinders, 1, R_col=R_col, geom=geom)[0]
+    angle = start_angle
+    k = 0
+    
+    for leg in range(log.shape[0]):
+        if log[leg, LOG_AIM] < 1e-6:
+            continue
+        heading = log[leg, LOG_HEADING]
+        turns[k] = math.degrees((heading - angle + math.pi) % (2 * math.pi) - math.pi)
+        gos[k] = log[leg, LOG_AIM]
+        angle = heading
+        k += 1
+        
+    return k
+
+
+@njit(cache=True, parallel=True)
+def translate_paths(paths, cylinders, R_col=0.45, start_angle=0.0, geom=None):
+    """
+    translate_path sur un lot de chemins (P, n), répartis sur les threads Numba
+    Le robot part de l'origine : pour un autre départ, décaler la carte (voir RobotTranslator)
+    Retourne (turns, gos) de forme (P, n) et le nombre de commandes de chaque chemin
+    """
+    P, n = paths.shape
+    turns = np.zeros((P, n), dtype=np.float64)
+    gos = np.zeros((P, n), dtype=np.float64)
+    n_cmds = np.empty(P, dtype=np.int64)
+    
+    for p in prange(P):
+        n_cmds[p] = translate_path(paths[p], cylinders, turns[p], gos[p], R_col, start_angle, geom)
+        
+    return turns, gos, n_cmds
+
+
+@njit(cache=True)
+def new_prefix_cache(n):
+    """
+    Cache des états préfixes d'un chemin de n cylindres : la ligne k contient l'état
+    (voir STATE_SIZE) et le bitset visited avant le pas k (ligne 0 = départ)
+    """
+    prefix_states = np.zeros((n + 1, STATE_SIZE), dtype=np.float64)
+    prefix_visited = np.zeros((n + 1, bitset_words(n)), dtype=np.int64)
+    return prefix_states, prefix_visited
+
+
+@njit(cache=True, fastmath=True)
+def evaluate_path_from(path, start, prefix_states, prefix_visited, cylinders, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, geom=None):
+    """
+    Reprend la simulation au pas `start` à partir du cache des états préfixes
+    (seul le suffixe path[start:] est re-simulé) et réécrit les lignes suivantes du cache
+    Retourne (fitness, Reward, Q, T, valid) : les lignes 0..valid du cache correspondent à path
+    """
+    n = cylinders.shape[0]
+    
+    for p_idx in range(start, n):
+        row = prefix_states[p_idx + 1]
+        visited = prefix_visited[p_idx + 1]
+        for k in range(STATE_SIZE):
+            row[k] = prefix_states[p_idx, k]
+        for w in range(visited.shape[0]):
+            visited[w] = prefix_visited[p_idx, w]
+            
+        cut, fitness = advance_leg(path[p_idx], row, visited, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)
+        if cut:
+            return fitness, row[5], row[4], row[3], p_idx
+
+    last = prefix_states[n]
+    return final_fitness(last, fitness_mode, Tmax, Qmax), last[5], last[4], last[3], n
 
-    return fitness, Reward, Q, T
+
+@njit(cache=True)
+def copy_prefix_rows(src_states, src_visited, dst_states, dst_visited, lo, hi):
+    """Copie les lignes lo..hi (incluses) d'un cache préfixe vers un autre"""
+    for r in range(lo, hi + 1):
+        for k in range(STATE_SIZE):
+            dst_states[r, k] = src_states[r, k]
+        for w in range(src_visited.shape[1]):
+            dst_visited[r, w] = src_visited[r, w]
 
 
 
@@ -131,22 +592,83 @@ def set_numba_seed(seed):
     """Initialise le moteur aléatoire interne de Numba"""
     np.random.seed(seed)
 
+# Nombre d'itérations élémentaires entre deux lectures de l'horloge dans les noyaux
+DEADLINE_CHECK_PERIOD = 256
+
+@njit(cache=True)
+def wall_time():
+    """time.time() appelable depuis un noyau compilé"""
+    with objmode(t='float64'):
+        t = time.time()
+    return t
 
 @njit(cache=True)
-def fast_random_rollout(prefix_array, prefix_len, full_path, cylinders, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45):
+def deadline_reached(deadline):
+    """deadline : instant limite absolu (time.time()), 0 ou moins = pas de limite"""
+    if deadline <= 0.0:
+        return False
+    return wall_time() >= deadline
+
+@njit(cache=True)
+def numba_threads():
+    """Nombre de threads Numba disponibles (lu via objmode pour que les noyaux restent en cache)"""
+    with objmode(k='int64'):
+        k = get_num_threads()
+    return max(1, k)
+
+# Compteurs tenus par les noyaux (tableau int64 de N_COUNTERS cases)
+COUNT_TRACE_LEN = 0
+COUNT_FULL_EVALS = 1     # chemins simulés depuis le départ
+COUNT_PARTIAL_EVALS = 2  # simulations reprises d'un préfixe déjà simulé
+N_COUNTERS = 3
+
+@njit(cache=True)
+def count_evals(counters, k, start=0):
     """
-    Prend un début de chemin et le complète avec les cylindres restants 
-    mélangés aléatoirement et renvoie le score exact
+    counters : None (pas de comptage) ou tableau des compteurs COUNT_*
+    start : longueur du préfixe réutilisé par les k évaluations (0 = évaluations complètes)
+    """
+    if counters is not None:
+        if start == 0:
+            counters[COUNT_FULL_EVALS] += k
+        else:
+            counters[COUNT_PARTIAL_EVALS] += k
+
+@njit(cache=True)
+def trace_point(trace, counters, best):
+    """
+    Ajoute (instant, évaluations, meilleur score) à la trace de convergence (capacité, 3),
+    seulement si le score progresse ; une fois la trace pleine, la dernière ligne est écrasée
+    """
+    if trace is None or counters is None:
+        return
+    row = counters[COUNT_TRACE_LEN]
+    if row > 0 and best <= trace[row - 1, 2]:
+        return
+    if row == trace.shape[0]:
+        row -= 1
+    else:
+        counters[COUNT_TRACE_LEN] = row + 1
+    trace[row, 0] = wall_time()
+    trace[row, 1] = counters[COUNT_FULL_EVALS] + counters[COUNT_PARTIAL_EVALS]
+    trace[row, 2] = best
+
+
+@njit(cache=True)
+def random_completion(prefix_array, prefix_len, full_path, mark):
+    """
+    Recopie le préfixe dans full_path et le complète avec les cylindres restants 
+    mélangés aléatoirement (mark : bitset de travail)
     """
-    visited = 0
+    bits_clear(mark)
     
     for i in range(prefix_len):
         full_path[i] = prefix_array[i]
-        visited |= (1 << prefix_array[i])
+        bit_set(mark, prefix_array[i])
         
     remaining_count = 0
-    for i in range(20):
-        if not (visited & (1 << i)):
+    for i in range(full_path.shape[0]):
+        if not bit_test(mark, i):
             full_path[prefix_len + remaining_count] = i
             remaining_count += 1
             
@@ -156,48 +678,71 @@ def fast_random_rollout(prefix_array, prefix_len, full_path, cylinders, fitness_
         tmp = full_path[prefix_len + i]
         full_path[prefix_len + i] = full_path[prefix_len + j]
         full_path[prefix_len + j] = tmp
+
+
+@njit(cache=True)
+def fast_random_rollout(prefix_array, prefix_len, full_path, cylinders, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, geom=None):
+    """
+    Prend un début de chemin et le complète avec les cylindres restants 
+    mélangés aléatoirement et renvoie le score exact
+    """
+    mark = np.empty(bitset_words(cylinders.shape[0]), dtype=np.int64)
+    random_completion(prefix_array, prefix_len, full_path, mark)
         
-    fit, _, _, _ = evaluate_path(full_path, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col)
+    fit, _, _, _ = evaluate_path(full_path, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)
     return fit
 
 
 @njit(cache=True, fastmath=True)
-def simulated_annealing_core(cylinders, fitness_mode=0,  T_init=10000.0, T_final=0.1, alpha=0.9999, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45):
+def simulated_annealing_core(cylinders, fitness_mode=0,  T_init=10000.0, T_final=0.1, alpha=0.9999, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, deadline=0.0, trace=None, counters=None, init_path=None, geom=None):
     """
     Recuit Simulé
+    deadline : instant limite absolu, le meilleur chemin courant est rendu s'il est atteint
+    trace / counters : trace de convergence et compteurs optionnels (voir trace_point)
+    init_path : chemin de départ (démarrage à chaud), None = permutation aléatoire
     """
 
-    current_path = np.empty(20, dtype=np.int32)
-    for i in range(20):
-        current_path[i] = i
-    
-    for i in range(19, 0, -1):
-        j = np.random.randint(0, i + 1)
-        tmp = current_path[i]
-        current_path[i] = current_path[j]
-        current_path[j] = tmp
+    n = cylinders.shape[0]
+
+    current_path = np.empty(n, dtype=np.int32)
+    if init_path is not None:
+        for i in range(n):
+            current_path[i] = init_path[i]
+    else:
+        random_permutation_inplace(current_path)
         
-    current_score = evaluate_path(current_path, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col)[0]
+    # caches préfixes : chemin courant et candidat
+    cur_states, cur_visited = new_prefix_cache(n)
+    cand_states, cand_visited = new_prefix_cache(n)
+    
+    current_score, _, _, _, cur_valid = evaluate_path_from(current_path, 0, cur_states, cur_visited, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)
+    count_evals(counters, 1)
     
     best_path = current_path.copy()
     best_score = current_score
+    trace_point(trace, counters, best_score)
     
     T = T_init
-    new_path = np.empty(20, dtype=np.int32)
+    new_path = np.empty(n, dtype=np.int32)
     
     if fitness_mode == 0:
         scale_factor = 1e8
     else:
         scale_factor = 1e5
     
+    iteration = 0
     while T > T_final:
+        iteration += 1
+        if iteration % DEADLINE_CHECK_PERIOD == 0 and deadline_reached(deadline):
+            break
+            
         # Copie in-place
-        for i in range(20):
+        for i in range(n):
             new_path[i] = current_path[i]
             
         # mutation (2-opt Swap on inverse un sous-segment)
-        idx1 = np.random.randint(0, 19)
-        idx2 = np.random.randint(idx1 + 1, 20)
+        idx1 = np.random.randint(0, n - 1)
+        idx2 = np.random.randint(idx1 + 1, n)
         
         left = idx1
         right = idx2
@@ -208,29 +753,37 @@ def simulated_annealing_core(cylinders, fitness_mode=0,  T_init=10000.0, T_final
             left += 1
             right -= 1
             
-        # évaluation
-        new_score = evaluate_path(new_path, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col)[0]
+        # évaluation incrémentale : le préfixe [0, idx1) n'a pas changé
+        start = min(idx1, cur_valid)
+        copy_prefix_rows(cur_states, cur_visited, cand_states, cand_visited, start, start)
+        new_score, _, _, _, cand_valid = evaluate_path_from(new_path, start, cand_states, cand_visited, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)
+        count_evals(counters, 1, start)
         
         delta = new_score - current_score
         
         # critère de Metropolis
         if delta > 0:
     
-            for i in range(20):
+            for i in range(n):
                 current_path[i] = new_path[i]
             current_score = new_score
+            copy_prefix_rows(cand_states, cand_visited, cur_states, cur_visited, start + 1, cand_valid)
+            cur_valid = cand_valid
             
             if current_score > best_score:
                 best_score = current_score
-                for i in range(20):
+                for i in range(n):
                     best_path[i] = current_path[i]
+                trace_point(trace, counters, best_score)
         else:
 
             prob = math.exp(delta / (T * scale_factor))
             if np.random.rand() < prob:
-                for i in range(20):
+                for i in range(n):
                     current_path[i] = new_path[i]
                 current_score = new_score
+                copy_prefix_rows(cand_states, cand_visited, cur_states, cur_visited, start + 1, cand_valid)
+                cur_valid = cand_valid
                 
         # refroidissement
         T *= alpha
@@ -239,6 +792,194 @@ def simulated_annealing_core(cylinders, fitness_mode=0,  T_init=10000.0, T_final
 
 
 
+@njit(cache=True, fastmath=True)
+def metropolis_steps(path, score, valid, cur_states, cur_visited, cand_states, cand_visited, new_path, best_path, best_score, T, scale_factor, randoms, cylinders, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, counters=None, geom=None):
+    """
+    Pas de Metropolis à température fixe T (inversion d'un segment, comme le recuit) sur path,
+    dont (cur_states, cur_visited) est le cache préfixe valide jusqu'à valid
+    randoms : tirages uniformes (pas, 3), fournis par l'appelant pour rester rejouable en parallèle
+    best_path est mis à jour, retourne (score, valid, meilleur score)
+    """
+    n = cylinders.shape[0]
+    
+    for step in range(randoms.shape[0]):
+        idx1 = min(int(randoms[step, 0] * (n - 1)), n - 2)
+        idx2 = min(idx1 + 1 + int(randoms[step, 1] * (n - 1 - idx1)), n - 1)
+        
+        for i in range(n):
+            new_path[i] = path[i]
+        left = idx1
+        right = idx2
+        while left < right:
+            tmp = new_path[left]
+            new_path[left] = new_path[right]
+            new_path[right] = tmp
+            left += 1
+            right -= 1
+            
+        start = min(idx1, valid)
+        copy_prefix_rows(cur_states, cur_visited, cand_states, cand_visited, start, start)
+        new_score, _, _, _, cand_valid = evaluate_path_from(new_path, start, cand_states, cand_visited, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)
+        count_evals(counters, 1, start)
+        
+        delta = new_score - score
+        if delta > 0 or randoms[step, 2] < math.exp(delta / (T * scale_factor)):
+            for i in range(n):
+                path[i] = new_path[i]
+            score = new_score
+            copy_prefix_rows(cand_states, cand_visited, cur_states, cur_visited, start + 1, cand_valid)
+            valid = cand_valid
+            
+            if score > best_score:
+                best_score = score
+                for i in range(n):
+                    best_path[i] = path[i]
+                    
+    return score, valid, best_score
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def parallel_tempering_core(cylinders, n_replicas, T_min, T_max, exchange_interval, n_rounds, fitness_mode=0, adapt_interval=10, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, deadline=0.0, trace=None, counters=None, init_paths=None, temperatures=None, geom=None):
+    """
+    Échange de répliques (parallel tempering) : n_replicas chaînes de Metropolis à températures
+    fixes entre T_min et T_max, réparties sur les threads Numba
+    - chaque manche : exchange_interval pas par réplique, puis échanges entre voisines de l'échelle
+      (on échange les températures, pas les chemins)
+    - toutes les adapt_interval manches, les écarts de log-température sont resserrés là où les
+      échanges sont rares et élargis là où ils sont fréquents, pour égaliser les taux d'échange
+      le long de l'échelle (T_min et T_max restent fixes)
+    init_paths : chemins de départ des répliques (les premières lignes), le reste est aléatoire
+    temperatures : échelle de départ (croissante), None = géométrique
+    deadline : instant limite absolu, vérifié à chaque manche
+    Retourne (meilleur score, meilleur chemin, chemins par température croissante, températures,
+    taux d'échange de chaque paire voisine, nombre de manches faites avant la coupure)
+    """
+    n = cylinders.shape[0]
+    R = n_replicas
+    n_words = bitset_words(n)
+    scale_factor = 1e8 if fitness_mode == 0 else 1e5
+    
+    T = np.empty(R, dtype=np.float64)
+    if temperatures is not None:
+        for k in range(R):
+            T[k] = temperatures[k]
+    else:
+        for k in range(R):
+            T[k] = T_min * (T_max / T_min) ** (k / max(R - 1, 1))
+            
+    paths = np.empty((R, n), dtype=np.int32)
+    init_population_from(paths, init_paths)
+    
+    # répliques : la température de la réplique r est T[rank[r]], replica_at[k] est la réplique au rang k
+    replica_at = np.arange(R)
+    rank = np.arange(R)
+    
+    cur_states = np.zeros((R, n + 1, STATE_SIZE), dtype=np.float64)
+    cur_visited = np.zeros((R, n + 1, n_words), dtype=np.int64)
+    cand_states = np.zeros((R, n + 1, STATE_SIZE), dtype=np.float64)
+    cand_visited = np.zeros((R, n + 1, n_words), dtype=np.int64)
+    new_paths = np.empty((R, n), dtype=np.int32)
+    best_paths = paths.copy()
+    scores = np.empty(R, dtype=np.float64)
+    valids = np.empty(R, dtype=np.int64)
+    best_scores = np.empty(R, dtype=np.float64)
+    local_counters = np.zeros((R, N_COUNTERS), dtype=np.int64)
+    
+    for r in prange(R):
+        scores[r], _, _, _, valids[r] = evaluate_path_from(paths[r], 0, cur_states[r], cur_visited[r], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)
+        best_scores[r] = scores[r]
+    count_evals(counters, R)
+    
+    best_score = -np.inf
+    best_path = np.empty(n, dtype=np.int32)
+    
+    swaps_tried = np.zeros(max(R - 1, 1), dtype=np.int64)
+    swaps_done = np.zeros(max(R - 1, 1), dtype=np.int64)
+    total_tried = np.zeros(max(R - 1, 1), dtype=np.int64)
+    total_done = np.zeros(max(R - 1, 1), dtype=np.int64)
+    rounds_done = 0
+    
+    for rnd in range(n_rounds):
+        if deadline_reached(deadline):
+            break
+        rounds_done += 1
+            
+        randoms = np.random.random((R, exchange_interval, 3))
+        for r in prange(R):
+            scores[r], valids[r], best_scores[r] = metropolis_steps(
+                paths[r], scores[r], valids[r], cur_states[r], cur_visited[r], cand_states[r], cand_visited[r],
+                new_paths[r], best_paths[r], best_scores[r], T[rank[r]], scale_factor, randoms[r],
+                cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, local_counters[r], geom)
+            
+        for r in range(R):
+            if best_scores[r] > best_score:
+                best_score = best_scores[r]
+                for i in range(n):
+                    best_path[i] = best_paths[r, i]
+                trace_point(trace, counters, best_score)
+                
+        # échanges entre rangs voisins, pairs et impairs en alternance
+        for k in range(rnd % 2, R - 1, 2):
+            r1 = replica_at[k]
+            r2 = replica_at[k + 1]
+            swaps_tried[k] += 1
+            x = (1.0 / T[k] - 1.0 / T[k + 1]) * (scores[r2] - scores[r1]) / scale_factor
+            if x >= 0 or np.random.random() < math.exp(x):
+                swaps_done[k] += 1
+                replica_at[k] = r2
+                replica_at[k + 1] = r1
+                rank[r1] = k + 1
+                rank[r2] = k
+                
+        # espacement adaptatif de l'échelle
+        if R > 2 and (rnd + 1) % adapt_interval == 0:
+            gaps = np.empty(R - 1, dtype=np.float64)
+            total = 0.0
+            for k in range(R - 1):
+                rate = swaps_done[k] / max(swaps_tried[k], 1)
+                gaps[k] = math.log(T[k + 1] / T[k]) * math.exp(rate)
+                total += gaps[k]
+                total_tried[k] += swaps_tried[k]
+                total_done[k] += swaps_done[k]
+                swaps_tried[k] = 0
+                swaps_done[k] = 0
+            log_T = math.log(T_min)
+            span = math.log(T_max / T_min)
+            for k in range(R - 1):
+                T[k] = math.exp(log_T)
+                log_T += gaps[k] / total * span
+            T[R - 1] = T_max
+            
+    for k in range(R - 1):
+        total_tried[k] += swaps_tried[k]
+        total_done[k] += swaps_done[k]
+    acceptance = np.zeros(max(R - 1, 0), dtype=np.float64)
+    for k in range(R - 1):
+        acceptance[k] = total_done[k] / max(total_tried[k], 1)
+        
+    if counters is not None:
+        for r in range(R):
+            counters[COUNT_FULL_EVALS] += local_counters[r, COUNT_FULL_EVALS]
+            counters[COUNT_PARTIAL_EVALS] += local_counters[r, COUNT_PARTIAL_EVALS]
+            
+    # dernier état : chemins rangés par température croissante, pour reprendre au même point
+    ladder_paths = np.empty((R, n), dtype=np.int32)
+    for k in range(R):
+        for i in range(n):
+            ladder_paths[k, i] = paths[replica_at[k], i]
+    # aucune manche avant l'instant limite : meilleur chemin de départ (pas de test sur -inf, que fastmath supprime)
+    if rounds_done == 0:
+        best_r = 0
+        for r in range(1, R):
+            if best_scores[r] > best_scores[best_r]:
+                best_r = r
+        best_score = best_scores[best_r]
+        for i in range(n):
+            best_path[i] = best_paths[best_r, i]
+                    
+    return best_score, best_path, ladder_paths, T, acceptance, rounds_done
+
+
 @njit(cache=True, fastmath=True)
 def tournament_selection(fitnesses, pop_size, tournament_size):
     """Sélectionne le meilleur individu parmi un sous-groupe aléatoire"""
@@ -254,26 +995,28 @@ def tournament_selection(fitnesses, pop_size, tournament_size):
     return best_idx
 
 @njit(cache=True, fastmath=True)
-def ox_crossover(p1, p2, child):
+def ox_crossover(p1, p2, child, mark):
     """
     Order Crossover (OX1)
     Préserve un segment de P1 et complète avec l'ordre relatif de P2
+    mark : bitset de travail (bitset_words(n) mots)
     """
-    a = np.random.randint(0, 19)
-    b = np.random.randint(a + 1, 20)
+    n = p1.shape[0]
+    a = np.random.randint(0, n - 1)
+    b = np.random.randint(a + 1, n)
     
-    visited = 0
+    bits_clear(mark)
     for i in range(a, b):
         child[i] = p1[i]
-        visited |= (1 << p1[i])
+        bit_set(mark, p1[i])
         
     idx_child = b
     idx_p2 = b
     
-    for _ in range(20):
-        val = p2[idx_p2 % 20]
-        if not (visited & (1 << val)):
-            child[idx_child % 20] = val
+    for _ in range(n):
+        val = p2[idx_p2 % n]
+        if not bit_test(mark, val):
+            child[idx_child % n] = val
             idx_child += 1
         idx_p2 += 1
 
@@ -281,8 +1024,9 @@ def ox_crossover(p1, p2, child):
 def mutate_2opt_inplace(ind, mutation_rate):
     """Mutation par inversion de segment (2-Opt Swap)"""
     if np.random.rand() < mutation_rate:
-        idx1 = np.random.randint(0, 19)
-        idx2 = np.random.randint(idx1 + 1, 20)
+        n = ind.shape[0]
+        idx1 = np.random.randint(0, n - 1)
+        idx2 = np.random.randint(idx1 + 1, n)
         
         while idx1 < idx2:
             tmp = ind[idx1]
@@ -291,148 +1035,489 @@ def mutate_2opt_inplace(ind, mutation_rate):
             idx1 += 1
             idx2 -= 1
 
+@njit(cache=True)
+def init_population_from(population, init_population, fitnesses=None, init_fitnesses=None):
+    """
+    Recopie les individus de init_population (démarrage à chaud) en tête de population
+    et complète avec des permutations aléatoires
+    init_fitnesses : fitness déjà connues des premiers individus de init_population, recopiées dans fitnesses
+    Retourne le nombre d'individus en tête de population dont la fitness est connue
+    """
+    n_seeded = 0
+    if init_population is not None:
+        n_seeded = min(init_population.shape[0], population.shape[0])
+        for i in range(n_seeded):
+            for j in range(population.shape[1]):
+                population[i, j] = init_population[i, j]
+                
+    for i in range(n_seeded, population.shape[0]):
+        random_permutation_inplace(population[i])
+        
+    if init_fitnesses is None or fitnesses is None:
+        return 0
+    n_known = min(n_seeded, init_fitnesses.shape[0])
+    for i in range(n_known):
+        fitnesses[i] = init_fitnesses[i]
+    return n_known
+
+
 @njit(cache=True, fastmath=True)
-def genetic_algorithm_core(cylinders, pop_size, generations, tournament_size, mutation_rate, elitism_count, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, fitness_mode=0):
+def genetic_algorithm_core(cylinders, pop_size, generations, tournament_size, mutation_rate, elitism_count, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, fitness_mode=0, init_population=None, deadline=0.0, trace=None, counters=None, geom=None, init_fitnesses=None):
     """
     Le moteur complet de l'Algorithme Génétique
+    init_population : individus de départ (démarrage à chaud), le reste est aléatoire
+    init_fitnesses : fitness déjà connues de init_population (époque précédente du modèle en îles), non réévaluées
+    deadline : instant limite absolu, vérifié à chaque génération
+    trace / counters : trace de convergence et compteurs optionnels (voir trace_point)
+    Retourne (meilleur score, meilleur chemin, population finale, fitness finales, générations effectuées)
     """
-    population = np.empty((pop_size, 20), dtype=np.int32)
-    new_population = np.empty((pop_size, 20), dtype=np.int32)
+    n = cylinders.shape[0]
+    
+    population = np.empty((pop_size, n), dtype=np.int32)
+    new_population = np.empty((pop_size, n), dtype=np.int32)
     fitnesses = np.empty(pop_size, dtype=np.float64)
+    elite_fitnesses = np.empty(elitism_count, dtype=np.float64)
     
-    for i in range(pop_size):
-        for j in range(20):
-            population[i, j] = j
-        for j in range(19, 0, -1):
-            k = np.random.randint(0, j + 1)
-            tmp = population[i, j]
-            population[i, j] = population[i, k]
-            population[i, k] = tmp
+    mark = np.empty(bitset_words(n), dtype=np.int64)
+    
+    n_known = init_population_from(population, init_population, fitnesses, init_fitnesses)
             
-    for i in range(pop_size):
-        fitnesses[i] = evaluate_path(population[i], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col)[0]
+    fitnesses[n_known:] = evaluate_paths(population[n_known:], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)[0]
+    count_evals(counters, pop_size - n_known)
         
     best_overall_score = -np.inf
-    best_overall_path = np.empty(20, dtype=np.int32)
+    best_overall_path = np.empty(n, dtype=np.int32)
     
+    done = 0
     for gen in range(generations):
+        if deadline_reached(deadline):
+            break
+            
         order = np.argsort(fitnesses)[::-1]
         
         if fitnesses[order[0]] > best_overall_score:
             best_overall_score = fitnesses[order[0]]
-            for j in range(20):
+            for j in range(n):
                 best_overall_path[j] = population[order[0], j]
+            trace_point(trace, counters, best_overall_score)
                 
         for i in range(elitism_count):
-            for j in range(20):
+            for j in range(n):
                 new_population[i, j] = population[order[i], j]
+            elite_fitnesses[i] = fitnesses[order[i]]
                 
         #reproduction 
         for i in range(elitism_count, pop_size):
             p1_idx = tournament_selection(fitnesses, pop_size, tournament_size)
             p2_idx = tournament_selection(fitnesses, pop_size, tournament_size)
             
-            ox_crossover(population[p1_idx], population[p2_idx], new_population[i])
+            ox_crossover(population[p1_idx], population[p2_idx], new_population[i], mark)
             mutate_2opt_inplace(new_population[i], mutation_rate)
             
-        # Remplacement et évaluation
-        for i in range(pop_size):
-            for j in range(20):
-                population[i, j] = new_population[i, j]
+        # Remplacement et évaluation des enfants en un seul lot
+        population[:, :] = new_population
+        fitnesses[:elitism_count] = elite_fitnesses
+        fitnesses[elitism_count:] = evaluate_paths(population[elitism_count:], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)[0]
+        count_evals(counters, pop_size - elitism_count)
+        done += 1
                 
-            if i >= elitism_count:
-                fitnesses[i] = evaluate_path(population[i], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col)[0]
+    # la dernière génération n'a pas encore été comparée au meilleur
+    best_idx = np.argmax(fitnesses)
+    if fitnesses[best_idx] > best_overall_score:
+        best_overall_score = fitnesses[best_idx]
+        for j in range(n):
+            best_overall_path[j] = population[best_idx, j]
+        trace_point(trace, counters, best_overall_score)
                 
-    return best_overall_score, best_overall_path
+    return best_overall_score, best_overall_path, population, fitnesses, done
 
 
 
+@njit(cache=True)
+def heap_sift_down(heap, keys, pos, size):
+    """Tas-min d'indices ordonné par keys : redescend l'élément en position pos"""
+    item = heap[pos]
+    while True:
+        child = 2 * pos + 1
+        if child >= size:
+            break
+        if child + 1 < size and keys[heap[child + 1]] < keys[heap[child]]:
+            child += 1
+        if keys[heap[child]] >= keys[item]:
+            break
+        heap[pos] = heap[child]
+        pos = child
+    heap[pos] = item
+
+
+@njit(cache=True)
+def heap_sift_up(heap, keys, pos):
+    """Tas-min d'indices ordonné par keys : remonte l'élément en position pos"""
+    item = heap[pos]
+    while pos > 0:
+        parent = (pos - 1) >> 1
+        if keys[heap[parent]] <= keys[item]:
+            break
+        heap[pos] = heap[parent]
+        pos = parent
+    heap[pos] = item
+
+
 @njit(cache=True, fastmath=True)
-def beam_search_core(cylinders, beam_width, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45):
+def beam_search_core(cylinders, beam_width, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, deadline=0.0, trace=None, counters=None, geom=None):
     """
-    Implémentation haute performance du Beam Search
+    Implémentation haute performance du Beam Search, à mémoire bornée
+    - pool pré-alloué de beam_width états par niveau (double buffer), aucun tableau de candidats
+    - les candidats sont évalués en prolongeant d'un pas l'état simulé du parent et
+      filtrés au fil de l'eau par un tas-min borné (top-K sans tri complet)
+    - les enfants sont stockés sous forme (indice du parent, action), le chemin est
+      reconstruit à la fin en remontant les pointeurs
+    - deadline : instant limite absolu ; le niveau en cours est alors abandonné et le
+      meilleur chemin partiel du niveau précédent est complété puis réévalué
+    - trace / counters : trace de convergence et compteurs optionnels (une évaluation = un pas
+      simulé, partielle au-delà du premier niveau), le meilleur score du faisceau est tracé à chaque niveau
     """
-    n_cylinders = 20
+    n_cylinders = cylinders.shape[0]
+    n_words = bitset_words(n_cylinders)
     
-    paths_even = np.full((beam_width, n_cylinders), -1, dtype=np.int32)
-    scores_even = np.full(beam_width, -np.inf, dtype=np.float64)
+    states_a = np.zeros((beam_width, STATE_SIZE), dtype=np.float64)
+    visited_a = np.zeros((beam_width, n_words), dtype=np.int64)
+    scores_a = np.full(beam_width, -np.inf, dtype=np.float64)
+    cut_a = np.zeros(beam_width, dtype=np.bool_)
     
-    paths_odd = np.full((beam_width, n_cylinders), -1, dtype=np.int32)
-    scores_odd = np.full(beam_width, -np.inf, dtype=np.float64)
+    states_b = np.zeros((beam_width, STATE_SIZE), dtype=np.float64)
+    visited_b = np.zeros((beam_width, n_words), dtype=np.int64)
+    scores_b = np.full(beam_width, -np.inf, dtype=np.float64)
+    cut_b = np.zeros(beam_width, dtype=np.bool_)
     
-    initial_candidates = min(n_cylinders, beam_width)
-    for i in range(initial_candidates):
-        paths_even[i, 0] = i
-        scores_even[i] = evaluate_path(paths_even[i], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col)[0]
-        
-    current_beam_size = initial_candidates
-
-    for level in range(1, n_cylinders):
-        if level % 2 != 0:
-            parent_paths = paths_even
-            parent_scores = scores_even
-            child_paths = paths_odd
-            child_scores = scores_odd
+    # pointeurs arrière par niveau : action -1 = le parent est terminé (coupé ou tout ramassé)
+    parent_of = np.full((n_cylinders, beam_width), -1, dtype=np.int32)
+    action_of = np.full((n_cylinders, beam_width), -1, dtype=np.int32)
+    
+    heap = np.empty(beam_width, dtype=np.int32)
+    scratch_state = np.empty(STATE_SIZE, dtype=np.float64)
+    scratch_visited = np.empty(n_words, dtype=np.int64)
+    
+    # racine : un seul parent à l'origine (ligne 0 du buffer b, déjà à zéro)
+    current_beam_size = 1
+    last_level = 0
+    interrupted = False
+    
+    for level in range(n_cylinders):
+        if level % 2 == 0:
+            parent_states, parent_visited, parent_scores, parent_cut = states_b, visited_b, scores_b, cut_b
+            child_states, child_visited, child_scores, child_cut = states_a, visited_a, scores_a, cut_a
         else:
-            parent_paths = paths_odd
-            parent_scores = scores_odd
-            child_paths = paths_even
-            child_scores = scores_even
+            parent_states, parent_visited, parent_scores, parent_cut = states_a, visited_a, scores_a, cut_a
+            child_states, child_visited, child_scores, child_cut = states_b, visited_b, scores_b, cut_b
             
-        child_scores[:] = -np.inf
-        child_paths[:] = -1
+        heap_size = 0
+        extended = False
         
-        max_candidates = beam_width * n_cylinders
-        candidate_paths = np.full((max_candidates, n_cylinders), -1, dtype=np.int32)
-        candidate_scores = np.full(max_candidates, -np.inf, dtype=np.float64)
-        cand_count = 0
-        
-        for i in range(current_beam_size):
-            if parent_paths[i, 0] == -1 or parent_scores[i] == -np.inf: continue
-
-            visited_mask = 0
-            for k in range(level):
-                visited_mask |= (1 << parent_paths[i, k])
+        for p in range(current_beam_size):
+            if level > 0 and p % DEADLINE_CHECK_PERIOD == 0 and deadline_reached(deadline):
+                interrupted = True
+                break
                 
-            for target_idx in range(n_cylinders):
-                if not (visited_mask & (1 << target_idx)):
-                    for k in range(level):
-                        candidate_paths[cand_count, k] = parent_paths[i, k]
-                    candidate_paths[cand_count, level] = target_idx
+            is_done = parent_cut[p]
+            if not is_done:
+                is_done = True
+                for target_idx in range(n_cylinders):
+                    if not bit_test(parent_visited[p], target_idx):
+                        is_done = False
+                        break
+                
+            for target_idx in range(-1, n_cylinders):
+                if target_idx == -1:
+                    # un parcours terminé ne produit qu'un seul enfant identique
+                    if not is_done:
+                        continue
+                    for k in range(STATE_SIZE):
+                        scratch_state[k] = parent_states[p, k]
+                    for w in range(n_words):
+                        scratch_visited[w] = parent_visited[p, w]
+                    cut = parent_cut[p]
+                    score = parent_scores[p]
+                else:
+                    if is_done or bit_test(parent_visited[p], target_idx):
+                        continue
+                    for k in range(STATE_SIZE):
+                        scratch_state[k] = parent_states[p, k]
+                    for w in range(n_words):
+                        scratch_visited[w] = parent_visited[p, w]
+                    cut, fitness = advance_leg(target_idx, scratch_state, scratch_visited, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)
+                    score = fitness if cut else final_fitness(scratch_state, fitness_mode, Tmax, Qmax)
+                    count_evals(counters, 1, level)
+                    
+                # sélection top-K au fil de l'eau
+                pushed = heap_size < beam_width
+                if pushed:
+                    slot = heap_size
+                    heap[heap_size] = slot
+                    heap_size += 1
+                elif score > child_scores[heap[0]]:
+                    slot = heap[0]
+                else:
+                    continue
+                    
+                for k in range(STATE_SIZE):
+                    child_states[slot, k] = scratch_state[k]
+                for w in range(n_words):
+                    child_visited[slot, w] = scratch_visited[w]
+                child_scores[slot] = score
+                child_cut[slot] = cut
+                parent_of[level, slot] = p
+                action_of[level, slot] = target_idx
+                if target_idx != -1:
+                    extended = True
+                    
+                if pushed:
+                    heap_sift_up(heap, child_scores, heap_size - 1)
+                else:
+                    heap_sift_down(heap, child_scores, 0, heap_size)
                     
-                    score = evaluate_path(candidate_paths[cand_count], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col)[0]
-                    candidate_scores[cand_count] = score
-                    cand_count += 1
+        if interrupted:
+            # le buffer parent (niveau précédent) est intact
+            break
+            
+        current_beam_size = heap_size
+        last_level = level
+        if trace is not None:
+            level_best = -np.inf
+            for k in range(heap_size):
+                if child_scores[heap[k]] > level_best:
+                    level_best = child_scores[heap[k]]
+            trace_point(trace, counters, level_best)
+        if not extended:
+            break
+
+    if last_level % 2 == 0:
+        final_scores = scores_a
+    else:
+        final_scores = scores_b
         
-        valid_scores = candidate_scores[:cand_count]
-        sorted_indices = np.argsort(valid_scores)[::-1]
+    best_slot = 0
+    for k in range(1, current_beam_size):
+        if final_scores[k] > final_scores[best_slot]:
+            best_slot = k
+    best_score = final_scores[best_slot]
+    
+    # reconstruction du chemin en remontant les pointeurs
+    best_path = np.empty(n_cylinders, dtype=np.int32)
+    in_path = np.zeros(n_words, dtype=np.int64)
+    count = 0
+    slot = best_slot
+    for level in range(last_level, -1, -1):
+        action = action_of[level, slot]
+        if action != -1:
+            best_path[count] = action
+            count += 1
+        slot = parent_of[level, slot]
         
-        current_beam_size = min(cand_count, beam_width)
-        for k in range(current_beam_size):
-            best_idx = sorted_indices[k]
-            child_scores[k] = candidate_scores[best_idx]
-            for j in range(n_cylinders):
-                child_paths[k, j] = candidate_paths[best_idx, j]
-
-    best_score = child_scores[0]
-    best_path = child_paths[0]
+    for k in range(count // 2):
+        tmp = best_path[k]
+        best_path[k] = best_path[count - 1 - k]
+        best_path[count - 1 - k] = tmp
+    for k in range(count):
+        bit_set(in_path, best_path[k])
+        
+    # cylindres jamais visés : déjà balayés ou hors budget, ajoutés en fin de chemin
+    for i in range(n_cylinders):
+        if not bit_test(in_path, i):
+            best_path[count] = i
+            count += 1
+            
+    if interrupted:
+        best_score = evaluate_path(best_path, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)[0]
             
     return best_path, best_score
 
 
 
+# Voisinages de local_search_core (masque de bits)
+LS_2OPT = 1    # inversion d'un segment
+LS_SWAP = 2    # échange de deux cylindres
+LS_OROPT = 4   # déplacement d'un segment d'au plus OR_OPT_MAX_LEN cylindres
+LS_3OPT = 8    # échange de deux segments consécutifs de longueur quelconque
+LS_ALL = LS_2OPT | LS_SWAP | LS_OROPT | LS_3OPT
+LS_MOVES = {"2opt": LS_2OPT, "swap": LS_SWAP, "oropt": LS_OROPT, "3opt": LS_3OPT}
+OR_OPT_MAX_LEN = 3
+
+def move_mask(moves):
+    """Voisinages par nom ("2opt", "swap", "oropt", "3opt", "all" ou liste de noms) -> masque LS_*"""
+    if isinstance(moves, str):
+        moves = [moves]
+    mask = 0
+    for name in moves:
+        if name == "all":
+            mask |= LS_ALL
+        elif name in LS_MOVES:
+            mask |= LS_MOVES[name]
+        else:
+            raise ValueError(f"Voisinage inconnu : {name} (attendu : {', '.join(LS_MOVES)} ou all)")
+    return mask
+
+
+@njit(cache=True)
+def ls_build_move(cur, cand, kind, i, j, k):
+    """
+    Écrit dans cand (égal à cur avant la position i) le chemin cur modifié par un mouvement :
+    - LS_2OPT : inversion de cur[i..j]
+    - LS_SWAP : échange de cur[i] et cur[j]
+    - LS_3OPT : échange des segments consécutifs cur[i..j-1] et cur[j..k] (un or-opt quand l'un est court)
+    Retourne la dernière position modifiée
+    """
+    if kind == LS_2OPT:
+        for p in range(i, j + 1):
+            cand[p] = cur[i + j - p]
+        return j
+    if kind == LS_SWAP:
+        cand[i] = cur[j]
+        cand[j] = cur[i]
+        return j
+    len_b = k - j + 1
+    for p in range(len_b):
+        cand[i + p] = cur[j + p]
+    for p in range(j - i):
+        cand[i + len_b + p] = cur[i + p]
+    return k
+
+
+@njit(cache=True, fastmath=True)
+def local_search_core(path, cylinders, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, max_steps=50, moves=LS_ALL, counters=None, geom=None):
+    """
+    Recherche locale à plusieurs voisinages (masque moves de LS_*) sur path, modifié sur place
+    - un mouvement dont la première position modifiée est i ne re-simule que le suffixe, à partir
+      de l'état préfixe en cache (aucun mouvement n'est tenté au-delà de la coupure du budget)
+    - première amélioration sans reprendre le balayage au début : un bit "don't look" par position
+      saute les positions restées sans amélioration depuis la dernière modification de leur voisinage
+    max_steps : nombre maximal d'améliorations
+    Retourne le score final
+    """
+    n = cylinders.shape[0]
+    
+    cur_states, cur_visited = new_prefix_cache(n)
+    cand_states, cand_visited = new_prefix_cache(n)
+    cand = path.copy()
+    
+    best_score, _, _, _, cur_valid = evaluate_path_from(path, 0, cur_states, cur_visited, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)
+    count_evals(counters, 1)
+    
+    dont_look = np.zeros(n, dtype=np.bool_)
+    steps = 0
+    idle = 0
+    i = 0
+    
+    while steps < max_steps and idle < n:
+        if dont_look[i] or i > cur_valid or i == n - 1:
+            dont_look[i] = True
+            idle += 1
+            i = (i + 1) % n
+            continue
+            
+        start = i
+        improved = False
+        last = i
+        
+        for kind in (LS_2OPT, LS_SWAP, LS_3OPT):
+            if kind == LS_3OPT and not moves & (LS_OROPT | LS_3OPT):
+                continue
+            if kind != LS_3OPT and not moves & kind:
+                continue
+                
+            for j in range(i + 1, n):
+                if kind == LS_SWAP and j == i + 1:
+                    continue  # déjà couvert par l'inversion de deux cylindres
+                k_hi = j if kind != LS_3OPT else n - 1
+                if kind == LS_3OPT and not moves & LS_3OPT and j - i > OR_OPT_MAX_LEN:
+                    # or-opt seul : le segment déplacé vers l'avant est le second, court
+                    k_hi = min(n - 1, j + OR_OPT_MAX_LEN - 1)
+                    
+                for k in range(j, k_hi + 1):
+                    last = ls_build_move(path, cand, kind, i, j, k)
+                    copy_prefix_rows(cur_states, cur_visited, cand_states, cand_visited, start, start)
+                    new_score, _, _, _, cand_valid = evaluate_path_from(cand, start, cand_states, cand_visited, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)
+                    count_evals(counters, 1, start)
+                    
+                    if new_score > best_score:
+                        best_score = new_score
+                        for p in range(i, last + 1):
+                            path[p] = cand[p]
+                        copy_prefix_rows(cand_states, cand_visited, cur_states, cur_visited, start + 1, cand_valid)
+                        cur_valid = cand_valid
+                        improved = True
+                        break
+                    for p in range(i, last + 1):
+                        cand[p] = path[p]
+                if improved:
+                    break
+            if improved:
+                break
+                
+        if improved:
+            steps += 1
+            idle = 0
+            for p in range(max(0, i - 1), min(n, last + 2)):
+                dont_look[p] = False
+        else:
+            dont_look[i] = True
+            idle += 1
+            i = (i + 1) % n
+            
+    return best_score
+
+
+def complete_permutation(path, n):
+    """
+    Permutation de 0..n-1 tirée d'un chemin partiel : indices hors carte et doublons retirés
+    (première occurrence gardée), puis cylindres manquants ajoutés dans l'ordre
+    """
+    seen = set()
+    full = []
+    for i in path:
+        i = int(i)
+        if 0 <= i < n and i not in seen:
+            seen.add(i)
+            full.append(i)
+    full += [i for i in range(n) if i not in seen]
+    return full
+
+
+def polish_path(path, cylinders, fitness_mode=0, moves="all", max_steps=10_000, geom=None):
+    """
+    Étape de finition applicable au chemin rendu par n'importe quel solveur : local_search_core
+    jusqu'à l'optimum local (ou max_steps améliorations), après complete_permutation
+    Retourne (chemin, score, score du chemin de départ), les deux scores dans le même fitness_mode
+    """
+    work = np.array(complete_permutation(path, len(cylinders)), dtype=np.int32)
+    if geom is None:
+        geom = map_geometry(cylinders)
+    start_score = evaluate_path(work, cylinders, fitness_mode, geom=geom)[0]
+    score = local_search_core(work, cylinders, fitness_mode, max_steps=max_steps, moves=move_mask(moves), geom=geom)
+    return [int(i) for i in work], score, start_score
+
+
 @njit(cache=True, fastmath=True)
-def fast_local_search_2opt(path, cylinders, fitness_mode, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, max_steps=50):
+def fast_local_search_2opt(path, cylinders, fitness_mode, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, max_steps=50, counters=None, geom=None):
 
-    best_score = evaluate_path(path, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col)[0]
+    n = cylinders.shape[0]
+    
+    cur_states, cur_visited = new_prefix_cache(n)
+    cand_states, cand_visited = new_prefix_cache(n)
+    
+    best_score, _, _, _, cur_valid = evaluate_path_from(path, 0, cur_states, cur_visited, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)
+    count_evals(counters, 1)
     improved = True
     steps = 0
     
     while improved and steps < max_steps:
         improved = False
         
-        for i in range(19):
-            for j in range(i + 1, 20):
+        for i in range(n - 1):
+            # tous les mouvements [i, j] partagent le préfixe [0, i)
+            start = min(i, cur_valid)
+            
+            for j in range(i + 1, n):
                 left, right = i, j
                 while left < right:
                     tmp = path[left]
@@ -441,10 +1526,14 @@ def fast_local_search_2opt(path, cylinders, fitness_mode, V0=1.0, a=0.0698, b=3.
                     left += 1
                     right -= 1
                     
-                new_score = evaluate_path(path, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col)[0]
+                copy_prefix_rows(cur_states, cur_visited, cand_states, cand_visited, start, start)
+                new_score, _, _, _, cand_valid = evaluate_path_from(path, start, cand_states, cand_visited, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)
+                count_evals(counters, 1, start)
                 
                 if new_score > best_score:
                     best_score = new_score
+                    copy_prefix_rows(cand_states, cand_visited, cur_states, cur_visited, start + 1, cand_valid)
+                    cur_valid = cand_valid
                     improved = True
                     break 
                 else:
@@ -462,59 +1551,666 @@ def fast_local_search_2opt(path, cylinders, fitness_mode, V0=1.0, a=0.0698, b=3.
         
     return best_score
 
+
+@njit(cache=True, fastmath=True, parallel=True)
+def local_search_batch(population, rows, fitnesses, cylinders, fitness_mode, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, max_steps=50, counters=None, geom=None, moves=LS_2OPT):
+    """
+    Recherche locale sur les lignes `rows` de population, réparties sur les threads Numba
+    moves : voisinages de local_search_core (LS_2OPT seul = fast_local_search_2opt)
+    Les fitness obtenues sont écrites dans fitnesses[rows]
+    """
+    k = rows.shape[0]
+    local_counters = np.zeros((k, N_COUNTERS), dtype=np.int64)
+    
+    for r in prange(k):
+        if moves == LS_2OPT:
+            fitnesses[rows[r]] = fast_local_search_2opt(population[rows[r]], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, max_steps, local_counters[r], geom)
+        else:
+            fitnesses[rows[r]] = local_search_core(population[rows[r]], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, max_steps, moves, local_counters[r], geom)
+        
+    if counters is not None:
+        for r in range(k):
+            counters[COUNT_FULL_EVALS] += local_counters[r, COUNT_FULL_EVALS]
+            counters[COUNT_PARTIAL_EVALS] += local_counters[r, COUNT_PARTIAL_EVALS]
+
+
+@njit(cache=True)
+def local_search_until(population, rows, fitnesses, cylinders, fitness_mode, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, max_steps=50, deadline=0.0, counters=None, min_rows=0, geom=None, moves=LS_2OPT):
+    """
+    local_search_batch par paquets d'une ligne par thread, deadline vérifiée avant chaque paquet
+    (les min_rows premières lignes sont traitées dans tous les cas)
+    Retourne le nombre de lignes traitées
+    """
+    chunk = numba_threads()
+    done = 0
+    while done < rows.shape[0]:
+        if done >= min_rows and deadline_reached(deadline):
+            break
+        hi = min(done + chunk, rows.shape[0])
+        local_search_batch(population, rows[done:hi], fitnesses, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, max_steps, counters, geom, moves)
+        done = hi
+    return done
+
 @njit(cache=True, fastmath=True)
-def memetic_algorithm_core(cylinders, pop_size, generations, tournament_size, mutation_rate, ls_rate, ls_max_steps, elitism_count, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45):
+def memetic_algorithm_core(cylinders, pop_size, generations, tournament_size, mutation_rate, ls_rate, ls_max_steps, elitism_count, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, init_population=None, deadline=0.0, trace=None, counters=None, geom=None, ls_moves=LS_2OPT, init_fitnesses=None):
+    """
+    Algorithme mémétique : GA dont les enfants sont améliorés par recherche locale
+    (ls_moves : voisinages de local_search_core, 2-opt seul par défaut)
+    init_population : individus de départ (démarrage à chaud), le reste est aléatoire
+    init_fitnesses : fitness déjà connues de init_population (époque précédente du modèle en îles) :
+    ces individus ne sont ni réévalués ni repassés en recherche locale
+    Les enfants sans recherche locale sont évalués en un lot (evaluate_paths), les recherches
+    locales sont réparties sur les threads Numba
+    deadline : instant limite absolu, vérifié avant chaque paquet de recherches locales ; une
+    génération interrompue est abandonnée et la population précédente est conservée
+    trace / counters : trace de convergence et compteurs optionnels (voir trace_point)
+    Retourne (meilleur score, meilleur chemin, population finale, fitness finales, générations effectuées)
+    """
+
+    n = cylinders.shape[0]
 
-    population = np.empty((pop_size, 20), dtype=np.int32)
-    new_population = np.empty((pop_size, 20), dtype=np.int32)
+    population = np.empty((pop_size, n), dtype=np.int32)
+    new_population = np.empty((pop_size, n), dtype=np.int32)
     
     fitnesses = np.empty(pop_size, dtype=np.float64)
     new_fitnesses = np.empty(pop_size, dtype=np.float64)
     
-    for i in range(pop_size):
-        for j in range(20):
-            population[i, j] = j
-        for j in range(19, 0, -1):
-            k = np.random.randint(0, j + 1)
-            tmp = population[i, j]
-            population[i, j] = population[i, k]
-            population[i, k] = tmp
-            
-    for i in range(pop_size):
-        fitnesses[i] = fast_local_search_2opt(population[i], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, ls_max_steps)
+    ls_rows = np.empty(pop_size, dtype=np.int64)
+    eval_rows = np.empty(pop_size, dtype=np.int64)
+    mark = np.empty(bitset_words(n), dtype=np.int64)
+    
+    n_known = init_population_from(population, init_population, fitnesses, init_fitnesses)
+    
+    # recherche locale sur la population initiale, simple évaluation du reste si la deadline tombe
+    new_rows = np.arange(n_known, pop_size)
+    done = local_search_until(population, new_rows, fitnesses, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, ls_max_steps, deadline, counters, 1, geom, ls_moves)
+    if done < new_rows.shape[0]:
+        rest = new_rows[done:]
+        fitnesses[rest] = evaluate_paths(population[rest], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)[0]
+        count_evals(counters, rest.shape[0])
         
     best_overall_score = -np.inf
-    best_overall_path = np.empty(20, dtype=np.int32)
+    best_overall_path = np.empty(n, dtype=np.int32)
     
+    gens_done = 0
     for gen in range(generations):
         order = np.argsort(fitnesses)[::-1]
         
         if fitnesses[order[0]] > best_overall_score:
             best_overall_score = fitnesses[order[0]]
-            for j in range(20):
+            for j in range(n):
                 best_overall_path[j] = population[order[0], j]
+            trace_point(trace, counters, best_overall_score)
+            
+        if deadline_reached(deadline):
+            break
                 
         for i in range(elitism_count):
-            for j in range(20):
+            for j in range(n):
                 new_population[i, j] = population[order[i], j]
             new_fitnesses[i] = fitnesses[order[i]]
-                
+        
+        # reproduction, puis évaluation des enfants par lots
+        n_ls = 0
+        n_eval = 0
         for i in range(elitism_count, pop_size):
             p1_idx = tournament_selection(fitnesses, pop_size, tournament_size)
             p2_idx = tournament_selection(fitnesses, pop_size, tournament_size)
             
-            ox_crossover(population[p1_idx], population[p2_idx], new_population[i])
+            ox_crossover(population[p1_idx], population[p2_idx], new_population[i], mark)
             
             mutate_2opt_inplace(new_population[i], mutation_rate)
             
             if np.random.rand() < ls_rate:
-                new_fitnesses[i] = fast_local_search_2opt(new_population[i], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, ls_max_steps)
+                ls_rows[n_ls] = i
+                n_ls += 1
             else:
-                new_fitnesses[i] = evaluate_path(new_population[i], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col)[0]
+                eval_rows[n_eval] = i
+                n_eval += 1
                 
+        if n_eval > 0:
+            rows = eval_rows[:n_eval]
+            new_fitnesses[rows] = evaluate_paths(new_population[rows], cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)[0]
+            count_evals(counters, n_eval)
+            
+        if local_search_until(new_population, ls_rows[:n_ls], new_fitnesses, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, ls_max_steps, deadline, counters, 0, geom, ls_moves) < n_ls:
+            break
+            
         for i in range(pop_size):
-            for j in range(20):
+            for j in range(n):
                 population[i, j] = new_population[i, j]
             fitnesses[i] = new_fitnesses[i]
+        gens_done += 1
+
+    # la dernière génération n'a pas encore été comparée au meilleur
+    best_idx = np.argmax(fitnesses)
+    if fitnesses[best_idx] > best_overall_score:
+        best_overall_score = fitnesses[best_idx]
+        for j in range(n):
+            best_overall_path[j] = population[best_idx, j]
+        trace_point(trace, counters, best_overall_score)
 
-    return best_overall_score, best_overall_path
\ No newline at end of file
+    return best_overall_score, best_overall_path, population, fitnesses, gens_done
+
+
+# Champs de la table node_links du MCTS
+MCTS_PARENT = 0
+MCTS_FIRST_CHILD = 1
+MCTS_NEXT_SIBLING = 2
+MCTS_ACTION = 3
+MCTS_DEPTH = 4
+MCTS_N_UNTRIED = 5
+
+
+@njit(cache=True)
+def mcts_init_tree(node_links, node_visits, node_values, node_untried, n):
+    """Réinitialise le pool de noeuds avec la seule racine (chemin vide), retourne le nombre de noeuds"""
+    node_links[0, MCTS_PARENT] = -1
+    node_links[0, MCTS_FIRST_CHILD] = -1
+    node_links[0, MCTS_NEXT_SIBLING] = -1
+    node_links[0, MCTS_ACTION] = -1
+    node_links[0, MCTS_DEPTH] = 0
+    node_links[0, MCTS_N_UNTRIED] = n
+    node_visits[0] = 0
+    node_values[0] = 0.0
+    bits_clear(node_untried[0])
+    for i in range(n):
+        bit_set(node_untried[0], i)
+    return 1
+
+
+@njit(cache=True)
+def mcts_select_child(node, node_links, node_visits, node_values, C, min_score, max_score, root_ext_visits, root_ext_values, root_ext_total):
+    """
+    Sélectionne l'enfant maximisant la formule UCB1 avec la normalisation
+    À la racine, les statistiques des autres workers (root_ext_*) s'ajoutent aux siennes
+    """
+    best_score = -np.inf
+    best_child = -1
+    
+    parent_visits = node_visits[node]
+    if node == 0:
+        parent_visits += root_ext_total
+    
+    child = node_links[node, MCTS_FIRST_CHILD]
+    while child != -1:
+        n_visits = node_visits[child]
+        q_value = node_values[child]
+        if node == 0:
+            action = node_links[child, MCTS_ACTION]
+            n_visits += root_ext_visits[action]
+            q_value += root_ext_values[action]
+            
+        if n_visits == 0:
+            return child
+            
+        average_reward = q_value / n_visits
+        
+        # normalisation [0, 1]
+        if max_score > min_score:
+            normalized_reward = (average_reward - min_score) / (max_score - min_score)
+        else:
+            normalized_reward = 0.5
+            
+        # formule UCB1
+        exploration = C * math.sqrt(math.log(parent_visits) / n_visits)
+        uct_score = normalized_reward + exploration
+        
+        if uct_score > best_score:
+            best_score = uct_score
+            best_child = child
+            
+        child = node_links[child, MCTS_NEXT_SIBLING]
+        
+    return best_child
+
+
+@njit(cache=True)
+def mcts_search_core(cylinders, n_iterations, C, node_count, node_links, node_visits, node_values, node_untried, bounds, best_path, root_ext_visits, root_ext_values, fitness_mode=0, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, R_col=0.45, deadline=0.0, trace=None, counters=None, geom=None):
+    """
+    Boucle MCTS complète (sélection, expansion, rollout, rétropropagation) sur un pool
+    de noeuds en tableaux plats, persistant d'un appel à l'autre
+    bounds = [score min, score max, meilleur score] ; best_path reçoit le meilleur rollout
+    root_ext_visits / root_ext_values : statistiques par action à la racine venant des
+    autres workers (parallélisation à la racine), des zéros en mode isolé
+    Quand le pool est plein, l'arbre cesse de grandir et les rollouts partent des feuilles
+    deadline : instant limite absolu, la boucle s'arrête dès qu'il est atteint
+    trace / counters : trace de convergence et compteurs optionnels (voir trace_point)
+    Retourne (nombre de noeuds utilisés, nombre d'itérations effectuées)
+    """
+    n = cylinders.shape[0]
+    max_nodes = node_links.shape[0]
+    root_ext_total = root_ext_visits.sum()
+    
+    prefix = np.empty(n, dtype=np.int32)
+    full_path = np.empty(n, dtype=np.int32)
+    mark = np.empty(bitset_words(n), dtype=np.int64)
+    eval_states, eval_visited = new_prefix_cache(n)
+    
+    done = 0
+    while done < n_iterations:
+        if done % DEADLINE_CHECK_PERIOD == 0 and done > 0 and deadline_reached(deadline):
+            break
+        done += 1
+        
+        #Selection
+        node = 0
+        prefix_len = 0
+        
+        while node_links[node, MCTS_N_UNTRIED] == 0 and prefix_len < n:
+            best_child = mcts_select_child(node, node_links, node_visits, node_values, C, bounds[0], bounds[1], root_ext_visits, root_ext_values, root_ext_total)
+            if best_child == -1:
+                break
+            node = best_child
+            prefix[prefix_len] = node_links[node, MCTS_ACTION]
+            prefix_len += 1
+            
+        #Expansion
+        if prefix_len < n and node_links[node, MCTS_N_UNTRIED] > 0 and node_count < max_nodes:
+            # tirage uniforme d'une action non essayée
+            pick = np.random.randint(node_links[node, MCTS_N_UNTRIED])
+            action = -1
+            for i in range(n):
+                if bit_test(node_untried[node], i):
+                    if pick == 0:
+                        action = i
+                        break
+                    pick -= 1
+            bit_clear(node_untried[node], action)
+            node_links[node, MCTS_N_UNTRIED] -= 1
+            
+            prefix[prefix_len] = action
+            prefix_len += 1
+            
+            child = node_count
+            node_count += 1
+            node_links[child, MCTS_PARENT] = node
+            node_links[child, MCTS_FIRST_CHILD] = -1
+            node_links[child, MCTS_NEXT_SIBLING] = node_links[node, MCTS_FIRST_CHILD]
+            node_links[child, MCTS_ACTION] = action
+            node_links[child, MCTS_DEPTH] = prefix_len
+            node_links[child, MCTS_N_UNTRIED] = n - prefix_len
+            node_links[node, MCTS_FIRST_CHILD] = child
+            node_visits[child] = 0
+            node_values[child] = 0.0
+            
+            untried = node_untried[child]
+            bits_clear(untried)
+            for i in range(n):
+                bit_set(untried, i)
+            for k in range(prefix_len):
+                bit_clear(untried, prefix[k])
+            node = child
+            
+        #Rollout
+        random_completion(prefix, prefix_len, full_path, mark)
+        score = evaluate_path_from(full_path, 0, eval_states, eval_visited, cylinders, fitness_mode, V0, a, b, b0, Tmax, Qmax, R_col, geom)[0]
+        count_evals(counters, 1)
+        
+        if math.isnan(score) or math.isinf(score):
+            continue
+            
+        if score < bounds[0]:
+            bounds[0] = score
+        if score > bounds[1]:
+            bounds[1] = score
+            
+        if score > bounds[2]:
+            bounds[2] = score
+            for k in range(n):
+                best_path[k] = full_path[k]
+            trace_point(trace, counters, score)
+                
+        #Backpropagation
+        while node != -1:
+            node_visits[node] += 1
+            node_values[node] += score
+            node = node_links[node, MCTS_PARENT]
+            
+    return node_count, done
+
+
+@njit(cache=True)
+def mcts_seed_path(path, score, prior_visits, node_count, node_links, node_visits, node_values, node_untried):
+    """
+    A priori sur l'arbre (démarrage à chaud) : crée les noeuds du chemin depuis la racine et
+    leur attribue prior_visits visites virtuelles de valeur score
+    Retourne le nombre de noeuds utilisés
+    """
+    n = path.shape[0]
+    max_nodes = node_links.shape[0]
+    
+    node = 0
+    node_visits[0] += prior_visits
+    node_values[0] += prior_visits * score
+    
+    for depth in range(n):
+        action = path[depth]
+        child = node_links[node, MCTS_FIRST_CHILD]
+        while child != -1 and node_links[child, MCTS_ACTION] != action:
+            child = node_links[child, MCTS_NEXT_SIBLING]
+            
+        if child == -1:
+            if node_count >= max_nodes or not bit_test(node_untried[node], action):
+                break
+            bit_clear(node_untried[node], action)
+            node_links[node, MCTS_N_UNTRIED] -= 1
+            
+            child = node_count
+            node_count += 1
+            node_links[child, MCTS_PARENT] = node
+            node_links[child, MCTS_FIRST_CHILD] = -1
+            node_links[child, MCTS_NEXT_SIBLING] = node_links[node, MCTS_FIRST_CHILD]
+            node_links[child, MCTS_ACTION] = action
+            node_links[child, MCTS_DEPTH] = depth + 1
+            node_links[child, MCTS_N_UNTRIED] = n - depth - 1
+            node_links[node, MCTS_FIRST_CHILD] = child
+            node_visits[child] = 0
+            node_values[child] = 0.0
+            
+            untried = node_untried[child]
+            bits_clear(untried)
+            for i in range(n):
+                bit_set(untried, i)
+            for k in range(depth + 1):
+                bit_clear(untried, path[k])
+                
+        node = child
+        node_visits[node] += prior_visits
+        node_values[node] += prior_visits * score
+        
+    return node_count
+
+
+@njit(cache=True)
+def mcts_root_stats(node_links, node_visits, node_values, out_visits, out_values):
+    """Visites et somme des valeurs de chaque action à la racine (0 si l'enfant n'existe pas)"""
+    out_visits[:] = 0
+    out_values[:] = 0.0
+    child = node_links[0, MCTS_FIRST_CHILD]
+    while child != -1:
+        action = node_links[child, MCTS_ACTION]
+        out_visits[action] = node_visits[child]
+        out_values[action] = node_values[child]
+        child = node_links[child, MCTS_NEXT_SIBLING]
+
+
+@njit(cache=True, fastmath=True)
+def bnb_min_arrivals(cylinders, geom):
+    """
+    Plus courte distance d'arrivée possible sur chaque cylindre (depuis l'origine ou un autre cylindre)
+    et ordre des cylindres par points / distance décroissant, pour gain_upper_bound
+    """
+    n = cylinders.shape[0]
+    leg_dist = geom[0]
+    d_in = np.empty(n, dtype=np.float64)
+    ratio = np.empty(n, dtype=np.float64)
+    for j in range(n):
+        d_in[j] = leg_dist[0, j]
+        for i in range(n):
+            if i != j and leg_dist[i + 1, j] < d_in[j]:
+                d_in[j] = leg_dist[i + 1, j]
+        ratio[j] = -cylinders[j, 3] / max(d_in[j], 1e-12)
+    return d_in, np.argsort(ratio, kind='mergesort')
+
+
+@njit(cache=True, fastmath=True)
+def gain_upper_bound(M, T, Q, Reward, mask, order, d_in, cylinders, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0):
+    """
+    Majorant admissible du gain final depuis un état : sac à dos fractionnaire sur les cylindres restants.
+    Chaque ramassage coûte au moins d_in en distance, et la masse ne fait que croître : la distance
+    encore possible est bornée par le carburant et le temps restants à la masse actuelle
+    """
+    capacity = min((Qmax - Q) / (b * M + b0), (Tmax - T) * max(V0 * math.exp(-a * M), 1e-9))
+    bound = Reward
+    for k in range(order.shape[0]):
+        j = order[k]
+        if (mask >> j) & 1:
+            continue
+        if d_in[j] <= capacity:
+            capacity -= d_in[j]
+            bound += cylinders[j, 3]
+        else:
+            bound += cylinders[j, 3] * capacity / d_in[j]
+            break
+    return bound
+
+
+@njit(cache=True, fastmath=True)
+def bnb_moves(row, mask, cylinders, geom, out):
+    """
+    Cibles non ramassées depuis le départ row, écrites dans out par points / distance décroissant,
+    retourne leur nombre. Viser une cible bloquée reste un coup : les cylindres balayés en chemin
+    sont ramassés avant elle (voir bnb_chain)
+    """
+    n = cylinders.shape[0]
+    leg_dist = geom[0]
+    keys = np.empty(n, dtype=np.float64)
+    count = 0
+    for j in range(n):
+        if (mask >> j) & 1:
+            continue
+        out[count] = j
+        keys[count] = -cylinders[j, 3] / max(leg_dist[row, j], 1e-12)
+        count += 1
+    order = np.argsort(keys[:count], kind='mergesort')
+    moves = out[:count].copy()
+    for k in range(count):
+        out[k] = moves[order[k]]
+    return count
+
+
+@njit(cache=True, fastmath=True)
+def bnb_chain(target_idx, row, mask, M, T, Q, R, cylinders, geom, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0):
+    """
+    Ramassages d'un coup du chemin : on vise target_idx depuis le départ row jusqu'à le ramasser, en
+    ramassant au passage le premier cylindre restant balayé par chaque trajet (advance_leg avec geom,
+    fitness_mode 0)
+    Retourne (coupure, row, mask, M, T, Q, R) ; en cas de coupure l'état s'arrête au dernier ramassage
+    """
+    n = cylinders.shape[0]
+    leg_dist, sweep_ptr, sweep_idx = geom
+    while not (mask >> target_idx) & 1:
+        if leg_dist[row, target_idx] < 1e-6:
+            # cylindre sous le robot : ramassé sans déplacement
+            mask |= np.int64(1) << target_idx
+            M += cylinders[target_idx, 2]
+            R += cylinders[target_idx, 3]
+            break
+        
+        hit_idx = target_idx
+        leg = row * n + target_idx
+        for k in range(sweep_ptr[leg], sweep_ptr[leg + 1]):
+            if not (mask >> sweep_idx[k]) & 1:
+                hit_idx = sweep_idx[k]
+                break
+        
+        D = leg_dist[row, hit_idx]
+        V = max(V0 * math.exp(-a * M), 1e-9)
+        delta_T = D / V
+        delta_Q = (b * M + b0) * D
+        if T + delta_T > Tmax or Q + delta_Q > Qmax:
+            return True, row, mask, M, T, Q, R
+        
+        T += delta_T
+        Q += delta_Q
+        row = hit_idx + 1
+        mask |= np.int64(1) << hit_idx
+        M += cylinders[hit_idx, 2]
+        R += cylinders[hit_idx, 3]
+    return False, row, mask, M, T, Q, R
+
+
+@njit(cache=True, fastmath=True)
+def bnb_subtree(first, cylinders, geom, d_in, order, shared_best, out_path, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, deadline=0.0, table_bits=18):
+    """
+    Parcours en profondeur exact du sous-arbre des chemins commençant par `first` : un coup vise une
+    cible et ramasse toute la chaîne de cylindres balayés avant elle (bnb_chain), exactement comme
+    evaluate_path, le chemin écrit est donc la suite des cibles
+    - élagage par gain_upper_bound contre le meilleur gain connu (shared_best[0], partagé entre threads)
+    - table de dominance à perte : un état (ramassés, position) déjà atteint avec moins de temps et de
+      carburant est abandonné (même masse et même gain, donc même avenir avec plus de budget)
+    Retourne (meilleur gain, longueur du préfixe écrit dans out_path, noeuds, sous-arbre épuisé,
+    majorant du gain des noeuds non explorés si interrompu)
+    """
+    n = cylinders.shape[0]
+    size = 1 << table_bits
+    table_mask = np.zeros(size, dtype=np.int64)
+    table_row = np.full(size, -1, dtype=np.int64)
+    table_T = np.empty(size, dtype=np.float64)
+    table_Q = np.empty(size, dtype=np.float64)
+    
+    st_row = np.empty(n + 1, dtype=np.int64)
+    st_mask = np.zeros(n + 1, dtype=np.int64)
+    st = np.zeros((n + 1, 4), dtype=np.float64)  # M, T, Q, Reward
+    st_bound = np.empty(n + 1, dtype=np.float64)
+    moves = np.empty((n + 1, n), dtype=np.int64)
+    n_moves = np.zeros(n + 1, dtype=np.int64)
+    next_move = np.zeros(n + 1, dtype=np.int64)
+    path = np.empty(n, dtype=np.int64)
+    
+    best = 0.0
+    best_len = 0
+    nodes = 0
+    
+    # premier coup depuis l'origine
+    if deadline_reached(deadline):
+        return best, best_len, nodes, False, np.inf
+    cut, row, mask, M, T, Q, R = bnb_chain(first, 0, np.int64(0), 0.0, 0.0, 0.0, 0.0, cylinders, geom, V0, a, b, b0, Tmax, Qmax)
+    path[0] = first
+    out_path[0] = first
+    best = R
+    best_len = 1
+    if best > shared_best[0]:
+        shared_best[0] = best
+    if cut:
+        return best, best_len, nodes, True, 0.0
+    st_row[0] = row
+    st_mask[0] = mask
+    st[0, 0] = M
+    st[0, 1] = T
+    st[0, 2] = Q
+    st[0, 3] = R
+    st_bound[0] = gain_upper_bound(M, T, Q, R, mask, order, d_in, cylinders, V0, a, b, b0, Tmax, Qmax)
+    n_moves[0] = bnb_moves(row, mask, cylinders, geom, moves[0])
+    next_move[0] = 0
+    
+    depth = 0
+    while depth >= 0:
+        if next_move[depth] >= n_moves[depth] or math.floor(st_bound[depth] + 1e-9) <= max(best, shared_best[0]):
+            depth -= 1
+            continue
+            
+        nodes += 1
+        if nodes % DEADLINE_CHECK_PERIOD == 0 and deadline_reached(deadline):
+            open_bound = 0.0
+            for d in range(depth + 1):
+                if next_move[d] < n_moves[d]:
+                    open_bound = max(open_bound, st_bound[d])
+            return best, best_len, nodes, False, open_bound
+            
+        j = moves[depth, next_move[depth]]
+        next_move[depth] += 1
+        
+        cut, new_row, mask, M, T, Q, R = bnb_chain(
+            j, st_row[depth], st_mask[depth], st[depth, 0], st[depth, 1], st[depth, 2], st[depth, 3],
+            cylinders, geom, V0, a, b, b0, Tmax, Qmax)
+        path[depth + 1] = j
+        
+        if R > best:
+            # une chaîne coupée garde les ramassages faits avant la coupure
+            best = R
+            best_len = depth + 2
+            for k in range(best_len):
+                out_path[k] = path[k]
+            if best > shared_best[0]:
+                shared_best[0] = best
+        if cut:
+            continue
+                
+        bound = gain_upper_bound(M, T, Q, R, mask, order, d_in, cylinders, V0, a, b, b0, Tmax, Qmax)
+        if math.floor(bound + 1e-9) <= max(best, shared_best[0]):
+            continue
+            
+        # dominance
+        h = mask * np.int64(-7046029254386353131) + new_row
+        h = (h ^ (h >> 29)) & (size - 1)
+        if table_mask[h] == mask and table_row[h] == new_row:
+            if table_T[h] <= T and table_Q[h] <= Q:
+                continue
+        table_mask[h] = mask
+        table_row[h] = new_row
+        table_T[h] = T
+        table_Q[h] = Q
+        
+        depth += 1
+        st_row[depth] = new_row
+        st_mask[depth] = mask
+        st[depth, 0] = M
+        st[depth, 1] = T
+        st[depth, 2] = Q
+        st[depth, 3] = R
+        st_bound[depth] = bound
+        n_moves[depth] = bnb_moves(new_row, mask, cylinders, geom, moves[depth])
+        next_move[depth] = 0
+        
+    return best, best_len, nodes, True, 0.0
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def branch_and_bound_core(cylinders, geom, V0=1.0, a=0.0698, b=3.0, b0=100.0, Tmax=600.0, Qmax=10000.0, deadline=0.0, table_bits=18, counters=None):
+    """
+    Gain maximal exact (fitness_mode 0) par séparation et évaluation, un sous-arbre par premier
+    coup réparti sur les threads Numba (voir bnb_subtree). Au plus 63 cylindres
+    Retourne (meilleur gain, chemin complet, majorant prouvé du gain, optimum prouvé)
+    Le majorant vaut le meilleur gain quand la recherche est allée au bout
+    """
+    n = cylinders.shape[0]
+    d_in, order = bnb_min_arrivals(cylinders, geom)
+    
+    first_moves = np.empty(n, dtype=np.int64)
+    n_first = bnb_moves(0, np.int64(0), cylinders, geom, first_moves)
+    
+    shared_best = np.zeros(1, dtype=np.float64)
+    gains = np.zeros(n_first, dtype=np.float64)
+    lengths = np.zeros(n_first, dtype=np.int64)
+    prefixes = np.empty((n_first, n), dtype=np.int64)
+    nodes = np.zeros(n_first, dtype=np.int64)
+    complete = np.zeros(n_first, dtype=np.bool_)
+    open_bounds = np.zeros(n_first, dtype=np.float64)
+    
+    for t in prange(n_first):
+        gains[t], lengths[t], nodes[t], complete[t], open_bounds[t] = bnb_subtree(
+            first_moves[t], cylinders, geom, d_in, order, shared_best, prefixes[t],
+            V0, a, b, b0, Tmax, Qmax, deadline, table_bits)
+        
+    # sous-arbres jamais commencés : majorés depuis l'origine
+    root_bound = gain_upper_bound(0.0, 0.0, 0.0, 0.0, np.int64(0), order, d_in, cylinders, V0, a, b, b0, Tmax, Qmax)
+    best_t = 0
+    upper = 0.0
+    proven = True
+    for t in range(n_first):
+        if gains[t] > gains[best_t]:
+            best_t = t
+        if not complete[t]:
+            proven = False
+            upper = max(upper, min(open_bounds[t], root_bound))
+    count_evals(counters, nodes.sum(), 1)
+    
+    best_path = np.empty(n, dtype=np.int32)
+    mark = np.zeros(n, dtype=np.bool_)
+    count = 0
+    if n_first > 0:
+        for k in range(lengths[best_t]):
+            best_path[count] = prefixes[best_t, k]
+            mark[prefixes[best_t, k]] = True
+            count += 1
+    # cylindres restants : la fin du chemin est coupée par le budget (ou balayée en route)
+    for i in range(n):
+        if not mark[i]:
+            best_path[count] = i
+            count += 1
+            
+    best = gains[best_t] if n_first > 0 else 0.0
+    upper = max(upper, best)
+    return best, best_path, math.floor(upper + 1e-9), proven
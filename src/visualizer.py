@@ -3,50 +3,30 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import os
 
+from utils_solver import simulate_trajectory, map_geometry, LOG_TARGET, LOG_HIT
+
 class RouteVisualizer:
     @staticmethod
-    def _point_segment_distance(x1, y1, x2, y2, x0, y0):
-        """Réplique Python pure de la fonction de distance pour le tracé"""
-        dx, dy = x2 - x1, y2 - y1
-        if dx == 0.0 and dy == 0.0:
-            return np.sqrt((x0 - x1)**2 + (y0 - y1)**2)
-        t = max(0.0, min(1.0, ((x0 - x1) * dx + (y0 - y1) * dy) / (dx**2 + dy**2)))
-        proj_x, proj_y = x1 + t * dx, y1 + t * dy
-        return np.sqrt((x0 - proj_x)**2 + (y0 - proj_y)**2)
+    def trajectory(cylinders, path, R_col=0.45):
+        """
+        Statut de chaque cylindre ('targeted', 'swept', 'missed') et points de passage,
+        lus dans le journal de simulate_trajectory (le parcours réellement effectué, budget compris)
+        """
+        cylinders = np.ascontiguousarray(cylinders, dtype=np.float64)
+        log = simulate_trajectory(np.asarray(path, dtype=np.int32), cylinders, 0, R_col=R_col, geom=map_geometry(cylinders, R_col))[0]
+        
+        status = ['missed'] * len(cylinders)
+        trajectory_coords = [(0.0, 0.0)]
+        for target_idx, hit_idx in log[:, [LOG_TARGET, LOG_HIT]].astype(np.int64):
+            status[hit_idx] = 'targeted' if hit_idx == target_idx else 'swept'
+            trajectory_coords.append((cylinders[hit_idx, 0], cylinders[hit_idx, 1]))
+        return status, trajectory_coords
 
     @classmethod
     def plot_trajectory(cls, cylinders, path, R_col=0.45, save_path="results/trajectory.png"):
         n = len(cylinders)
-        status = ['missed'] * n
-        visited = set()
-        
-        curr_x, curr_y = 0.0, 0.0
-        trajectory_coords = [(curr_x, curr_y)]
-        
-
-        for target_idx in path:
-            if target_idx in visited:
-                continue
-                
-            target_x, target_y = cylinders[target_idx, 0], cylinders[target_idx, 1]
-            
-
-            for i in range(n):
-                if i not in visited and i != target_idx:
-                    cx, cy = cylinders[i, 0], cylinders[i, 1]
-                    dist = cls._point_segment_distance(curr_x, curr_y, target_x, target_y, cx, cy)
-                    if dist <= R_col:
-                        status[i] = 'swept'
-                        visited.add(i)
-                        
-
-            status[target_idx] = 'targeted'
-            visited.add(target_idx)
-            
-            curr_x, curr_y = target_x, target_y
-            trajectory_coords.append((curr_x, curr_y))
+        status, trajectory_coords = cls.trajectory(cylinders, path, R_col)
 
-   
         fig, ax = plt.subplots(figsize=(12, 10))
         ax.set_title("Trajectoire du Robot et Balayage (Sweep)", fontsize=16, fontweight='bold')
         ax.set_xlabel("Coordonnée X")
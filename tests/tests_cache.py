@@ -0,0 +1,79 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from maps import map_hash
+from result_cache import ResultCache
+from solvers.ga_solver import GASolver
+from solvers.sa_solver import SASolver
+
+MAP_TEXT = "1.0 2.0 1\n-3.0 0.5 2\n"
+
+
+@pytest.fixture
+def map_path(tmp_path):
+    path = tmp_path / "donnees-map1.txt"
+    path.write_text(MAP_TEXT)
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "cache"))
+
+
+def test_key_is_stable(cache, map_path):
+    params = {"alpha": 0.99, "init_paths": np.array([[0, 1]]), "time_limit": 10.0}
+    reordered = {"time_limit": 10.0, "init_paths": np.array([[0, 1]]), "alpha": 0.99}
+    first = cache.key(cache.describe(map_path, SASolver, params, seed=3, n_cores=2))
+    assert first == ResultCache(cache.cache_dir).key(cache.describe(map_path, SASolver, reordered, seed=3, n_cores=2))
+    # même contenu de carte ailleurs sur le disque : même clé
+    copy = os.path.join(os.path.dirname(map_path), "copie.txt")
+    with open(copy, "w") as f:
+        f.write(MAP_TEXT)
+    assert first == cache.key(cache.describe(copy, SASolver, params, seed=3, n_cores=2))
+
+
+@pytest.mark.parametrize("change", [
+    dict(solver_class=GASolver),
+    dict(params={"alpha": 0.5}),
+    dict(seed=4),
+    dict(n_cores=8),
+    dict(time_budget=30.0),
+])
+def test_any_key_field_changes_the_key(cache, map_path, change):
+    base = dict(solver_class=SASolver, params={"alpha": 0.99}, seed=3, n_cores=2, time_budget=None)
+    key = cache.key(cache.describe(map_path, **base))
+    assert cache.key(cache.describe(map_path, **dict(base, **change))) != key
+
+
+def test_put_then_get(cache, map_path):
+    assert cache.get(map_path, SASolver, {"alpha": 0.99}, seed=3) is None
+    cache.put(map_path, SASolver, {"alpha": 0.99}, {"path": [1, 0], "score": 12.5}, seed=3)
+
+    entry = cache.get(map_path, SASolver, {"alpha": 0.99}, seed=3)
+    assert entry["path"] == [1, 0] and entry["score"] == 12.5
+    assert cache.get(map_path, SASolver, {"alpha": 0.99}, seed=None) is None
+
+
+def test_edited_map_misses(cache, map_path):
+    cache.put(map_path, SASolver, {}, {"score": 1.0})
+    before = map_hash(map_path)
+    with open(map_path, "a") as f:
+        f.write("4.0 4.0 3\n")
+    assert map_hash(map_path) != before
+    assert cache.get(map_path, SASolver, {}) is None
+
+
+def test_invalidate(cache, map_path):
+    cache.put(map_path, SASolver, {}, {"score": 1.0})
+    cache.put(map_path, GASolver, {}, {"score": 2.0})
+    assert cache.invalidate(solver_class=SASolver) == 1
+    assert cache.get(map_path, SASolver, {}) is None
+    assert cache.get(map_path, GASolver, {}) is not None
+    assert cache.invalidate(map_path=map_path) == 1
+    assert list(cache.entries()) == []
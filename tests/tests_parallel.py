@@ -0,0 +1,114 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from solvers.ga_solver import GASolver
+from solvers.mcts_solver import MCTSSolver
+from solvers.memetic_solver import MemeticSolver
+from solvers.parallel_runner import ParallelRunner, merge_traces
+from solvers.sa_solver import SASolver
+from solvers.worker_pool import WorkerPool
+from tests_physics import random_map
+from utils_solver import evaluate_path
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = WorkerPool(2)
+    yield pool
+    pool.shutdown()
+
+
+def test_root_parallel_mcts_shares_its_root_statistics(pool):
+    cylinders = random_map(5, n=10)
+    params = dict(iterations=3000, batch_size=500, max_nodes=5000, parallel_mode="root", sync_interval=0.0)
+    result = ParallelRunner.run_detailed(MCTSSolver, params, cylinders, n_cores=2, seed=1, pool=pool)
+
+    infos = [worker["info"] for worker in result["workers"]]
+    assert [info["iterations"] for info in infos] == [3000, 3000]
+    # chaque itération passe par un enfant de la racine
+    assert [info["root_visits"] for info in infos] == [3000, 3000]
+    # le dernier worker à fusionner voit les visites finales de l'autre
+    assert max(info["shared_root_visits"] for info in infos) == 6000
+    assert all(3000 <= info["shared_root_visits"] <= 6000 for info in infos)
+
+    assert sorted(result["path"]) == list(range(10))
+    assert result["score"] == max(worker["score"] for worker in result["workers"])
+    assert result["score"] == evaluate_path(np.array(result["path"], dtype=np.int32), cylinders, 0)[0]
+
+
+@pytest.mark.parametrize("solver_class, params", [
+    (SASolver, dict(alpha=0.99, time_limit=None)),
+    (GASolver, dict(pop_size=20, generations=30, time_limit=None)),
+])
+def test_run_replays_from_its_master_seed(pool, solver_class, params):
+    cylinders = random_map(6)
+    first, second = (ParallelRunner.run_detailed(solver_class, params, cylinders, n_cores=2, seed=42, pool=pool)
+                     for _ in range(2))
+    assert first["seed"] == second["seed"] == 42
+    assert first["path"] == second["path"]
+    assert first["score"] == second["score"]
+    assert [w["path"] for w in first["workers"]] == [w["path"] for w in second["workers"]]
+
+
+def test_workers_polish_their_own_paths(pool):
+    cylinders = random_map(9, n=12)
+    params = dict(alpha=0.9, time_limit=None, fitness_mode=0)
+    raw = ParallelRunner.run_detailed(SASolver, params, cylinders, n_cores=2, seed=3, pool=pool)
+    polished = ParallelRunner.run_detailed(SASolver, params, cylinders, n_cores=2, seed=3, pool=pool, polish="all")
+
+    for before, after in zip(raw["workers"], polished["workers"]):
+        assert sorted(after["path"]) == list(range(12))
+        assert after["score"] >= before["score"]
+        assert after["score"] == pytest.approx(evaluate_path(np.array(after["path"], dtype=np.int32), cylinders, 0)[0])
+    assert polished["score"] == max(worker["score"] for worker in polished["workers"])
+
+
+def test_merge_traces():
+    worker_traces = [
+        np.array([[1.0, 10, 5.0], [3.0, 30, 7.0]]),
+        np.array([[2.0, 5, 6.0], [2.5, 8, 4.0], [4.0, 20, 9.0]]),
+        np.zeros((0, 3)),
+    ]
+    # une ligne par amélioration globale, avec les évaluations cumulées de tous les workers à cet instant
+    np.testing.assert_array_equal(merge_traces(worker_traces), [
+        [1.0, 10, 5.0],
+        [2.0, 15, 6.0],
+        [3.0, 38, 7.0],
+        [4.0, 50, 9.0],
+    ])
+    assert merge_traces([np.zeros((0, 3))]).shape == (0, 3)
+
+
+def test_run_trace_is_monotone(pool):
+    cylinders = random_map(7)
+    result = ParallelRunner.run_detailed(SASolver, dict(alpha=0.999, time_limit=None), cylinders, n_cores=2,
+                                         seed=3, trace_capacity=256, pool=pool)
+    trace = result["trace"]
+    assert len(trace) > 1
+    assert (np.diff(trace[:, 0]) >= 0).all() and (np.diff(trace[:, 1]) >= 0).all()
+    assert (np.diff(trace[:, 2]) > 0).all()
+    assert trace[-1, 2] == result["score"]
+    assert trace[-1, 1] <= result["full_evals"] + result["partial_evals"]
+
+
+def test_evaluation_counters_reach_the_run_result(pool):
+    """Sans deadline, le GA simule exactement pop_size + generations * (pop_size - élites) chemins par worker"""
+    cylinders = random_map(8)
+    params = dict(pop_size=20, generations=30, elitism_ratio=0.05, time_limit=None)
+    result = ParallelRunner.run_detailed(GASolver, params, cylinders, n_cores=2, seed=4, pool=pool)
+
+    assert [w["full_evals"] for w in result["workers"]] == [20 + 30 * 19] * 2
+    assert result["full_evals"] == 2 * (20 + 30 * 19)
+    assert result["partial_evals"] == 0
+    assert result["evals_per_sec"] > 0 and all(w["evals_per_sec"] > 0 for w in result["workers"])
+
+    # la recherche locale du mémétique reprend ses simulations d'un préfixe : évaluations partielles
+    params = dict(pop_size=10, generations=3, time_limit=None)
+    result = ParallelRunner.run_detailed(MemeticSolver, params, cylinders, n_cores=2, seed=4, pool=pool)
+    assert result["partial_evals"] == sum(w["partial_evals"] for w in result["workers"]) > 0
+    assert result["full_evals"] == sum(w["full_evals"] for w in result["workers"]) > 0
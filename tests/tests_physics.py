@@ -0,0 +1,204 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from headless_simulator import load_map, parse_script, simulate_scripts
+from maps import load_maps
+from robot_translator import RobotTranslator
+from utils_solver import (LOG_HIT, LOG_Q, LOG_REWARD, LOG_T, LOG_TARGET, build_geometry, copy_prefix_rows,
+                          evaluate_maps, evaluate_path, evaluate_path_from, evaluate_paths, evaluate_paths_numpy,
+                          fast_local_search_2opt, new_prefix_cache, simulate_trajectory, simulated_annealing_core)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+SEEDS = range(20)
+
+# budget illimité : le robot exécute tout le script, seules les collisions comptent
+NO_BUDGET = dict(Tmax=1e12, Qmax=1e12)
+
+
+def random_map(seed, n=15, size=5.0):
+    """Carte aléatoire dense (beaucoup de balayages) au format de load_map"""
+    rng = np.random.default_rng(seed)
+    cylinders = np.zeros((n, 4), dtype=np.float64)
+    cylinders[:, :2] = rng.uniform(-size, size, (n, 2))
+    cylinders[:, 2] = rng.integers(1, 4, n)
+    cylinders[:, 3] = 2 * cylinders[:, 2] - 1
+    return cylinders
+
+
+def random_paths(seed, n, count=30):
+    rng = np.random.default_rng(seed + 1000)
+    return np.array([rng.permutation(n) for _ in range(count)], dtype=np.int32)
+
+
+def replay(cylinders, paths, **physics):
+    """Rejoue les commandes du traducteur dans le simulateur headless (modèle NumPy indépendant)"""
+    turns, gos, n_cmds = RobotTranslator(cylinders).commands(paths)
+    scripts = [(np.radians(np.cumsum(turns[p, :k])), gos[p, :k]) for p, k in enumerate(n_cmds)]
+    return simulate_scripts(cylinders, scripts, return_orders=True, **physics)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("fitness_mode", [0, 1])
+def test_trajectory_matches_evaluate_path(seed, fitness_mode):
+    cylinders = random_map(seed)
+    geom = build_geometry(cylinders)
+    for path in random_paths(seed, len(cylinders)):
+        expected = evaluate_path(path, cylinders, fitness_mode)
+        log, *result = simulate_trajectory(path, cylinders, fitness_mode, geom=geom)
+        assert tuple(result) == expected
+        assert evaluate_path(path, cylinders, fitness_mode, geom=geom) == expected
+        if len(log):
+            assert log[-1, LOG_REWARD] == expected[1]
+            assert log[-1, LOG_Q] == expected[2]
+            assert log[-1, LOG_T] == expected[3]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_batch_evaluators_match_evaluate_path(seed):
+    cylinders = random_map(seed)
+    paths = random_paths(seed, len(cylinders))
+    expected = np.array([evaluate_path(path, cylinders, 0) for path in paths])
+    batch = np.array(evaluate_paths(paths, cylinders, 0, geom=build_geometry(cylinders))).T
+    reference = np.array(evaluate_paths_numpy(paths, cylinders, 0)).T
+    np.testing.assert_array_equal(batch, expected)
+    np.testing.assert_allclose(reference, expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_translator_replays_the_evaluated_trajectory(seed):
+    cylinders = random_map(seed)
+    paths = random_paths(seed, len(cylinders))
+    gains, fuels, times, orders = replay(cylinders, paths, **NO_BUDGET)
+    for p, path in enumerate(paths):
+        log, _, reward, fuel, time_used = simulate_trajectory(path, cylinders, 1, **NO_BUDGET)
+        assert list(orders[p]) == list(log[:, LOG_HIT].astype(np.int64))
+        assert gains[p] == reward
+        assert times[p] == pytest.approx(time_used, rel=1e-9)
+        assert 1e12 - fuels[p] == pytest.approx(fuel, abs=1e-3)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_translator_respects_the_budget(seed):
+    cylinders = random_map(seed)
+    paths = random_paths(seed, len(cylinders))
+    gains = replay(cylinders, paths)[0]
+    for p, path in enumerate(paths):
+        assert gains[p] == evaluate_path(path, cylinders, 0)[1]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_translator_start_offset(seed):
+    """Un départ décalé donne les commandes de la carte décalée d'autant, partie de l'origine"""
+    cylinders = random_map(seed)
+    paths = random_paths(seed, len(cylinders), count=5)
+    offset = np.array([1.5, -2.0])
+    shifted = cylinders.copy()
+    shifted[:, :2] += offset
+    expected = RobotTranslator(cylinders).commands(paths)
+    result = RobotTranslator(shifted, start_x=offset[0], start_y=offset[1]).commands(paths)
+    np.testing.assert_array_equal(result[2], expected[2])
+    np.testing.assert_allclose(result[0], expected[0], atol=1e-9)
+    np.testing.assert_allclose(result[1], expected[1], atol=1e-9)
+
+
+@pytest.mark.parametrize("map_id", range(4, 10))
+def test_script_text_round_trip(map_id):
+    map_path = os.path.join(DATA_DIR, f"donnees-map{map_id}.txt")
+    cylinders = load_map(map_path)
+    paths = random_paths(map_id, len(cylinders), count=50)
+    scripts = [parse_script(text) for text in RobotTranslator(cylinders).scripts(paths)]
+    gains = simulate_scripts(cylinders, scripts)[0]
+    expected = evaluate_paths(paths, cylinders, 0)[1]
+    np.testing.assert_array_equal(gains, expected)
+
+
+def test_stacked_maps_match_single_maps():
+    names, stacked, counts = load_maps(DATA_DIR)
+    paths = np.zeros(stacked.shape[:2], dtype=np.int32)
+    expected = []
+    for m, name in enumerate(names):
+        cylinders = load_map(os.path.join(DATA_DIR, f"{name}.txt"))
+        paths[m, :counts[m]] = random_paths(m, counts[m], count=1)[0]
+        expected.append(evaluate_path(paths[m, :counts[m]], cylinders, 0))
+    np.testing.assert_array_equal(np.array(evaluate_maps(paths, stacked, counts, 0)).T, np.array(expected))
+
+
+def test_sweep_beyond_target_distance():
+    """Cylindre dont la projection dépasse la cible mais qui est touché avant elle"""
+    cylinders = np.array([[1.0, 0.0, 1.0, 1.0],
+                          [1.2, 0.3, 1.0, 1.0]], dtype=np.float64)
+    log = simulate_trajectory(np.array([0, 1], dtype=np.int32), cylinders, 1)[0]
+    assert int(log[0, LOG_TARGET]) == 0
+    assert int(log[0, LOG_HIT]) == 1
+    orders = replay(cylinders, np.array([[0, 1]], dtype=np.int32), **NO_BUDGET)[3]
+    assert list(orders[0]) == [1, 0]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_visualizer_uses_the_trajectory(seed):
+    pytest.importorskip("matplotlib")
+    from visualizer import RouteVisualizer
+
+    cylinders = random_map(seed)
+    path = random_paths(seed, len(cylinders), count=1)[0]
+    status, coords = RouteVisualizer.trajectory(cylinders, path)
+    log = simulate_trajectory(path, cylinders, 0)[0]
+    assert len(coords) == len(log) + 1
+    assert sum(s != 'missed' for s in status) == len(log)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("fitness_mode", [0, 1])
+@pytest.mark.parametrize("budget", [{}, dict(Tmax=15.0, Qmax=2500.0)])
+def test_prefix_cache_matches_full_evaluation(seed, fitness_mode, budget):
+    """Une inversion [i, j] re-simulée depuis le cache préfixe donne le score de la simulation complète"""
+    cylinders = random_map(seed)
+    geom = build_geometry(cylinders)
+    n = len(cylinders)
+    rng = np.random.default_rng(seed)
+    path = rng.permutation(n).astype(np.int32)
+    physics = dict(dict(Tmax=600.0, Qmax=10000.0), **budget)
+
+    cur_states, cur_visited = new_prefix_cache(n)
+    cand_states, cand_visited = new_prefix_cache(n)
+    *result, valid = evaluate_path_from(path, 0, cur_states, cur_visited, cylinders, fitness_mode,
+                                        Tmax=physics["Tmax"], Qmax=physics["Qmax"], geom=geom)
+    assert tuple(result) == evaluate_path(path, cylinders, fitness_mode, geom=geom, **physics)
+
+    for _ in range(30):
+        i, j = sorted(rng.choice(n, 2, replace=False))
+        cand = path.copy()
+        cand[i:j + 1] = cand[i:j + 1][::-1]
+        start = min(i, valid)
+        copy_prefix_rows(cur_states, cur_visited, cand_states, cand_visited, 0, start)
+        *result, cand_valid = evaluate_path_from(cand, start, cand_states, cand_visited, cylinders, fitness_mode,
+                                                 Tmax=physics["Tmax"], Qmax=physics["Qmax"], geom=geom)
+        assert tuple(result) == evaluate_path(cand, cylinders, fitness_mode, geom=geom, **physics)
+        if rng.random() < 0.5:
+            # mouvement accepté : le cache du candidat devient le cache courant
+            path = cand
+            valid = cand_valid
+            copy_prefix_rows(cand_states, cand_visited, cur_states, cur_visited, 0, n)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("fitness_mode", [0, 1])
+def test_incremental_searches_report_their_path_score(seed, fitness_mode):
+    cylinders = random_map(seed)
+    geom = build_geometry(cylinders)
+
+    path = random_paths(seed, len(cylinders), count=1)[0]
+    start_score = evaluate_path(path, cylinders, fitness_mode, geom=geom)[0]
+    score = fast_local_search_2opt(path, cylinders, fitness_mode, max_steps=20, geom=geom)
+    assert sorted(path) == list(range(len(cylinders)))
+    assert score >= start_score
+    assert score == evaluate_path(path, cylinders, fitness_mode, geom=geom)[0]
+
+    score, path = simulated_annealing_core(cylinders, fitness_mode, T_init=100.0, T_final=1.0, alpha=0.99, geom=geom)
+    assert sorted(path) == list(range(len(cylinders)))
+    assert score == evaluate_path(path, cylinders, fitness_mode, geom=geom)[0]
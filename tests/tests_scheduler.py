@@ -0,0 +1,164 @@
+import concurrent.futures
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from solvers.nearest_solver import NearestSolver
+from solvers.scheduler import JobScheduler
+from tests_physics import random_map
+
+CYLINDERS = random_map(0, n=8)
+
+
+class RecordingPool:
+    """Pool qui garde les tâches soumises sans les exécuter : seul le placement est testé"""
+    def __init__(self, n_cores):
+        self.n_cores = n_cores
+        self.tasks = []
+
+    def warm(self, solver_classes):
+        return 0.0
+
+    def submit(self, fn, *args):
+        self.tasks.append(args)
+        return concurrent.futures.Future()
+
+
+@pytest.fixture
+def make_scheduler():
+    schedulers = []
+
+    def make(n_cores, workers_per_job):
+        scheduler = JobScheduler(workers_per_job=workers_per_job, pool=RecordingPool(n_cores))
+        schedulers.append(scheduler)
+        return scheduler
+
+    yield make
+    for scheduler in schedulers:
+        for job in scheduler.jobs.values():
+            if job.run is not None:
+                job.run.close()
+
+
+def add(scheduler, key, time_budget=None, **kwargs):
+    return scheduler.add(key, NearestSolver, {}, CYLINDERS, time_budget=time_budget, **kwargs)
+
+
+def launched(scheduler):
+    """Clés des lancements de chaque tâche soumise, dans l'ordre de soumission"""
+    return [[job.key for job, _ in entries] for entries in scheduler.futures.values()]
+
+
+def schedule(scheduler):
+    scheduler._compute_ranks()
+    scheduler._prepare_ready()
+    scheduler._schedule()
+
+
+def test_costs_and_ranks(make_scheduler):
+    scheduler = make_scheduler(4, 2)
+    first = add(scheduler, "first", 10.0)
+    second = add(scheduler, "second", 100.0, depends_on=["first"])
+    cheap = add(scheduler, "cheap")
+    scheduler._compute_ranks()
+
+    assert (first.n_workers, second.n_workers, cheap.n_workers) == (2, 2, 1)
+    assert scheduler.is_cheap(cheap) and not scheduler.is_cheap(first)
+    # le rang d'un lancement compte tout ce qui attend après lui
+    assert first.rank == 110.0 and second.rank == 100.0
+
+
+def test_dependency_errors(make_scheduler):
+    scheduler = make_scheduler(2, 1)
+    add(scheduler, "a", 1.0, depends_on=["b"])
+    add(scheduler, "b", 1.0, depends_on=["a"])
+    with pytest.raises(ValueError):
+        scheduler._compute_ranks()
+
+    scheduler = make_scheduler(2, 1)
+    add(scheduler, "a", 1.0, depends_on=["missing"])
+    with pytest.raises(KeyError):
+        scheduler._compute_ranks()
+
+    with pytest.raises(ValueError):
+        add(scheduler, "a", 1.0)
+
+
+def test_critical_path_goes_first(make_scheduler):
+    scheduler = make_scheduler(2, 1)
+    add(scheduler, "long", 100.0)
+    add(scheduler, "short", 10.0)
+    add(scheduler, "after_short", 100.0, depends_on=["short"])
+    add(scheduler, "cheap")
+    schedule(scheduler)
+
+    # short (rang 110) puis long (100) ; plus de coeur libre pour le lancement court
+    assert launched(scheduler) == [["short"], ["long"]]
+
+
+def test_blocked_job_keeps_its_turn(make_scheduler):
+    scheduler = make_scheduler(3, 2)
+    add(scheduler, "a", 200.0)
+    add(scheduler, "b", 150.0)
+    add(scheduler, "c", 100.0, n_workers=1)
+    for k in range(3):
+        add(scheduler, f"cheap{k}")
+    schedule(scheduler)
+
+    # b attend ses deux coeurs : c ne passe pas devant, les lancements courts se partagent le coeur libre
+    assert launched(scheduler) == [["a"], ["a"], ["cheap0", "cheap1", "cheap2"]]
+
+
+def test_cheap_jobs_are_packed(make_scheduler):
+    scheduler = make_scheduler(2, 2)
+    for k in range(5):
+        add(scheduler, f"cheap{k}")
+    schedule(scheduler)
+
+    tasks = launched(scheduler)
+    assert len(tasks) == 2
+    assert sorted(key for task in tasks for key in task) == [f"cheap{k}" for k in range(5)]
+
+
+def test_threaded_job_holds_its_cores(make_scheduler):
+    scheduler = make_scheduler(4, 2)
+    add(scheduler, "bound", 60.0, n_workers=1, threads=2)
+    add(scheduler, "solver", 100.0, depends_on=["bound"])
+    add(scheduler, "other", 10.0)
+    schedule(scheduler)
+
+    assert launched(scheduler) == [["bound"], ["other"], ["other"]]
+    assert sorted(scheduler.busy.values()) == [1, 1, 2]
+    # le worker multi-thread se règle comme dans un pool de 4 // 2 processus
+    packed_args = scheduler.pool.tasks[0][0]
+    assert packed_args[0][-1] == 2
+
+
+def test_sweep_respects_dependencies():
+    scheduler = JobScheduler(n_cores=2, workers_per_job=1)
+    done = []
+    seen_done = {}
+
+    def prepare(job):
+        seen_done[job.key] = list(done)
+        return {}
+
+    for key, deps in [("a", []), ("b", ["a"]), ("c", ["b"])]:
+        scheduler.add(key, NearestSolver, {}, CYLINDERS, time_budget=5.0, depends_on=deps,
+                      prepare=prepare, on_done=lambda job, result: done.append(job.key))
+    for k in range(4):
+        scheduler.add(f"cheap{k}", NearestSolver, {}, CYLINDERS, on_done=lambda job, result: done.append(job.key))
+
+    try:
+        results = scheduler.run()
+    finally:
+        scheduler.shutdown()
+
+    assert seen_done["b"].count("a") == 1 and "c" not in seen_done["b"]
+    assert "b" in seen_done["c"]
+    assert sorted(done) == sorted(results)
+    for result in results.values():
+        assert sorted(result["path"]) == list(range(len(CYLINDERS)))
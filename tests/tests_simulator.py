@@ -0,0 +1,115 @@
+import os
+import select
+import subprocess
+import sys
+import time
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+import unity_runner
+from headless_simulator import HeadlessSimulator, load_map
+from robot_translator import RobotTranslator
+from simulator_pool import SimulatorPool
+from unity_runner import DirectoryWatcher, UnityRunner, process_exit_fd
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+MAP_PATH = os.path.join(DATA_DIR, "donnees-map4.txt")
+
+FAKE_SIMULATOR = [sys.executable, os.path.abspath(os.path.join(SRC_DIR, "fake_simulator.py"))]
+# simulateur qui s'arrête aussitôt sans écrire de score
+SILENT_SIMULATOR = [sys.executable, "-c", "pass"]
+# simulateur bloqué, arrêté au timeout
+HUNG_SIMULATOR = [sys.executable, "-c", "import time; time.sleep(60)"]
+
+
+@pytest.fixture
+def scripts(tmp_path):
+    """Deux scripts de la carte et leur score attendu (rejoués par le simulateur headless)"""
+    cylinders = load_map(MAP_PATH)
+    n = len(cylinders)
+    paths = [list(range(n)), list(range(n))[::-1]]
+    sources = [str(tmp_path / f"script_{k}.txt") for k in range(len(paths))]
+    RobotTranslator(cylinders).generate_scripts(paths, sources)
+    return sources, HeadlessSimulator().run_batch(MAP_PATH, sources)
+
+
+def test_pool_runs_fake_simulators(tmp_path, scripts):
+    sources, expected = scripts
+    with SimulatorPool(FAKE_SIMULATOR, n_instances=2, sandbox_root=str(tmp_path / "sandbox")) as pool:
+        futures = [pool.submit(MAP_PATH, source, timeout=60) for source in sources * 2]
+        results = [future.result() for future in futures]
+
+    for (gain, fuel, temps), (exp_gain, exp_fuel, exp_temps) in zip(results, expected * 2):
+        assert gain == exp_gain
+        assert fuel == pytest.approx(exp_fuel, abs=0.01)
+        assert temps == pytest.approx(exp_temps, abs=0.01)
+    # chaque instance travaille dans son propre dossier d'échange
+    for k in range(2):
+        assert os.path.exists(tmp_path / "sandbox" / f"instance_{k}" / "score.txt")
+
+
+def test_simulator_exiting_without_score(tmp_path, scripts):
+    sources, _ = scripts
+    with SimulatorPool(SILENT_SIMULATOR, n_instances=1, sandbox_root=str(tmp_path)) as pool:
+        start = time.time()
+        assert pool.run_simulation(MAP_PATH, sources[0], timeout=60) is None
+    # la sortie du processus est détectée sans attendre le timeout
+    assert time.time() - start < 10
+
+
+def test_pool_needs_sandboxes_for_several_instances():
+    with pytest.raises(ValueError):
+        SimulatorPool(FAKE_SIMULATOR, n_instances=2)
+
+
+def test_directory_watcher_signals_writes(tmp_path):
+    watcher = DirectoryWatcher.create(str(tmp_path))
+    if watcher is None:
+        pytest.skip("inotify indisponible")
+    try:
+        assert select.select([watcher.fd], [], [], 0)[0] == []
+        (tmp_path / "score.txt").write_text("gain=1 fuel=2 temps=3")
+        assert select.select([watcher.fd], [], [], 5)[0] == [watcher.fd]
+        watcher.drain()
+        assert select.select([watcher.fd], [], [], 0)[0] == []
+    finally:
+        watcher.close()
+
+
+def test_exit_fd_is_readable_once_the_process_ends():
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(0.2)"])
+    exit_fd = process_exit_fd(process)
+    if exit_fd is None:
+        process.wait()
+        pytest.skip("pidfd indisponible")
+    try:
+        assert select.select([exit_fd], [], [], 0)[0] == []
+        assert select.select([exit_fd], [], [], 10)[0] == [exit_fd]
+        assert process.wait(timeout=1) == 0
+    finally:
+        os.close(exit_fd)
+
+
+@pytest.mark.parametrize("wakeups", ["events", "inotify", "polling"])
+def test_delayed_score_is_detected(tmp_path, scripts, monkeypatch, wakeups):
+    """Le score écrit après un délai est relevé quel que soit le mode de réveil disponible"""
+    if wakeups != "events":
+        monkeypatch.setattr(unity_runner, "process_exit_fd", lambda process: None)
+    if wakeups == "polling":
+        monkeypatch.setattr(DirectoryWatcher, "create", classmethod(lambda cls, directory: None))
+
+    sources, expected = scripts
+    runner = UnityRunner(FAKE_SIMULATOR + ["--delay", "0.3"], challenge_dir=str(tmp_path / "challenge"))
+    gain, _, _ = runner.run_simulation(MAP_PATH, sources[0], timeout=60)
+    assert gain == expected[0][0]
+
+
+def test_hung_simulator_times_out(tmp_path, scripts):
+    sources, _ = scripts
+    runner = UnityRunner(HUNG_SIMULATOR, challenge_dir=str(tmp_path))
+    start = time.time()
+    assert runner.run_simulation(MAP_PATH, sources[0], timeout=0.5) is None
+    assert time.time() - start < 10
@@ -0,0 +1,350 @@
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from solvers.beam_solver import BeamSearchSolver
+from solvers.bnb_solver import BranchAndBoundSolver
+from solvers.ga_solver import GASolver
+from solvers.island import exchange_migrants, island_layout, publish_migrants, read_migrants
+from solvers.mcts_solver import MCTSSolver
+from solvers.memetic_solver import MemeticSolver
+from solvers.sa_solver import SASolver
+from tests_physics import random_map
+from utils_solver import (COUNT_FULL_EVALS, LS_2OPT, LS_3OPT, LS_ALL, LS_OROPT, LS_SWAP, MCTS_DEPTH, MCTS_PARENT,
+                          N_COUNTERS, beam_search_core, bitset_words, branch_and_bound_core, build_geometry,
+                          complete_permutation, evaluate_path, evaluate_paths, genetic_algorithm_core,
+                          local_search_core, mcts_init_tree, mcts_search_core, mcts_seed_path,
+                          memetic_algorithm_core, parallel_tempering_core, polish_path, set_numba_seed,
+                          simulated_annealing_core)
+
+# budget serré sur une petite carte dense : beaucoup de cylindres se bloquent l'un l'autre
+TIGHT = dict(Tmax=8.0, Qmax=1200.0)
+
+
+def all_paths(n):
+    return np.array(list(itertools.permutations(range(n))), dtype=np.int32)
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_bnb_matches_brute_force(seed):
+    cylinders = random_map(seed, n=7, size=2.0)
+    geom = build_geometry(cylinders)
+    expected = evaluate_paths(all_paths(7), cylinders, 0, geom=geom, **TIGHT)[1].max()
+
+    gain, path, bound, proven = branch_and_bound_core(cylinders, geom, **TIGHT)
+    assert proven
+    assert gain == expected
+    assert bound == expected
+    assert evaluate_path(path, cylinders, 0, geom=geom, **TIGHT)[1] == gain
+
+
+def test_bnb_blocked_targets():
+    """Chaque cylindre bloque l'autre : seul un coup vers une cible bloquée ramasse quelque chose"""
+    cylinders = np.array([[1.0, 0.0, 1.0, 1.0],
+                          [1.1, 0.3, 1.0, 1.0]], dtype=np.float64)
+    gain, path, _, proven = branch_and_bound_core(cylinders, build_geometry(cylinders))
+    assert proven and gain == 2.0
+    assert evaluate_path(path, cylinders, 0)[1] == 2.0
+
+
+def test_bnb_solver_reports_bound():
+    cylinders = random_map(3, n=7, size=2.0)
+    solver = BranchAndBoundSolver()
+    path, score = solver.solve(cylinders)
+    assert solver.proven
+    assert solver.gain_bound == evaluate_path(np.array(path, dtype=np.int32), cylinders, 0)[1]
+    assert sorted(path) == list(range(7))
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("fitness_mode", [0, 1])
+def test_wide_beam_is_exhaustive(seed, fitness_mode):
+    """Un faisceau plus large que le nombre de préfixes garde tous les chemins : le meilleur est trouvé"""
+    cylinders = random_map(seed, n=6, size=2.0)
+    geom = build_geometry(cylinders)
+    expected = evaluate_paths(all_paths(6), cylinders, fitness_mode, geom=geom, **TIGHT)[0].max()
+
+    path, score = beam_search_core(cylinders, 1000, fitness_mode, geom=geom, **TIGHT)
+    assert sorted(path) == list(range(6))
+    assert score == expected
+    assert evaluate_path(path, cylinders, fitness_mode, geom=geom, **TIGHT)[0] == score
+
+
+@pytest.mark.parametrize("beam_width", [1, 3, 50])
+def test_narrow_beam_returns_its_path_score(beam_width):
+    cylinders = random_map(7)
+    geom = build_geometry(cylinders)
+    path, score = beam_search_core(cylinders, beam_width, 0, geom=geom)
+    assert sorted(path) == list(range(len(cylinders)))
+    assert score == evaluate_path(path, cylinders, 0, geom=geom)[0]
+
+
+def test_beam_solver_deadline_returns_a_full_path():
+    cylinders = random_map(1)
+    solver = BeamSearchSolver(beam_width=200)
+    path, score = solver.solve(cylinders, deadline=1.0)
+    assert sorted(path) == list(range(len(cylinders)))
+    assert score == evaluate_path(np.array(path, dtype=np.int32), cylinders, 0)[0]
+
+
+def new_tree(n, max_nodes):
+    """Pool de noeuds du MCTS réduit à sa racine, comme MCTSSolver._allocate_tree"""
+    tree = (np.empty((max_nodes, 6), dtype=np.int32), np.empty(max_nodes, dtype=np.int64),
+            np.empty(max_nodes, dtype=np.float64), np.empty((max_nodes, bitset_words(n)), dtype=np.int64))
+    return mcts_init_tree(*tree, n), tree
+
+
+def run_mcts(cylinders, max_nodes, iterations, geom, node_count=None, tree=None, deadline=0.0):
+    n = len(cylinders)
+    if tree is None:
+        node_count, tree = new_tree(n, max_nodes)
+    bounds = np.array([np.inf, -np.inf, -np.inf])
+    best_path = np.arange(n, dtype=np.int32)
+    node_count, done = mcts_search_core(cylinders, iterations, 1.414, node_count, *tree, bounds, best_path,
+                                        np.zeros(n, dtype=np.int64), np.zeros(n), deadline=deadline, geom=geom)
+    return node_count, done, tree, bounds, best_path
+
+
+@pytest.mark.parametrize("max_nodes", [10_000, 12])
+def test_mcts_returns_its_best_rollout(max_nodes):
+    """Avec un pool large ou plein (l'arbre cesse de grandir), le meilleur rollout est un chemin valide bien noté"""
+    cylinders = random_map(2, n=8)
+    geom = build_geometry(cylinders)
+    set_numba_seed(0)
+    node_count, done, (links, visits, _, _), bounds, best_path = run_mcts(cylinders, max_nodes, 500, geom)
+
+    assert done == 500
+    assert 1 < node_count <= max_nodes
+    if max_nodes == 12:
+        assert node_count == 12
+    assert sorted(best_path) == list(range(8))
+    assert bounds[2] == evaluate_path(best_path, cylinders, 0, geom=geom)[0]
+    assert bounds[0] <= bounds[2] <= bounds[1]
+
+    # chaque itération remonte jusqu'à la racine, un noeud n'a jamais plus de visites que son parent
+    assert visits[0] == done
+    for node in range(1, node_count):
+        parent = links[node, MCTS_PARENT]
+        assert links[node, MCTS_DEPTH] == links[parent, MCTS_DEPTH] + 1
+        assert visits[node] <= visits[parent]
+
+
+def test_mcts_seed_path_stops_when_the_pool_is_full():
+    cylinders = random_map(3, n=6)
+    node_count, tree = new_tree(6, 4)
+    path = np.array([5, 4, 3, 2, 1, 0], dtype=np.int32)
+    node_count = mcts_seed_path(path, 12.0, 10, node_count, *tree)
+    links, visits, values, _ = tree
+
+    # racine + 3 premiers cylindres du chemin, chacun avec ses visites virtuelles
+    assert node_count == 4
+    assert list(visits[:4]) == [10] * 4 and list(values[:4]) == [120.0] * 4
+    # la recherche continue sur l'arbre plein
+    node_count, done, _, bounds, best_path = run_mcts(cylinders, 4, 100, build_geometry(cylinders), node_count, tree)
+    assert node_count == 4 and done == 100
+    assert sorted(best_path) == list(range(6))
+
+
+def test_mcts_solver_reports_its_path_score():
+    cylinders = random_map(4, n=10)
+    solver = MCTSSolver(iterations=2000, max_nodes=200, batch_size=300, init_paths=[[9, 8, 7]])
+    path, score = solver.solve(cylinders)
+    assert sorted(path) == list(range(10))
+    assert score == evaluate_path(np.array(path, dtype=np.int32), cylinders, 0)[0]
+    assert solver.node_count == 200
+
+
+def past_deadline_run(kernel, cylinders, geom, deadline):
+    """(chemin, score annoncé, générations effectuées ou None) d'un noyau lancé avec l'instant limite deadline"""
+    if kernel == "sa":
+        score, path = simulated_annealing_core(cylinders, 0, T_init=1e4, T_final=1e-3, alpha=0.999999, deadline=deadline, geom=geom)
+        return path, score, None
+    if kernel == "beam":
+        path, score = beam_search_core(cylinders, 5000, 0, deadline=deadline, geom=geom)
+        return path, score, None
+    if kernel == "ga":
+        score, path, _, _, gens = genetic_algorithm_core(cylinders, 200, 10_000, 5, 0.2, 10, deadline=deadline, geom=geom)
+        return path, score, gens
+    if kernel == "memetic":
+        score, path, _, _, gens = memetic_algorithm_core(cylinders, 100, 10_000, 5, 0.2, 1.0, 30, 10, deadline=deadline, geom=geom)
+        return path, score, gens
+    _, _, _, bounds, path = run_mcts(cylinders, 100_000, 10_000_000, geom, deadline=deadline)
+    return path, bounds[2], None
+
+
+@pytest.mark.parametrize("kernel", ["sa", "beam", "ga", "memetic", "mcts"])
+def test_past_deadline_returns_a_scored_path_at_once(kernel):
+    cylinders = random_map(9)
+    geom = build_geometry(cylinders)
+    # premier appel : compilation éventuelle du noyau
+    past_deadline_run(kernel, cylinders, geom, time.time() - 1.0)
+
+    start = time.time()
+    path, score, gens = past_deadline_run(kernel, cylinders, geom, time.time() - 1.0)
+    assert time.time() - start < 0.5
+    assert sorted(path) == list(range(len(cylinders)))
+    assert score == evaluate_path(path, cylinders, 0, geom=geom)[0]
+    if gens is not None:
+        assert gens == 0
+
+
+@pytest.mark.parametrize("solver_class", [GASolver, MemeticSolver])
+def test_generations_count_only_completed_ones(solver_class):
+    cylinders = random_map(10)
+    solver = solver_class(pop_size=20, generations=50, time_limit=None, fitness_mode=0)
+    solver.solve(cylinders)
+    assert solver.run_info() == {"generations": 50}
+
+    solver = solver_class(pop_size=20, generations=10_000, time_limit=None)
+    path, score = solver.solve(cylinders, deadline=time.time() + 0.2)
+    assert 0 < solver.run_info()["generations"] < 10_000
+    assert score == evaluate_path(np.array(path, dtype=np.int32), cylinders, solver.fitness_mode)[0]
+
+
+def test_partial_paths_are_completed():
+    assert complete_permutation([3, 3, 9, -1, 0], 5) == [3, 0, 1, 2, 4]
+    assert complete_permutation(np.array([4, 2], dtype=np.int32), 5) == [4, 2, 0, 1, 3]
+    solver = GASolver(init_paths=[[3, 3, 9, -1, 0], []])
+    np.testing.assert_array_equal(solver.initial_paths(5), [[3, 0, 1, 2, 4], [0, 1, 2, 3, 4]])
+    assert GASolver().initial_paths(5) is None
+
+
+def island_board(n_workers=2, n_migrants=2, n=5):
+    layout = island_layout({"island": True, "n_migrants": n_migrants}, n_workers, n)
+    return {key: np.zeros(shape, dtype=dtype) for key, (shape, dtype) in layout.items()}
+
+
+def test_migrants_are_read_under_the_seqlock():
+    board = island_board()
+    assert read_migrants(board, 0) is None
+
+    elite = np.array([[0, 1, 2, 3, 4], [4, 3, 2, 1, 0]], dtype=np.int32)
+    publish_migrants(board, 0, elite, np.array([2.0, 1.0]))
+    assert board["version"][0] == 2
+    migrants, fits = read_migrants(board, 0)
+    np.testing.assert_array_equal(migrants, elite)
+    np.testing.assert_array_equal(fits, [2.0, 1.0])
+
+    # écriture en cours (version impaire) : rien n'est injecté
+    board["version"][0] += 1
+    assert read_migrants(board, 0) is None
+
+
+def test_exchange_drops_invalid_migrants():
+    board = island_board()
+    publish_migrants(board, 0, np.array([[0, 1, 2, 3, 4], [0, 0, 2, 3, 4]], dtype=np.int32), np.array([9.0, 8.0]))
+    population = np.array([np.roll(np.arange(5), k) for k in range(4)], dtype=np.int32)
+    fitnesses = np.arange(4, dtype=np.float64)
+
+    next_population, next_fitnesses = exchange_migrants(board, 1, 2, population, fitnesses)
+    # seul le migrant valide remplace le pire individu, avec la fitness publiée par son île
+    np.testing.assert_array_equal(next_population[:3], population[[3, 2, 1]])
+    np.testing.assert_array_equal(next_population[3], np.arange(5))
+    np.testing.assert_array_equal(next_fitnesses, [3.0, 2.0, 1.0, 9.0])
+
+
+@pytest.mark.parametrize("kernel", ["ga", "memetic"])
+def test_known_fitnesses_are_not_reevaluated(kernel):
+    cylinders = random_map(8, n=8)
+    geom = build_geometry(cylinders)
+    population = np.array([np.roll(np.arange(8), k) for k in range(6)], dtype=np.int32)
+    known = evaluate_paths(population[:4], cylinders, 0, geom=geom)[0]
+    counters = np.zeros(N_COUNTERS, dtype=np.int64)
+    if kernel == "ga":
+        _, _, final_population, fitnesses, _ = genetic_algorithm_core(
+            cylinders, 10, 0, 3, 0.2, 1, init_population=population, init_fitnesses=known, counters=counters, geom=geom)
+    else:
+        _, _, final_population, fitnesses, _ = memetic_algorithm_core(
+            cylinders, 10, 0, 3, 0.2, 1.0, 5, 1, init_population=population, init_fitnesses=known, counters=counters, geom=geom)
+
+    # individus connus ni réévalués ni modifiés (la recherche locale peut changer les autres)
+    np.testing.assert_array_equal(final_population[:4], population[:4])
+    np.testing.assert_array_equal(fitnesses[:4], known)
+    np.testing.assert_array_equal(fitnesses, evaluate_paths(final_population, cylinders, 0, geom=geom)[0])
+    if kernel == "ga":
+        # seuls les 6 individus sans fitness connue sont simulés
+        assert counters[COUNT_FULL_EVALS] == 6
+
+
+@pytest.mark.parametrize("moves", [LS_2OPT, LS_SWAP, LS_OROPT, LS_3OPT, LS_ALL])
+@pytest.mark.parametrize("fitness_mode", [0, 1])
+def test_local_search_moves_improve_a_permutation(moves, fitness_mode):
+    cylinders = random_map(11, n=12)
+    geom = build_geometry(cylinders)
+    path = np.random.default_rng(moves).permutation(12).astype(np.int32)
+    start_score = evaluate_path(path, cylinders, fitness_mode, geom=geom)[0]
+
+    score = local_search_core(path, cylinders, fitness_mode, max_steps=1000, moves=moves, geom=geom)
+    assert sorted(path) == list(range(12))
+    assert score == pytest.approx(evaluate_path(path, cylinders, fitness_mode, geom=geom)[0])
+    assert score >= start_score
+
+
+@pytest.mark.parametrize("moves", ["2opt", "swap", "oropt", "3opt", "all", ["swap", "oropt"]])
+def test_polish_path(moves):
+    cylinders = random_map(12, n=12)
+    path = list(np.random.default_rng(0).permutation(12))
+    polished, score, start_score = polish_path(path, cylinders, 0, moves)
+    assert sorted(polished) == list(range(12))
+    assert start_score == pytest.approx(evaluate_path(np.array(path, dtype=np.int32), cylinders, 0)[0])
+    assert score == pytest.approx(evaluate_path(np.array(polished, dtype=np.int32), cylinders, 0)[0])
+    assert score >= start_score
+
+
+def test_polish_path_completes_partial_paths():
+    cylinders = random_map(12, n=12)
+    partial = [5, 5, 40, 2, -3, 7]
+    polished, score, start_score = polish_path(partial, cylinders, 0)
+    assert sorted(polished) == list(range(12))
+    # score de départ : celui du chemin complété, pas du chemin partiel
+    completed = np.array(complete_permutation(partial, 12), dtype=np.int32)
+    assert start_score == pytest.approx(evaluate_path(completed, cylinders, 0)[0])
+    assert score == pytest.approx(evaluate_path(np.array(polished, dtype=np.int32), cylinders, 0)[0])
+    assert score >= start_score
+
+
+def test_tempering_kernel_returns_a_scored_permutation():
+    cylinders = random_map(13, n=10)
+    geom = build_geometry(cylinders)
+    score, path, paths, temperatures, rates, rounds_done = parallel_tempering_core(
+        cylinders, 4, 0.01, 100.0, 20, 30, geom=geom)
+    assert rounds_done == 30
+    assert sorted(path) == list(range(10))
+    assert score == pytest.approx(evaluate_path(path, cylinders, 0, geom=geom)[0])
+    assert all(sorted(p) == list(range(10)) for p in paths)
+    assert np.all(np.diff(temperatures) > 0)
+    assert np.all((rates >= 0) & (rates <= 1))
+
+    # instant limite déjà passé : aucune manche, mais un chemin évalué
+    score, path, _, _, _, rounds_done = parallel_tempering_core(
+        cylinders, 4, 0.01, 100.0, 20, 30, deadline=time.time() - 1.0, geom=geom)
+    assert rounds_done == 0
+    assert score == pytest.approx(evaluate_path(path, cylinders, 0, geom=geom)[0])
+
+
+def test_tempering_solver():
+    cylinders = random_map(14, n=10)
+    solver = SASolver(mode="tempering", n_replicas=4, exchange_interval=20, rounds=25, rounds_per_call=10, time_limit=None)
+    path, score = solver.solve(cylinders)
+    assert solver.rounds_done == 25
+    assert sorted(path) == list(range(10))
+    assert score == pytest.approx(evaluate_path(np.array(path, dtype=np.int32), cylinders, 0)[0])
+    assert len(solver.swap_rates) == 3 and np.all((solver.swap_rates >= 0) & (solver.swap_rates <= 1))
+
+
+def test_tempering_solver_respects_its_deadline():
+    cylinders = random_map(14, n=15)
+    solver = SASolver(mode="tempering", n_replicas=4, exchange_interval=200, rounds_per_call=1_000_000, time_limit=None)
+    start = time.time()
+    path, score = solver.solve(cylinders, deadline=start + 0.3)
+    assert time.time() - start < 1.0
+    # un seul appel, coupé par l'instant limite : seules ses manches faites sont comptées
+    assert 0 < solver.rounds_done < 1_000_000
+    assert sorted(path) == list(range(15))
+    assert np.all((solver.swap_rates >= 0) & (solver.swap_rates <= 1))
@@ -0,0 +1,92 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from solvers.beam_solver import BeamSearchSolver
+from solvers.bnb_solver import BranchAndBoundSolver
+from solvers.ga_solver import GASolver
+from solvers.mcts_solver import MCTSSolver
+from solvers.memetic_solver import MemeticSolver
+from solvers.nearest_solver import NearestSolver
+from solvers.parallel_runner import ParallelRunner
+from solvers.sa_solver import SASolver
+from solvers.worker_pool import WorkerPool, warm_up, warmup_map
+from tests_physics import random_map
+
+KERNEL_SOLVERS = [BeamSearchSolver, BranchAndBoundSolver, GASolver, MCTSSolver, MemeticSolver, SASolver]
+
+
+def _sa_signatures():
+    """Signatures du noyau du recuit déjà chargées dans le processus qui exécute la tâche"""
+    from utils_solver import simulated_annealing_core
+    return len(simulated_annealing_core.signatures)
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(2)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.parametrize("solver_class", KERNEL_SOLVERS)
+def test_warmup_variants_are_short_and_valid(solver_class):
+    cylinders = warmup_map()
+    variants = solver_class.warmup_params(len(cylinders))
+    assert variants
+    for params in variants:
+        path, _ = solver_class(**params).solve(cylinders)
+        assert sorted(path) == list(range(len(cylinders)))
+    # noyaux déjà chargés : le préchauffage lui-même ne coûte presque rien
+    warm_up([solver_class])
+    assert warm_up([solver_class]) < 2.0
+
+
+def test_solvers_without_kernel_skip_warmup():
+    assert NearestSolver.warmup_params(6) == []
+
+
+def test_pool_is_warmed_and_reused(pool):
+    pool.warm([NearestSolver])
+    assert pool.running
+    pids = pool.worker_pids
+    assert len(pids) == 2
+    # les pid relevés au préchauffage sont bien ceux des processus qui exécutent les tâches
+    assert {pool.submit(os.getpid).result() for _ in range(8)} <= pids
+    assert pool.submit(_sa_signatures).result() == 0
+
+    pool.warm([SASolver])
+    assert all(pool.submit(_sa_signatures).result() > 0 for _ in range(4))
+    # classes déjà préchauffées : rien à refaire
+    assert pool.warm([SASolver, NearestSolver]) == 0.0
+
+    cylinders = random_map(0)
+    for seed in range(2):
+        result = ParallelRunner.run_detailed(SASolver, {"alpha": 0.9, "time_limit": None}, cylinders, n_cores=2, seed=seed, pool=pool)
+        assert sorted(result["path"]) == list(range(len(cylinders)))
+    assert pool.worker_pids == pids
+
+
+def test_terminated_pool_restarts_warm(pool):
+    pool.warm([SASolver])
+    pids = pool.worker_pids
+    pool.terminate_workers()
+    assert not pool.running
+    for pid in pids:
+        with pytest.raises(ProcessLookupError):
+            os.kill(pid, 0)
+
+    assert pool.submit(_sa_signatures).result() > 0
+    assert pool.worker_pids.isdisjoint(pids)
+
+
+def test_shared_pool():
+    first = WorkerPool.shared(1)
+    assert WorkerPool.shared(1) is first
+    second = WorkerPool.shared(2)
+    assert second is not first and not first.running
+    second.shutdown()
+    assert WorkerPool._shared is None